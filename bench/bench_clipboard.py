@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Click-to-clipboard latency of the shell pipeline, the staged xclip click and the daemon socket
+
+import os
+import sys
+import time
+import shlex
+import select
+import argparse
+import tempfile
+import threading
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+BIN_DIR = os.path.join(REPO_DIR, 'bin')
+
+# Stand-in for xclip: stores the input file, or stdin, where the benchmark can see it
+FAKE_XCLIP = '#!/bin/sh\n[ -n "$3" ] && exec cat "$3" >"$KALIWIDGET_CLIP"\nexec cat >"$KALIWIDGET_CLIP"\n'
+
+# What every click ran before the clipboard helper
+SHELL_CLICK = "sh -c 'printf %s {ip} | {xclip} -selection clipboard'"
+
+def forks_since_boot():
+    with open('/proc/stat', 'r') as f:
+        for line in f:
+            if line.startswith('processes '):
+                return int(line.split()[1])
+    return 0
+
+def measure(command, clip_path, iterations):
+    samples = []
+    forks_before = forks_since_boot()
+    for _ in range(iterations):
+        try:
+            os.remove(clip_path)
+        except FileNotFoundError:
+            pass
+        start = time.perf_counter()
+        subprocess.run(shlex.split(command))
+        deadline = start + 2
+        while not os.path.exists(clip_path) or not os.path.getsize(clip_path):
+            if time.perf_counter() > deadline:
+                break
+            time.sleep(0.0002)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1], \
+        (forks_since_boot() - forks_before) / iterations
+
+class FileClipboard:
+    # Stands in for the gtk backend, which owns the selection inside the daemon
+    name = 'gtk'
+
+    def __init__(self, path):
+        self.path = path
+
+    def copy(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def close(self):
+        pass
+
+def serve(server, stop):
+    while not stop.is_set():
+        if select.select([server.fileno()], [], [], 0.05)[0]:
+            server.handle_events()
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure click-to-clipboard latency')
+    parser.add_argument('--iterations', type=int, default=50, help='Clicks per path')
+    args = parser.parse_args()
+
+    sys.path.insert(0, BIN_DIR)
+    import clipboard
+
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-clip-') as home:
+        xclip = os.path.join(home, 'xclip')
+        with open(xclip, 'w') as f:
+            f.write(FAKE_XCLIP)
+        os.chmod(xclip, 0o755)
+        clip_path = os.path.join(home, 'clip')
+        os.environ['KALIWIDGET_CLIP'] = clip_path
+
+        direct = clipboard.ClipboardServer('xclip', xclip, path=os.path.join(home, 'unused.sock'))
+        direct.listen()
+        server = clipboard.ClipboardServer('none', xclip, path=os.path.join(home, 'clipboard.sock'))
+        server.backend = FileClipboard(clip_path)
+        server.listen()
+        stop = threading.Event()
+        thread = threading.Thread(target=serve, args=(server, stop), daemon=True)
+        thread.start()
+        try:
+            for name, cmd in [('shell pipeline', SHELL_CLICK.format(ip='10.10.10.10', xclip=xclip)),
+                              ('xclip backend', direct.command('10.10.10.10')),
+                              ('gtk via socket', server.command('10.10.10.10'))]:
+                p50, p99, forks = measure(cmd, clip_path, args.iterations)
+                print(f"{name:<16} p50: {p50:6.2f} ms   p99: {p99:6.2f} ms   forks/click: {forks:4.1f}")
+            print(f"socket mode: {oct(os.stat(server.path).st_mode & 0o777)}   copies: {server.copies}   "
+                  f"rejected peers: {server.rejected}")
+        finally:
+            stop.set()
+            thread.join()
+            server.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
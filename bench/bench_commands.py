@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Panel steps under the serial and async command engines, plus timeout cleanup
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from bench_xfconf import REPO_DIR, FAKE_XFCONF_QUERY, initial_channel, load_installer, make_installer, run_panel_steps
+
+def bench_engine(module, workdir, engine, run):
+    state = os.path.join(workdir, f'{engine}-{run}.json')
+    log = os.path.join(workdir, f'{engine}-{run}.log')
+    with open(state, 'w') as f:
+        json.dump(initial_channel(), f)
+    open(log, 'w').close()
+    os.environ['MOCK_XFCONF_STATE'] = state
+    os.environ['MOCK_XFCONF_LOG'] = log
+
+    home = os.path.join(workdir, f'home-{engine}-{run}')
+    status_dir = os.path.join(home, '.config/bin/status')
+    os.makedirs(status_dir)
+    for widget in ('target', 'vpn', 'ethernet'):
+        open(os.path.join(status_dir, f'{widget}.xml'), 'w').close()
+
+    installer = make_installer(module, home, engine=engine)
+    start = time.perf_counter()
+    run_panel_steps(installer)
+    elapsed = time.perf_counter() - start
+    with open(state) as f:
+        return elapsed, json.load(f)
+
+def timeout_cleanup(module, engine):
+    # The grandchild must not outlive a timed-out command
+    with tempfile.NamedTemporaryFile(prefix='kaliwidget-pid-') as pid_file:
+        command = ['sh', '-c', f'sleep 30 & echo $! > {pid_file.name}; wait']
+        try:
+            module.ENGINES[engine]().run(command, timeout=0.2)
+        except Exception:
+            pass
+        time.sleep(0.1)
+        with open(pid_file.name) as f:
+            pid = int(f.read().strip() or 0)
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            state = f.read().rsplit(')', 1)[1].split()[0]
+    except (OSError, IndexError):
+        return True
+    # A killed orphan stays a zombie where pid 1 does not reap (containers)
+    if state == 'Z':
+        return True
+    os.kill(pid, 9)
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the serial and async command engines')
+    parser.add_argument('--runs', type=int, default=5, help='Panel rebuilds per engine')
+    args = parser.parse_args()
+
+    module = load_installer(os.path.join(REPO_DIR, 'kaliWidget.py'))
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-engine-') as workdir:
+        bin_dir = os.path.join(workdir, 'fakebin')
+        os.makedirs(bin_dir)
+        fake = os.path.join(bin_dir, 'xfconf-query')
+        with open(fake, 'w') as f:
+            f.write(FAKE_XFCONF_QUERY)
+        os.chmod(fake, 0o755)
+        os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+
+        channels = {}
+        for engine in sorted(module.ENGINES, reverse=True):
+            samples = []
+            for run in range(args.runs):
+                elapsed, channels[engine] = bench_engine(module, workdir, engine, run)
+                samples.append(elapsed * 1000)
+            samples.sort()
+            print(f"{engine:<8} panel steps p50: {samples[len(samples) // 2]:7.1f} ms   "
+                  f"min: {samples[0]:7.1f} ms   timeout kills grandchild: {timeout_cleanup(module, engine)}")
+        print(f"identical channel: {len({json.dumps(c, sort_keys=True) for c in channels.values()}) == 1}   "
+              f"cpus: {os.cpu_count()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Panel model build and lookups on heavily customized panels
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from bench_xfconf import REPO_DIR, load_installer
+
+TYPES = ['genmon', 'separator', 'launcher', 'whiskermenu', 'clock']
+
+class StaticBackend:
+    # In-memory channel, so only parsing and indexing are measured
+    calls = 0
+
+    def __init__(self, store):
+        self.store = store
+
+    def get_all(self, channel):
+        return dict(self.store)
+
+def channel(plugins, settings, panels=3):
+    store = {'/panels': list(range(1, panels + 1))}
+    for id_ in range(1, plugins + 1):
+        store[f'/plugins/plugin-{id_}'] = 'cpugraph' if id_ == plugins // 2 else TYPES[id_ % len(TYPES)]
+        for key in range(settings):
+            store[f'/plugins/plugin-{id_}/setting-{key}'] = key
+    ids = list(range(1, plugins + 1))
+    size = -(-plugins // panels)
+    for panel in range(panels):
+        store[f'/panels/panel-{panel + 1}/plugin-ids'] = ids[panel * size:(panel + 1) * size]
+    return store
+
+def measure(module, store, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        model = module.PanelModel(module.XfconfClient(None, backend=StaticBackend(store)))
+        for id_ in model.plugins_of_type('genmon'):
+            model.remove_plugin(id_)
+        model.remove_plugin(model.plugins_of_type('cpugraph')[0])
+        model.next_id
+    return (time.perf_counter() - start) / iterations * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Time panel model construction on large channels')
+    parser.add_argument('--installer', default=os.path.join(REPO_DIR, 'kaliWidget.py'), help='Installer to measure')
+    parser.add_argument('--legacy', help='Older kaliWidget.py to compare against (e.g. from git show)')
+    parser.add_argument('--iterations', type=int, default=20, help='Model builds per size')
+    args = parser.parse_args()
+
+    modules = [('current', load_installer(args.installer))]
+    if args.legacy:
+        modules.append(('legacy', load_installer(args.legacy)))
+    for plugins, settings in ((30, 6), (300, 20), (600, 30)):
+        store = channel(plugins, settings)
+        line = f"{len(store):6d} properties"
+        for label, module in modules:
+            line += f"   {label}: {measure(module, store, args.iterations):7.2f} ms"
+        print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Measures a first install against re-installs driven by the install manifest
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from bench_xfconf import REPO_DIR, FAKE_XFCONF_QUERY, initial_channel, load_installer, make_installer
+
+def run_install(module, home, log):
+    installer = make_installer(module, home, shell='/bin/bash')
+    open(log, 'w').close()
+    with open(os.path.join(home, '.bashrc'), 'a'):
+        pass
+
+    def daemon_outputs():
+        # Stands in for setup_status_daemon, which would start a real daemon
+        os.makedirs(os.path.join(home, '.config/bin/status'), exist_ok=True)
+        for widget in installer.LAYOUTS[installer.layout]:
+            open(os.path.join(home, '.config/bin/status', f'{widget}.xml'), 'a').close()
+        return True
+
+    steps = [
+        installer.check_previous_installation,
+        installer.copy_files,
+        daemon_outputs,
+        installer.add_settarget_function,
+        installer.check_panel_state,
+        installer.remove_existing_genmon,
+        lambda: installer.add_plugins_to_panel(*installer.find_and_remove_cpugraph()),
+        installer.save_manifest,
+        installer.cleanup
+    ]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = all(step() for step in steps)
+    elapsed = time.perf_counter() - start
+    with open(log) as f:
+        calls = len(f.read().splitlines())
+    return {
+        'ok': ok,
+        'elapsed_ms': elapsed * 1000,
+        'xfconf_calls': calls,
+        'files_changed': len(installer.files_changed or []),
+        'panel_rebuilt': not installer.panel_current,
+        'backups': len(os.listdir(installer.backups.snapshots)) if os.path.isdir(installer.backups.snapshots) else 0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare a first install with manifest-driven re-installs')
+    parser.add_argument('--runs', type=int, default=3, help='Number of installs into the same home')
+    args = parser.parse_args()
+
+    module = load_installer(os.path.join(REPO_DIR, 'kaliWidget.py'))
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-reinstall-') as workdir:
+        bin_dir = os.path.join(workdir, 'fakebin')
+        os.makedirs(bin_dir)
+        fake = os.path.join(bin_dir, 'xfconf-query')
+        with open(fake, 'w') as f:
+            f.write(FAKE_XFCONF_QUERY)
+        os.chmod(fake, 0o755)
+        os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+        state = os.path.join(workdir, 'channel.json')
+        log = os.path.join(workdir, 'xfconf.log')
+        with open(state, 'w') as f:
+            json.dump(initial_channel(), f)
+        os.environ['MOCK_XFCONF_STATE'] = state
+        os.environ['MOCK_XFCONF_LOG'] = log
+
+        home = os.path.join(workdir, 'home')
+        os.makedirs(home)
+        for run in range(1, args.runs + 1):
+            result = run_install(module, home, log)
+            print(f"run {run}: {result['elapsed_ms']:8.1f} ms   xfconf calls: {result['xfconf_calls']:3d}   "
+                  f"files copied: {result['files_changed']:3d}   panel rebuilt: {str(result['panel_rebuilt']):<5}   "
+                  f"backups: {result['backups']}   ok: {result['ok']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
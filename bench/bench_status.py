@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Compares forks and CPU time of the genmon scripts against the status daemon
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+BIN_DIR = os.path.join(REPO_DIR, 'bin')
+SCRIPTS = ['target.sh', 'vpnip.sh', 'ethernet.sh']
+WIDGETS = ['target', 'vpn', 'ethernet']
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+
+def forks_since_boot():
+    with open('/proc/stat', 'r') as f:
+        for line in f:
+            if line.startswith('processes '):
+                return int(line.split()[1])
+    return 0
+
+def children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+def process_cpu(pid):
+    with open(f'/proc/{pid}/stat', 'r') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLK_TCK
+
+def shebang(path):
+    with open(path, 'r') as f:
+        line = f.readline()
+    return line[2:].split() if line.startswith('#!') else ['sh']
+
+def prepare_home(home):
+    bin_dir = os.path.join(home, '.config/bin')
+    shutil.copytree(BIN_DIR, bin_dir)
+    with open(os.path.join(bin_dir, 'target/target.txt'), 'w') as f:
+        f.write('10.10.10.10 Benchmark\n')
+    return bin_dir
+
+def bench_scripts(home, iterations, rate):
+    bin_dir = os.path.join(home, '.config/bin')
+    env = dict(os.environ, HOME=home)
+    forks_before = forks_since_boot()
+    cpu_before = children_cpu()
+    start = time.perf_counter()
+    commands = [shebang(os.path.join(bin_dir, s)) + [os.path.join(bin_dir, s)] for s in SCRIPTS]
+    for _ in range(iterations):
+        for command in commands:
+            subprocess.run(command, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wall = time.perf_counter() - start
+    ticks = iterations
+    return {
+        'forks_per_tick': (forks_since_boot() - forks_before) / ticks,
+        'cpu_per_tick': (children_cpu() - cpu_before) / ticks,
+        'wall_per_tick': wall / ticks,
+        'ticks_per_second': rate
+    }
+
+def bench_daemon(home, duration, rate, layout='split'):
+    bin_dir = os.path.join(home, '.config/bin')
+    status_dir = os.path.join(bin_dir, 'status')
+    widgets = WIDGETS if layout == 'split' else ['combined']
+    daemon = subprocess.Popen([sys.executable, os.path.join(bin_dir, 'statusd.py'), '--interval', str(1 / rate),
+                               '--layout', layout],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 5
+        while not all(os.path.exists(os.path.join(status_dir, f'{w}.xml')) for w in widgets):
+            if time.monotonic() > deadline:
+                raise RuntimeError('status daemon did not produce widget output')
+            time.sleep(0.05)
+
+        daemon_cpu_before = process_cpu(daemon.pid)
+        forks_before = forks_since_boot()
+        cpu_before = children_cpu()
+        ticks = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            for widget in widgets:
+                subprocess.run(['cat', os.path.join(status_dir, f'{widget}.xml')],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            ticks += 1
+            time.sleep(max(0, start + ticks / rate - time.perf_counter()))
+        daemon_cpu = process_cpu(daemon.pid) - daemon_cpu_before
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+    return {
+        'forks_per_tick': (forks_since_boot() - forks_before) / ticks,
+        'cpu_per_tick': (children_cpu() - cpu_before + daemon_cpu) / ticks,
+        'wall_per_tick': duration / ticks,
+        'ticks_per_second': rate
+    }
+
+def report(name, result):
+    rate = result['ticks_per_second']
+    print(f"{name:<10} forks/s: {result['forks_per_tick'] * rate:8.1f}   "
+          f"cpu ms/s: {result['cpu_per_tick'] * rate * 1000:8.2f}   "
+          f"forks/tick: {result['forks_per_tick']:6.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark genmon scripts against the status daemon')
+    parser.add_argument('--iterations', type=int, default=100, help='Script runs per widget')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to sample the daemon')
+    parser.add_argument('--rate', type=float, default=4.0, help='Widget refreshes per second (genmon period)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-bench-') as home:
+        prepare_home(home)
+        print(f"Sampling {args.iterations} script ticks and {args.duration:.0f}s of daemon ticks "
+              f"at {args.rate:g} Hz (fork counts are system-wide)")
+        report('scripts', bench_scripts(home, args.iterations, args.rate))
+        report('daemon', bench_daemon(home, args.duration, args.rate))
+        report('combined', bench_daemon(home, args.duration, args.rate, 'combined'))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
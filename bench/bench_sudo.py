@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Authentications and wall time of privileged calls, password piping against the helper
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from bench_xfconf import REPO_DIR, load_installer, make_installer
+
+# Stand-in for sudo: checks the password like PAM would (with its delay) and runs the command unprivileged
+FAKE_SUDO = r'''#!/bin/sh
+while [ $# -gt 0 ]; do
+    case "$1" in
+        -S|-n|-k) shift ;;
+        -p) shift 2 ;;
+        --) shift; break ;;
+        *) break ;;
+    esac
+done
+IFS= read -r password
+sleep "$KALIWIDGET_PAM_DELAY"
+echo auth >> "$KALIWIDGET_SUDO_LOG"
+if [ "$password" != "$KALIWIDGET_SUDO_PASSWORD" ]; then
+    echo "Sorry, try again." >&2
+    exit 1
+fi
+exec "$@"
+'''
+
+FAKE_APT = '#!/bin/sh\necho "apt $*"\n'
+
+def run_mode(module, home, mode, calls):
+    installer = make_installer(module, home, sudo=mode)
+    installer.sudo_password = os.environ['KALIWIDGET_SUDO_PASSWORD']
+    open(os.environ['KALIWIDGET_SUDO_LOG'], 'w').close()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = installer.run_command(['apt', 'update'], sudo=True)[0]
+        for i in range(calls - 1):
+            ok = installer.run_command(['apt', 'install', '-y', f'pkg{i}'], sudo=True)[0] and ok
+        denied = not installer.run_command(['rm', '-rf', '/tmp/nothing'], sudo=True)[0]
+    elapsed = time.perf_counter() - start
+    password_held = installer.sudo_password is not None
+    installer.stop_privileged()
+    with open(os.environ['KALIWIDGET_SUDO_LOG']) as f:
+        auths = len(f.read().splitlines())
+    return ok, elapsed, auths, password_held, denied
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sudo -S per call with the privileged helper')
+    parser.add_argument('--calls', type=int, default=5, help='Privileged apt calls per mode')
+    parser.add_argument('--pam-delay', default='0.1', help='Seconds the fake sudo spends authenticating')
+    args = parser.parse_args()
+
+    if os.getuid() == 0:
+        print("run as a normal user: as root the installer skips sudo entirely")
+        return 2
+
+    module = load_installer(os.path.join(REPO_DIR, 'kaliWidget.py'))
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-sudo-') as workdir:
+        bin_dir = os.path.join(workdir, 'fakebin')
+        os.makedirs(bin_dir)
+        for name, content in (('sudo', FAKE_SUDO), ('apt', FAKE_APT)):
+            with open(os.path.join(bin_dir, name), 'w') as f:
+                f.write(content)
+            os.chmod(os.path.join(bin_dir, name), 0o755)
+        os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+        os.environ['KALIWIDGET_SUDO_LOG'] = os.path.join(workdir, 'sudo.log')
+        os.environ['KALIWIDGET_SUDO_PASSWORD'] = 'kali'
+        os.environ['KALIWIDGET_PAM_DELAY'] = args.pam_delay
+
+        for mode in ('stdin', 'helper'):
+            ok, elapsed, auths, held, denied = run_mode(module, workdir, mode, args.calls)
+            print(f"{mode:<7} calls: {args.calls}   ok: {ok}   wall: {elapsed * 1000:7.1f} ms   "
+                  f"authentications: {auths}   password kept: {held}   non-apt denied: {denied}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Microbenchmark of target.sh against the cached target store
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+BIN_DIR = os.path.join(REPO_DIR, 'bin')
+sys.path.insert(0, BIN_DIR)
+
+import targets
+
+def bench_script(home, duration):
+    script = os.path.join(home, '.config/bin/target.sh')
+    env = dict(os.environ, HOME=home)
+    runs = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        subprocess.run(['bash', script], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        runs += 1
+    return runs / (time.perf_counter() - start), runs * 2
+
+def bench_store(path, duration, use_inotify):
+    store = targets.TargetStore(path, use_inotify=use_inotify)
+    runs = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        if store.fileno() is not None:
+            store.handle_events()
+        store.poll()
+        store.get()
+        runs += 1
+    elapsed = time.perf_counter() - start
+    reads = store.reads
+    store.close()
+    return runs / elapsed, reads
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare target.sh with the cached target store')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per measurement')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-target-') as home:
+        bin_dir = os.path.join(home, '.config/bin')
+        shutil.copytree(BIN_DIR, bin_dir, ignore=shutil.ignore_patterns('status', '__pycache__'))
+        path = os.path.join(bin_dir, 'target/target.txt')
+        with open(path, 'w') as f:
+            f.write('10.10.10.10 Benchmark\n')
+
+        rate, reads = bench_script(home, args.duration)
+        print(f"{'target.sh':<16} {rate:12.1f} lookups/s   file reads: {reads}")
+        for name, use_inotify in [('store (stat)', False), ('store (inotify)', True)]:
+            rate, reads = bench_store(path, args.duration, use_inotify)
+            print(f"{name:<16} {rate:12.1f} lookups/s   file reads: {reads}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Widget refresh benchmark suite with fork, CPU and context switch accounting
+
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+BIN_DIR = os.path.join(REPO_DIR, 'bin')
+NETNS = 'kaliwidget-bench'
+SCRIPTS = {'target.sh': 'target', 'vpnip.sh': 'vpn', 'ethernet.sh': 'ethernet'}
+
+# ------------------------------- Accounting --------------------------- #
+
+def forks_since_boot():
+    with open('/proc/stat', 'r') as f:
+        for line in f:
+            if line.startswith('processes '):
+                return int(line.split()[1])
+    return 0
+
+def proc_self_io():
+    counters = {}
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                key, value = line.split(':')
+                counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+def snapshot():
+    return {
+        'wall': time.perf_counter(),
+        'forks': forks_since_boot(),
+        'self': resource.getrusage(resource.RUSAGE_SELF),
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN),
+        'io': proc_self_io()
+    }
+
+def delta(before, after, iterations):
+    result = {'iterations': iterations, 'wall_s': after['wall'] - before['wall'],
+              'process_spawns': after['forks'] - before['forks']}
+    for key in ('ru_utime', 'ru_stime', 'ru_nvcsw', 'ru_nivcsw'):
+        result[key] = (getattr(after['self'], key) - getattr(before['self'], key) +
+                       getattr(after['children'], key) - getattr(before['children'], key))
+    result['user_s'] = result.pop('ru_utime')
+    result['sys_s'] = result.pop('ru_stime')
+    result['voluntary_ctxt_switches'] = result.pop('ru_nvcsw')
+    result['involuntary_ctxt_switches'] = result.pop('ru_nivcsw')
+    # /proc/self/io only covers this process, so syscalls are reported for in-process producers
+    if before['io'] and after['io']:
+        result['read_syscalls'] = after['io']['syscr'] - before['io']['syscr']
+        result['write_syscalls'] = after['io']['syscw'] - before['io']['syscw']
+    for key in ('wall_s', 'user_s', 'sys_s', 'process_spawns', 'voluntary_ctxt_switches', 'involuntary_ctxt_switches'):
+        result[f'{key}_per_iter'] = result[key] / iterations if iterations else 0
+    return result
+
+# ------------------------------- Producers --------------------------- #
+
+def shebang(path):
+    with open(path, 'r') as f:
+        line = f.readline()
+    return line[2:].split() if line.startswith('#!') else ['sh']
+
+def bench_script(home, script, iterations):
+    path = os.path.join(home, '.config/bin', script)
+    command = shebang(path) + [path]
+    env = dict(os.environ, HOME=home)
+    before = snapshot()
+    for _ in range(iterations):
+        subprocess.run(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    result = delta(before, snapshot(), iterations)
+    result.pop('read_syscalls', None)
+    result.pop('write_syscalls', None)
+    return result
+
+def bench_genmon_read(home, widget, iterations):
+    path = os.path.join(home, '.config/bin/status', f'{widget}.xml')
+    before = snapshot()
+    for _ in range(iterations):
+        subprocess.run(['cat', path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    result = delta(before, snapshot(), iterations)
+    result.pop('read_syscalls', None)
+    result.pop('write_syscalls', None)
+    return result
+
+def bench_engine(daemon, iterations, force_change):
+    before = snapshot()
+    for _ in range(iterations):
+        if force_change:
+            for widget in daemon.widgets:
+                widget.last_value = None
+                widget.last_output = None
+        daemon.backend.poll()
+        daemon.store.poll()
+        daemon.update()
+    return delta(before, snapshot(), iterations)
+
+def load_engine(bin_dir, backend):
+    sys.path.insert(0, bin_dir)
+    import statusd
+    daemon = statusd.StatusDaemon(backend=backend, ethernet=os.environ.get('KALIWIDGET_BENCH_ETH', 'eth0'))
+    os.makedirs(statusd.STATUS_DIR, exist_ok=True)
+    daemon.update()
+    return daemon
+
+# ------------------------------- Fixtures --------------------------- #
+
+def prepare_home(home):
+    bin_dir = os.path.join(home, '.config/bin')
+    shutil.copytree(BIN_DIR, bin_dir, ignore=shutil.ignore_patterns('status', '__pycache__'))
+    with open(os.path.join(bin_dir, 'target/target.txt'), 'w') as f:
+        f.write('10.10.10.10 Benchmark\n')
+    return bin_dir
+
+def netns_setup():
+    def ip(*args, check=True):
+        return subprocess.run(['ip', '-n', NETNS] + list(args), check=check,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    subprocess.run(['ip', 'netns', 'del', NETNS], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    subprocess.run(['ip', 'netns', 'add', NETNS], check=True)
+    if ip('link', 'add', 'eth0', 'type', 'dummy', check=False).returncode != 0:
+        ip('link', 'add', 'eth0', 'type', 'veth', 'peer', 'name', 'eth1')
+    ip('tuntap', 'add', 'mode', 'tun', 'tun0')
+    ip('addr', 'add', '192.168.56.10/24', 'dev', 'eth0')
+    ip('addr', 'add', '10.8.0.6/24', 'dev', 'tun0')
+    ip('link', 'set', 'eth0', 'up')
+
+def netns_teardown():
+    subprocess.run(['ip', 'netns', 'del', NETNS], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+# ------------------------------- Main --------------------------- #
+
+def git_revision():
+    try:
+        result = subprocess.run(['git', '-C', REPO_DIR, 'rev-parse', '--short', 'HEAD'],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        return result.stdout.strip() or None
+    except FileNotFoundError:
+        return None
+
+def run_suite(args):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-widgets-') as home:
+        bin_dir = prepare_home(home)
+        for script, widget in SCRIPTS.items():
+            results[f'script:{script}'] = bench_script(home, script, args.iterations)
+
+        for backend in args.backends:
+            daemon = load_engine(bin_dir, backend)
+            name = daemon.backend.name
+            results[f'engine:{name}:steady'] = bench_engine(daemon, args.iterations, False)
+            results[f'engine:{name}:change'] = bench_engine(daemon, args.iterations, True)
+            daemon.backend.close()
+            daemon.store.close()
+
+        for widget in SCRIPTS.values():
+            results[f'genmon-read:{widget}'] = bench_genmon_read(home, widget, args.iterations)
+    return results
+
+def print_table(results, baseline=None):
+    print(f"{'producer':<28} {'wall ms':>9} {'cpu ms':>8} {'spawns':>7} {'ctxsw':>7}" +
+          ("   vs baseline" if baseline else ""))
+    for name, r in results.items():
+        cpu = (r['user_s_per_iter'] + r['sys_s_per_iter']) * 1000
+        ctxsw = r['voluntary_ctxt_switches_per_iter'] + r['involuntary_ctxt_switches_per_iter']
+        line = (f"{name:<28} {r['wall_s_per_iter'] * 1000:9.3f} {cpu:8.3f} "
+                f"{r['process_spawns_per_iter']:7.2f} {ctxsw:7.2f}")
+        old = (baseline or {}).get(name)
+        if old and old['wall_s_per_iter']:
+            line += f"   wall x{r['wall_s_per_iter'] / old['wall_s_per_iter']:.2f}"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every widget producer and emit JSON results')
+    parser.add_argument('--iterations', type=int, default=200, help='Iterations per producer')
+    parser.add_argument('--backends', nargs='+', default=['netlink', 'polling'],
+                        help='Address backends to measure for the status engine')
+    parser.add_argument('--netns', action='store_true',
+                        help='Run inside a network namespace with fixture eth0/tun0 interfaces (root)')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Previous JSON results to compare against')
+    args = parser.parse_args()
+
+    if args.netns and os.environ.get('KALIWIDGET_BENCH_IN_NETNS') != '1':
+        if os.getuid() != 0:
+            print("--netns needs root")
+            return 2
+        netns_setup()
+        try:
+            env = dict(os.environ, KALIWIDGET_BENCH_IN_NETNS='1')
+            return subprocess.run(['ip', 'netns', 'exec', NETNS, sys.executable] + sys.argv, env=env).returncode
+        finally:
+            netns_teardown()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'revision': git_revision(),
+            'host': socket.gethostname(),
+            'kernel': platform.release(),
+            'python': platform.python_version(),
+            'iterations': args.iterations,
+            'netns': os.environ.get('KALIWIDGET_BENCH_IN_NETNS') == '1',
+            'note': 'process_spawns is the system-wide fork counter from /proc/stat'
+        },
+        'results': run_suite(args)
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f).get('results')
+
+    print_table(report['results'], baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
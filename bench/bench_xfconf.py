@@ -0,0 +1,283 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Counts xfconf round-trips of the panel steps against a mock xfconfd
+
+import io
+import os
+import sys
+import json
+import types
+import inspect
+import argparse
+import tempfile
+import importlib.util
+import contextlib
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Stand-in for xfconf-query: keeps the channel in a JSON file and logs every invocation
+FAKE_XFCONF_QUERY = r'''#!/usr/bin/python3
+import os, sys, json, fcntl
+state_path = os.environ['MOCK_XFCONF_STATE']
+# xfconfd serializes its clients, the lock does the same for concurrent invocations
+lock = open(state_path + '.lock', 'w')
+fcntl.flock(lock, fcntl.LOCK_EX)
+with open(os.environ['MOCK_XFCONF_LOG'], 'a') as f:
+    f.write(' '.join(sys.argv[1:]) + '\n')
+with open(state_path) as f:
+    store = json.load(f)
+
+args = sys.argv[1:]
+prop, types, values = None, [], []
+flags = set()
+i = 0
+while i < len(args):
+    a = args[i]
+    if a in ('-c', '-p', '-t', '-s'):
+        value = args[i + 1]
+        if a == '-p': prop = value
+        elif a == '-t': types.append(value)
+        elif a == '-s': values.append(value)
+        i += 2
+        continue
+    flags.add(a)
+    i += 1
+
+def convert(type_, value):
+    if type_ in ('int', 'uint'): return int(value)
+    if type_ == 'bool': return value == 'true'
+    return value
+
+if '-l' in flags:
+    for path in sorted(store):
+        if prop and not (path == prop or path.startswith(prop + '/')):
+            continue
+        value = store[path]
+        if '-v' in flags:
+            shown = '<<array>>' if isinstance(value, list) else str(value).lower() if isinstance(value, bool) else value
+            print(f'{path:<40} {shown}')
+        else:
+            print(path)
+    sys.exit(0)
+
+if '-r' in flags:
+    matches = [p for p in store if p == prop or ('-R' in flags and p.startswith(prop + '/'))]
+    if not matches:
+        sys.exit(1)
+    for p in matches:
+        del store[p]
+elif values:
+    if prop not in store and '--create' not in flags and '-n' not in flags:
+        sys.exit(1)
+    converted = [convert(t, v) for t, v in zip(types, values)]
+    store[prop] = converted if ('-a' in flags or len(converted) > 1) else converted[0]
+else:
+    if prop not in store:
+        sys.exit(1)
+    value = store[prop]
+    if isinstance(value, list):
+        print(f'Value is an array with {len(value)} items:\n')
+        for v in value:
+            print(v)
+    else:
+        print(value)
+    sys.exit(0)
+
+with open(state_path, 'w') as f:
+    json.dump(store, f)
+'''
+
+def initial_channel():
+    types = ['applicationsmenu', 'places', 'separator', 'tasklist', 'separator', 'systray',
+             'pulseaudio', 'power-manager-plugin', 'notification-plugin', 'cpugraph', 'genmon',
+             'genmon', 'separator', 'clock', 'actions']
+    store = {'/panels': [1, 2]}
+    for id_, type_ in enumerate(types, 1):
+        store[f'/plugins/plugin-{id_}'] = type_
+        for key in range(6):
+            store[f'/plugins/plugin-{id_}/setting-{key}'] = key
+    store['/panels/panel-1/plugin-ids'] = list(range(1, 13))
+    store['/panels/panel-2/plugin-ids'] = list(range(13, 16))
+    return store
+
+def load_installer(path):
+    spec = importlib.util.spec_from_file_location('kaliwidget_installer', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def make_installer(module, home, backend=None, engine='async', shell=None, sudo='helper'):
+    if 'xfconf_backend' not in inspect.signature(module.XfceInstaller.__init__).parameters:
+        return make_legacy_installer(module, home, backend)
+    user = os.environ.get('USER', 'root')
+    target = module.BatchTarget(user, user, home, shell=os.environ.get('SHELL', '') if shell is None else shell)
+    return module.XfceInstaller('split', target=target, engine=engine, sudo=sudo, xfconf='cli',
+                                xfconf_backend=backend, tracer=module.Tracer(), log_path=os.devnull)
+
+def make_legacy_installer(module, home, backend=None):
+    # Installers from before the injectable constructor (for --legacy comparisons)
+    installer = module.XfceInstaller.__new__(module.XfceInstaller)
+    installer.home_dir = home
+    installer.current_user = os.environ.get('USER', 'root')
+    installer.script_dir = REPO_DIR
+    installer.layout = 'split'
+    installer.actions_taken = []
+    installer.sudo_password = None
+    installer.genmon_ids = []
+    if hasattr(module, 'XfconfClient'):
+        backend = backend or module.CliXfconfBackend(installer.run_command)
+        installer.xfconf = module.XfconfClient(installer.run_command, backend=backend)
+    return installer
+
+def run_panel_steps(installer):
+    with contextlib.redirect_stdout(io.StringIO()):
+        installer.remove_existing_genmon()
+        installer.add_plugins_to_panel(*installer.find_and_remove_cpugraph())
+
+def bench_cli(module_path, workdir, label):
+    state = os.path.join(workdir, f'{label}.json')
+    log = os.path.join(workdir, f'{label}.log')
+    with open(state, 'w') as f:
+        json.dump(initial_channel(), f)
+    open(log, 'w').close()
+    os.environ['MOCK_XFCONF_STATE'] = state
+    os.environ['MOCK_XFCONF_LOG'] = log
+
+    home = os.path.join(workdir, f'home-{label}')
+    status_dir = os.path.join(home, '.config/bin/status')
+    os.makedirs(status_dir)
+    for widget in ('target', 'vpn', 'ethernet'):
+        open(os.path.join(status_dir, f'{widget}.xml'), 'w').close()
+        # the pre-daemon installer registers the shell scripts instead
+        open(os.path.join(home, '.config/bin', f'{widget}.sh'), 'w').close()
+    open(os.path.join(home, '.config/bin/vpnip.sh'), 'w').close()
+
+    run_panel_steps(make_installer(load_installer(module_path), home))
+    with open(log) as f:
+        lines = f.read().splitlines()
+    with open(state) as f:
+        channel = json.load(f)
+    array_writes = sum(1 for l in lines if 'plugin-ids' in l and (' -s ' in l or ' -r' in l))
+    return (len(lines), array_writes), channel
+
+class MockVariant:
+    # Just enough of GLib.Variant for the calls DbusXfconfBackend makes
+
+    def __init__(self, type_string, value):
+        self.type_string = type_string
+        self.value = value
+
+    def unpack(self):
+        return unpack_variant(self.value)
+
+def unpack_variant(value):
+    if isinstance(value, MockVariant):
+        return value.unpack()
+    if isinstance(value, (tuple, list)):
+        return type(value)(unpack_variant(v) for v in value)
+    if isinstance(value, dict):
+        return {k: unpack_variant(v) for k, v in value.items()}
+    return value
+
+class MockGLibError(Exception):
+    pass
+
+# Stand-ins for gi.repository when python3-gi is not installed
+MOCK_GLIB = types.SimpleNamespace(Variant=MockVariant, VariantType=types.SimpleNamespace(new=str), Error=MockGLibError)
+MOCK_GIO = types.SimpleNamespace(DBusCallFlags=types.SimpleNamespace(NONE=0))
+
+def gi_bindings():
+    try:
+        from gi.repository import Gio, GLib
+        return Gio, GLib, 'python3-gi'
+    except ImportError:
+        return MOCK_GIO, MOCK_GLIB, 'mock GLib'
+
+class MockXfconfConnection:
+
+    def __init__(self, GLib, store):
+        self.GLib = GLib
+        self.store = store
+        self.calls = 0
+
+    def _variant(self, value):
+        if isinstance(value, bool):
+            return self.GLib.Variant('b', value)
+        if isinstance(value, int):
+            return self.GLib.Variant('i', value)
+        if isinstance(value, list):
+            return self.GLib.Variant('av', [self._variant(v) for v in value])
+        return self.GLib.Variant('s', str(value))
+
+    def call_sync(self, bus_name, path, interface, method, params, reply_type, flags, timeout, cancellable):
+        self.calls += 1
+        args = params.unpack()
+        if method == 'GetAllProperties':
+            return self.GLib.Variant('(a{sv})', ({k: self._variant(v) for k, v in self.store.items()},))
+        if method == 'SetProperty':
+            self.store[args[1]] = args[2]
+        elif method == 'ResetProperty':
+            prop, recursive = args[1], args[2]
+            for key in [k for k in self.store if k == prop or (recursive and k.startswith(prop + '/'))]:
+                del self.store[key]
+        return None
+
+def bench_dbus(module_path, workdir):
+    module = load_installer(module_path)
+    if 'GLib' not in inspect.signature(module.DbusXfconfBackend.__init__).parameters:
+        return None, None, None
+    home = os.path.join(workdir, 'home-dbus')
+    status_dir = os.path.join(home, '.config/bin/status')
+    os.makedirs(status_dir)
+    for widget in ('target', 'vpn', 'ethernet'):
+        open(os.path.join(status_dir, f'{widget}.xml'), 'w').close()
+    Gio, GLib, bindings = gi_bindings()
+    connection = MockXfconfConnection(GLib, initial_channel())
+    backend = module.DbusXfconfBackend(connection=connection, Gio=Gio, GLib=GLib)
+    run_panel_steps(make_installer(module, home, backend))
+    return connection.calls, bindings, connection.store
+
+def main():
+    parser = argparse.ArgumentParser(description='Count xfconf round-trips against a mock xfconfd')
+    parser.add_argument('--installer', default=os.path.join(REPO_DIR, 'kaliWidget.py'),
+                        help='Installer to measure')
+    parser.add_argument('--legacy', help='Older kaliWidget.py to compare against (e.g. from git show)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-xfconf-') as workdir:
+        bin_dir = os.path.join(workdir, 'fakebin')
+        os.makedirs(bin_dir)
+        fake = os.path.join(bin_dir, 'xfconf-query')
+        with open(fake, 'w') as f:
+            f.write(FAKE_XFCONF_QUERY)
+        os.chmod(fake, 0o755)
+        os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+
+        results = {}
+        if args.legacy:
+            results['legacy (xfconf-query)'], legacy_channel = bench_cli(args.legacy, workdir, 'legacy')
+        results['cli backend'], channel = bench_cli(args.installer, workdir, 'cli')
+        dbus_calls, bindings, dbus_channel = bench_dbus(args.installer, workdir)
+
+        for name, (calls, array_writes) in results.items():
+            print(f"{name:<24} subprocesses: {calls:4d}   plugin-ids writes: {array_writes}")
+        if dbus_calls is None:
+            print(f"{'dbus backend':<24} skipped (installer cannot take mock bindings)")
+        else:
+            print(f"{'dbus backend':<24} subprocesses: {0:4d}   D-Bus round-trips: {dbus_calls} ({bindings})")
+            baseline = results.get('legacy (xfconf-query)', results['cli backend'])[0]
+            print(f"round-trips vs {'legacy' if args.legacy else 'cli'}: {baseline} -> {dbus_calls} "
+                  f"({baseline / max(1, dbus_calls):.1f}x fewer), process launches: {baseline} -> 0")
+            same = dbus_channel['/panels/panel-1/plugin-ids'] == channel['/panels/panel-1/plugin-ids']
+            print(f"panel-1 layout identical to cli backend: {same}")
+        if args.legacy:
+            same = legacy_channel['/panels/panel-1/plugin-ids'] == channel['/panels/panel-1/plugin-ids']
+            print(f"panel-1 layout identical to legacy: {same}")
+        print(f"resulting panel-1 plugin-ids: {channel['/panels/panel-1/plugin-ids']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
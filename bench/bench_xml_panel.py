@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Panel steps on the offline channel file against xfconf-query, plus output stability
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from bench_xfconf import REPO_DIR, FAKE_XFCONF_QUERY, initial_channel, load_installer, make_installer, run_panel_steps
+
+def prepare_home(workdir, label):
+    home = os.path.join(workdir, f'home-{label}')
+    status_dir = os.path.join(home, '.config/bin/status')
+    os.makedirs(status_dir)
+    for widget in ('target', 'vpn', 'ethernet'):
+        open(os.path.join(status_dir, f'{widget}.xml'), 'w').close()
+    return home
+
+def seed_channel(module, home):
+    backend = module.XmlXfconfBackend(home)
+    for prop, value in initial_channel().items():
+        if isinstance(value, list):
+            backend.set_array('xfce4-panel', prop, 'int', value)
+        else:
+            backend.set('xfce4-panel', prop, 'int' if isinstance(value, int) else 'string', value)
+    backend.flush()
+    return backend.path('xfce4-panel')
+
+def run_cli(module, workdir):
+    state = os.path.join(workdir, 'cli.json')
+    log = os.path.join(workdir, 'cli.log')
+    with open(state, 'w') as f:
+        json.dump(initial_channel(), f)
+    open(log, 'w').close()
+    os.environ['MOCK_XFCONF_STATE'] = state
+    os.environ['MOCK_XFCONF_LOG'] = log
+
+    installer = make_installer(module, prepare_home(workdir, 'cli'))
+    start = time.perf_counter()
+    run_panel_steps(installer)
+    elapsed = time.perf_counter() - start
+    with open(log) as f:
+        calls = len(f.read().splitlines())
+    with open(state) as f:
+        return elapsed, calls, json.load(f)
+
+def run_xml(module, workdir, label):
+    home = prepare_home(workdir, label)
+    path = seed_channel(module, home)
+    backend = module.XmlXfconfBackend(home)
+    installer = make_installer(module, home, backend)
+    start = time.perf_counter()
+    run_panel_steps(installer)
+    elapsed = time.perf_counter() - start
+    with open(path, 'rb') as f:
+        content = f.read()
+    return elapsed, backend.calls, module.XmlXfconfBackend(home).get_all('xfce4-panel'), content
+
+def round_trip(module, workdir):
+    # Loading and writing back without edits must not change a single byte
+    home = prepare_home(workdir, 'round-trip')
+    path = seed_channel(module, home)
+    with open(path, 'rb') as f:
+        before = f.read()
+    backend = module.XmlXfconfBackend(home)
+    backend.get_all('xfce4-panel')
+    backend.dirty.add('xfce4-panel')
+    backend.flush()
+    with open(path, 'rb') as f:
+        return before == f.read()
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the offline xfconf backend with xfconf-query')
+    parser.add_argument('--runs', type=int, default=5, help='Offline panel rebuilds')
+    args = parser.parse_args()
+
+    module = load_installer(os.path.join(REPO_DIR, 'kaliWidget.py'))
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-xml-') as workdir:
+        bin_dir = os.path.join(workdir, 'fakebin')
+        os.makedirs(bin_dir)
+        fake = os.path.join(bin_dir, 'xfconf-query')
+        with open(fake, 'w') as f:
+            f.write(FAKE_XFCONF_QUERY)
+        os.chmod(fake, 0o755)
+        os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+
+        cli_elapsed, cli_calls, cli_channel = run_cli(module, workdir)
+        samples, outputs = [], set()
+        for run in range(args.runs):
+            elapsed, xml_calls, xml_channel, content = run_xml(module, workdir, f'xml-{run}')
+            samples.append(elapsed * 1000)
+            outputs.add(content)
+        samples.sort()
+
+        print(f"{'cli backend':<12} panel steps: {cli_elapsed * 1000:8.1f} ms   subprocesses: {cli_calls:4d}")
+        print(f"{'xml backend':<12} panel steps: {samples[len(samples) // 2]:8.1f} ms   "
+              f"file reads + writes: {xml_calls}   subprocesses: 0")
+        print(f"identical channel: {xml_channel == cli_channel}   byte-identical across runs: {len(outputs) == 1}   "
+              f"lossless round-trip: {round_trip(module, workdir)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Measures change-to-display latency of the status daemon inside a network namespace
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+BIN_DIR = os.path.join(REPO_DIR, 'bin')
+NETNS = 'kaliwidget-bench'
+ETH_IF = 'kwbench0'
+PEER_IF = 'kwbench1'
+TUN_IF = 'tun0'
+
+def ip(*args, check=True):
+    return subprocess.run(['ip', '-n', NETNS] + list(args), check=check,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def setup_namespace():
+    subprocess.run(['ip', 'netns', 'add', NETNS], check=True)
+    if ip('link', 'add', ETH_IF, 'type', 'dummy', check=False).returncode != 0:
+        ip('link', 'add', ETH_IF, 'type', 'veth', 'peer', 'name', PEER_IF)
+    ip('tuntap', 'add', 'mode', 'tun', TUN_IF)
+    ip('link', 'set', ETH_IF, 'up')
+
+def teardown_namespace():
+    subprocess.run(['ip', 'netns', 'del', NETNS], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_for(path, expected, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with open(path, 'r') as f:
+                if expected in f.read():
+                    return time.perf_counter()
+        except OSError:
+            pass
+        time.sleep(0.0005)
+    return None
+
+def measure(status_dir, iterations, timeout):
+    samples = []
+    cases = [('ethernet.xml', ETH_IF, '10.99.0.{}', 'Sin Internet'),
+             ('vpn.xml', TUN_IF, '10.98.0.{}', 'Desconectado')]
+    for i in range(iterations):
+        for output, interface, address, empty_text in cases:
+            address = address.format(i % 250 + 1)
+            path = os.path.join(status_dir, output)
+
+            start = time.perf_counter()
+            ip('addr', 'add', f'{address}/24', 'dev', interface)
+            shown = wait_for(path, address, timeout)
+            samples.append(('add', interface, None if shown is None else shown - start))
+
+            start = time.perf_counter()
+            ip('addr', 'del', f'{address}/24', 'dev', interface)
+            shown = wait_for(path, empty_text, timeout)
+            samples.append(('del', interface, None if shown is None else shown - start))
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description='Status daemon change-to-display latency harness (needs root)')
+    parser.add_argument('--iterations', type=int, default=20, help='Add/remove cycles per interface')
+    parser.add_argument('--backend', default='netlink', help='Address backend passed to statusd.py')
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help='Daemon polling period, long so that only events can refresh the output')
+    parser.add_argument('--limit', type=float, default=50.0, help='Maximum accepted latency in ms')
+    args = parser.parse_args()
+
+    if os.getuid() != 0:
+        print("This harness creates a network namespace and must run as root")
+        return 2
+
+    teardown_namespace()
+    setup_namespace()
+    with tempfile.TemporaryDirectory(prefix='kaliwidget-netns-') as home:
+        bin_dir = os.path.join(home, 'bin')
+        shutil.copytree(BIN_DIR, bin_dir, ignore=shutil.ignore_patterns('status', '__pycache__'))
+        status_dir = os.path.join(bin_dir, 'status')
+        daemon = subprocess.Popen(['ip', 'netns', 'exec', NETNS, sys.executable,
+                                   os.path.join(bin_dir, 'statusd.py'), '--ethernet', ETH_IF,
+                                   '--backend', args.backend, '--interval', str(args.interval)],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if wait_for(os.path.join(status_dir, 'vpn.xml'), 'Desconectado', 5) is None:
+                print("Status daemon did not start")
+                return 1
+            samples = measure(status_dir, args.iterations, max(1.0, args.limit / 1000 * 4))
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            teardown_namespace()
+
+    latencies = sorted(s[2] * 1000 for s in samples if s[2] is not None)
+    missed = sum(1 for s in samples if s[2] is None)
+    if not latencies:
+        print("No change reached the widget output")
+        return 1
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"backend={args.backend} samples={len(samples)} missed={missed} "
+          f"p50={p50:.2f}ms p99={p99:.2f}ms max={latencies[-1]:.2f}ms (includes the 'ip' fork)")
+    return 0 if missed == 0 and latencies[-1] < args.limit else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
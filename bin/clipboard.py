@@ -0,0 +1,262 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Clipboard owner for the widget clicks, fed over a private unix socket
+
+import os
+import sys
+import shlex
+import shutil
+import socket
+import struct
+import logging
+import ipaddress
+import threading
+import subprocess
+import importlib.util
+
+import genmon
+
+MAX_REQUEST = 128
+PEERCRED = struct.Struct('3i')
+BIN_DIR = os.path.dirname(os.path.realpath(__file__))
+CLIENT = os.path.join(BIN_DIR, 'clipsend.py')
+
+def socket_path():
+    # The runtime dir is private to the user; the status dir is the fallback outside a login session
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, 'kaliwidget-clipboard.sock')
+    return os.path.join(BIN_DIR, 'status', 'clipboard.sock')
+
+def detect_backend():
+    # xclip reading a staged file is one exec per click, which no socket client started by genmon beats
+    command = shutil.which('xclip')
+    if command:
+        return 'xclip', command
+    if importlib.util.find_spec('gi') is not None:
+        return 'gtk', None
+    return 'none', None
+
+def load_backend(path=genmon.PANEL_FILE):
+    # The installer resolves the backend once and caches it in panel.conf
+    config = genmon.load_panel_config(path)
+    if config.has_section('clipboard'):
+        section = config['clipboard']
+        return section.get('backend', 'none'), section.get('xclip') or shutil.which('xclip')
+    return detect_backend()
+
+def valid_address(text):
+    try:
+        return str(ipaddress.ip_interface(text) if '/' in text else ipaddress.ip_address(text))
+    except ValueError:
+        return None
+
+# ------------------------------- Backends --------------------------- #
+
+class GtkClipboard:
+    name = 'gtk'
+
+    def __init__(self, timeout=5):
+        import gi
+        gi.require_version('Gtk', '3.0')
+        from gi.repository import GLib
+        self.GLib = GLib
+        self.Gtk = None
+        self.clipboard = None
+        self.error = None
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='clipboard', daemon=True)
+        self.thread.start()
+        if not self.ready.wait(timeout) or self.error:
+            raise RuntimeError(self.error or 'gtk did not start')
+
+    def _run(self):
+        # GTK is only ever touched from this thread; copies reach it through idle callbacks
+        try:
+            from gi.repository import Gtk, Gdk
+            if not Gtk.init_check(None)[0]:
+                raise RuntimeError('no display')
+            self.Gtk = Gtk
+            self.clipboard = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
+        except Exception as e:
+            self.error = str(e)
+            self.ready.set()
+            return
+        self.ready.set()
+        Gtk.main()
+
+    def _set(self, text):
+        self.clipboard.set_text(text, -1)
+        self.clipboard.store()
+        return False
+
+    def copy(self, text):
+        self.GLib.idle_add(self._set, text)
+
+    def close(self):
+        if self.Gtk is not None:
+            self.GLib.idle_add(self.Gtk.main_quit)
+
+class XclipClipboard:
+    name = 'xclip'
+
+    def __init__(self, command=None):
+        self.command = command or shutil.which('xclip')
+        if self.command is None:
+            raise FileNotFoundError('xclip')
+        self.children = []
+
+    def copy(self, text):
+        self.children = [child for child in self.children if child.poll() is None]
+        child = subprocess.Popen([self.command, '-selection', 'clipboard'], stdin=subprocess.PIPE,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        child.stdin.write(text.encode())
+        child.stdin.close()
+        self.children.append(child)
+
+    def close(self):
+        for child in self.children:
+            try:
+                child.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                child.kill()
+        self.children = []
+
+BACKENDS = {
+    'gtk': GtkClipboard,
+    'xclip': XclipClipboard
+}
+
+# ------------------------------- Server --------------------------- #
+
+class ClipboardServer:
+
+    def __init__(self, backend=None, xclip=None, path=None):
+        if backend is None:
+            backend, xclip = load_backend()
+        self.backend = None
+        self.xclip = xclip
+        self.sock = None
+        self.path = path or socket_path()
+        self.spool = f"{os.path.splitext(self.path)[0]}.d"
+        self.staged = set()
+        self.listening = False
+        self.copies = 0
+        self.rejected = 0
+        for name in [backend, 'xclip'] if backend == 'gtk' else [backend]:
+            if name not in BACKENDS:
+                continue
+            try:
+                self.backend = BACKENDS[name](xclip) if name == 'xclip' else BACKENDS[name]()
+                break
+            except Exception as e:
+                logging.info(f"Clipboard backend {name} unavailable: {str(e)}")
+
+    @property
+    def available(self):
+        return self.backend is not None
+
+    def listen(self):
+        # With xclip the daemon would only fork it on each click, so clicks run it directly instead
+        if not self.available or self.backend.name == 'xclip':
+            return None
+        # Only one daemon runs (pidfile lock), so a leftover socket is stale
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            self.sock.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.path, 0o600)
+        self.sock.listen(8)
+        self.sock.setblocking(False)
+        self.listening = True
+        return self.sock.fileno()
+
+    def fileno(self):
+        return self.sock.fileno() if self.sock else None
+
+    def stage(self, ip):
+        # One file per address, written once, so a click is xclip reading it and nothing else
+        path = os.path.join(self.spool, ip.replace('/', '_'))
+        if path in self.staged:
+            return path
+        if not self.staged:
+            shutil.rmtree(self.spool, ignore_errors=True)
+            os.makedirs(self.spool, mode=0o700, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='ascii') as f:
+            f.write(ip)
+        os.replace(tmp_path, path)
+        self.staged.add(path)
+        return path
+
+    def command(self, ip):
+        # genmon splits the command itself, so no shell is started
+        ip = valid_address(ip)
+        if ip is None:
+            return None
+        if self.listening:
+            # The client falls back to xclip when the daemon is gone
+            argv = [sys.executable, '-S', '-I', CLIENT, self.path, ip] + ([self.xclip] if self.xclip else [])
+        elif self.xclip:
+            try:
+                argv = [self.xclip, '-selection', 'clipboard', self.stage(ip)]
+            except OSError as e:
+                logging.warning(f"Cannot stage {ip} for xclip: {str(e)}")
+                return None
+        else:
+            return None
+        return ' '.join(shlex.quote(arg) for arg in argv)
+
+    @staticmethod
+    def peer_uid(conn):
+        try:
+            return PEERCRED.unpack(conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, PEERCRED.size))[1]
+        except OSError:
+            return None
+
+    def handle_events(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            with conn:
+                # The socket mode already keeps other users out; the peer check covers a loose fallback dir
+                if self.peer_uid(conn) != os.getuid():
+                    self.rejected += 1
+                    continue
+                conn.settimeout(0.1)
+                try:
+                    data = conn.recv(MAX_REQUEST)
+                except OSError:
+                    continue
+            # Only addresses are accepted, nothing else reaches the clipboard
+            text = valid_address(data.decode('ascii', errors='replace').strip())
+            if text is None:
+                continue
+            try:
+                self.backend.copy(text)
+                self.copies += 1
+            except Exception as e:
+                logging.warning(f"Clipboard copy failed: {str(e)}")
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.listening = False
+        if self.backend is not None:
+            self.backend.close()
@@ -0,0 +1,39 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Click handler: hands an address to the status daemon's clipboard socket
+#
+# Usage: clipsend.py SOCKET ADDRESS [XCLIP]
+# Run by the panel on every click, so it imports nothing the socket does not need.
+
+import os
+import sys
+import socket
+
+def main(argv):
+    if len(argv) < 3:
+        return 2
+    path, text = argv[1], argv[2]
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(0.5)
+        sock.connect(path)
+        sock.sendall(text.encode('ascii', errors='replace'))
+        return 0
+    except OSError:
+        pass
+    finally:
+        sock.close()
+    # Daemon gone: copy with xclip directly
+    if len(argv) < 4:
+        return 1
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, text.encode())
+    os.close(write_fd)
+    os.dup2(read_fd, 0)
+    os.execv(argv[3], [argv[3], '-selection', 'clipboard'])
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Pushes refresh events to the xfce4-genmon-plugin instances of the widgets
+
+import os
+import shutil
+import logging
+import subprocess
+import configparser
+
+BIN_DIR = os.path.dirname(os.path.realpath(__file__))
+PANEL_FILE = os.path.join(BIN_DIR, 'panel.conf')
+
+def load_panel_config(path=PANEL_FILE):
+    config = configparser.ConfigParser()
+    try:
+        config.read(path, encoding='utf-8')
+    except configparser.Error as e:
+        logging.warning(f"Ignoring invalid {path}: {str(e)}")
+        return configparser.ConfigParser()
+    return config
+
+def load_plugin_ids(path=PANEL_FILE):
+    config = load_panel_config(path)
+    if not config.has_section('plugins'):
+        return {}
+    plugin_ids = {}
+    for widget, value in config['plugins'].items():
+        try:
+            plugin_ids[widget] = int(value)
+        except ValueError:
+            continue
+    return plugin_ids
+
+# ------------------------------- Transports --------------------------- #
+
+class DbusTransport:
+    name = 'dbus'
+
+    def __init__(self):
+        from gi.repository import Gio, GLib
+        self.GLib = GLib
+        self.Gio = Gio
+        self.connection = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+
+    def send(self, plugin, event):
+        value = self.GLib.Variant('(ssv)', (plugin, event, self.GLib.Variant('b', True)))
+        self.connection.call_sync(
+            'org.xfce.Panel', '/org/xfce/Panel', 'org.xfce.Panel', 'PluginEvent',
+            value, None, self.Gio.DBusCallFlags.NO_AUTO_START, 500, None
+        )
+
+    def close(self):
+        pass
+
+class CliTransport:
+    name = 'xfce4-panel'
+
+    def __init__(self):
+        self.command = shutil.which('xfce4-panel')
+        if self.command is None:
+            raise FileNotFoundError('xfce4-panel')
+        self.children = []
+
+    def send(self, plugin, event):
+        self.children = [child for child in self.children if child.poll() is None]
+        self.children.append(subprocess.Popen(
+            [self.command, f'--plugin-event={plugin}:{event}:bool:true'],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ))
+
+    def close(self):
+        for child in self.children:
+            try:
+                child.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                child.kill()
+        self.children = []
+
+# ------------------------------- Notifier --------------------------- #
+
+class PanelNotifier:
+
+    def __init__(self, path=PANEL_FILE):
+        self.path = path
+        self.plugin_ids = {}
+        self.transport = None
+        self.pushes = 0
+        self.reload()
+
+    @property
+    def enabled(self):
+        return bool(self.plugin_ids)
+
+    def reload(self):
+        self.plugin_ids = load_plugin_ids(self.path)
+        if self.plugin_ids and self.transport is None:
+            self.transport = self._open_transport()
+            if self.transport is None:
+                self.plugin_ids = {}
+        return self.enabled
+
+    @staticmethod
+    def _open_transport():
+        for transport in (DbusTransport, CliTransport):
+            try:
+                return transport()
+            except Exception as e:
+                logging.info(f"Panel push via {transport.name} unavailable: {str(e)}")
+        logging.warning("Panel push disabled, genmon falls back to its update period")
+        return None
+
+    def refresh(self, widget):
+        plugin_id = self.plugin_ids.get(widget)
+        if plugin_id is None:
+            return False
+        try:
+            self.transport.send(f'genmon-{plugin_id}', 'refresh')
+            self.pushes += 1
+            return True
+        except Exception as e:
+            logging.warning(f"Could not refresh genmon-{plugin_id}: {str(e)}")
+            return False
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Command line entry point for KaliWidget (settarget / targets)
+
+import sys
+import argparse
+import ipaddress
+
+import targets
+
+# ------------------------------- Style --------------------------- #
+
+class Style:
+    WHITE = '\033[1;37m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[1;36m'
+    GRAY = '\033[38;5;244m'
+    BOLD = '\033[1m'
+    ITALIC = '\033[3m'
+    COMAND = '\033[38;2;73;174;230m'
+    NC = '\033[0m'
+
+def validate_address(value):
+    try:
+        if '/' in value:
+            return str(ipaddress.ip_interface(value))
+        return str(ipaddress.ip_address(value))
+    except ValueError:
+        return None
+
+def print_usage_error():
+    s = Style
+    print(f"\n{s.RED}▋{s.NC} Error{s.RED}{s.BOLD}:{s.NC}{s.ITALIC} modo de uso.{s.NC}")
+    print(f"{s.GRAY}—————————————————————{s.NC}")
+    print(f"  {s.CYAN}• {s.NC}{s.COMAND}settarget {s.NC}192.168.1.100 WebServer ")
+    print(f"  {s.CYAN}• {s.NC}{s.COMAND}settarget {s.GRAY}{s.ITALIC}(limpiar target){s.NC}\n")
+
+# ------------------------------- Target Commands --------------------------- #
+
+def join_words(words):
+    # Unquoted names arrive as several arguments; runs of whitespace are kept to one space
+    return ' '.join(' '.join(words).split())
+
+def target_set(args):
+    s = Style
+    name = join_words(args.name)
+    if not args.ip or not name:
+        print_usage_error()
+        return 1
+
+    address = validate_address(args.ip)
+    if address is None:
+        print(f"\n{s.RED}▋{s.NC} Error{s.RED}{s.BOLD}:{s.NC}")
+        print(f"{s.GRAY}————————{s.NC}")
+        print(f"{s.RED}[{s.BOLD}✘{s.NC}{s.RED}]{s.NC} Formato de IP inválido {s.YELLOW}→{s.NC} {s.RED}{args.ip}{s.NC}")
+        print(f"{s.BLUE}{s.BOLD}[+] {s.NC}Ejemplo válido:{s.NC} {s.GRAY}192.168.1.100, 10.10.0.0/16, fd00::1{s.NC}\n")
+        return 1
+
+    try:
+        registry = targets.TargetRegistry()
+        registry.add(address, name)
+        registry.use(address)
+    except OSError as e:
+        print(f"\n{s.RED}[{s.BOLD}✘{s.NC}{s.RED}]{s.NC} No se pudo guardar el target: {e}\n")
+        return 1
+    targets.signal_daemon()
+
+    print(f"\n{s.YELLOW}▌{s.NC} Target establecido correctamente{s.YELLOW}{s.BOLD}:{s.NC}")
+    print(f"{s.GRAY}—————————————————————————————————{s.NC}")
+    print(f"{s.CYAN}→{s.NC} IP Address:{s.GRAY}...........{s.NC} {s.GREEN}{address}{s.NC}")
+    print(f"{s.CYAN}→{s.NC} Machine Name:{s.GRAY}.........{s.NC} {s.GREEN}{name}{s.NC}\n")
+    return 0
+
+def target_clear(args):
+    s = Style
+    if targets.clear_target(targets.TARGET_FILE):
+        targets.signal_daemon()
+        print(f"\n{s.CYAN}[{s.BOLD}+{s.NC}{s.CYAN}]{s.NC} Target limpiado correctamente\n")
+    else:
+        print(f"\n{s.YELLOW}[{s.BOLD}!{s.NC}{s.YELLOW}]{s.NC} No hay target para limpiar\n")
+    return 0
+
+def target_show(args):
+    s = Style
+    store = targets.TargetStore(use_inotify=False)
+    target = store.get()
+    if target is None:
+        print(f"\n{s.YELLOW}[{s.BOLD}!{s.NC}{s.YELLOW}]{s.NC} No hay target establecido\n")
+        return 1
+    print(f"{target[0]} {target[1]}")
+    return 0
+
+def print_lookup_error(registry, key):
+    candidates = registry.matches(key)
+    if not candidates:
+        print(f"Unknown target: {key}", file=sys.stderr)
+        return 1
+    print(f"Ambiguous target: {key} matches", file=sys.stderr)
+    for entry in candidates:
+        print(f"  {entry['ip']:<40} {entry['name']}", file=sys.stderr)
+    return 1
+
+def target_use(args):
+    registry = targets.TargetRegistry()
+    key = join_words(args.key)
+    entry = registry.use(key)
+    if entry is None:
+        return print_lookup_error(registry, key)
+    targets.signal_daemon()
+    print(f"{entry['ip']} {entry['name']}")
+    return 0
+
+def target_remove(args):
+    registry = targets.TargetRegistry()
+    key = join_words(args.key)
+    entry = registry.remove(key)
+    if entry is None:
+        return print_lookup_error(registry, key)
+    print(f"{entry['ip']} {entry['name']}")
+    return 0
+
+def target_list(args):
+    registry = targets.TargetRegistry()
+    active = registry.active()
+    prefix = getattr(args, 'prefix', None)
+    entries = registry.find(prefix, args.limit) if prefix is not None else registry.recent_entries(args.limit)
+    for entry in entries:
+        marker = '*' if active == (entry['ip'], entry['name']) else ' '
+        print(f"{marker} {entry['ip']:<40} {entry['name']}")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='kaliwidget', description='KaliWidget command line')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    target_parser = commands.add_parser('target', help='Manage the TARGET widget')
+    target_commands = target_parser.add_subparsers(dest='action', required=True)
+
+    set_parser = target_commands.add_parser('set', help='Set the active target (IPv4, IPv6 or CIDR)')
+    set_parser.add_argument('ip', nargs='?')
+    set_parser.add_argument('name', nargs='*')
+    set_parser.set_defaults(func=target_set)
+
+    target_commands.add_parser('clear', help='Clear the active target').set_defaults(func=target_clear)
+    target_commands.add_parser('show', help='Print the active target').set_defaults(func=target_show)
+
+    use_parser = target_commands.add_parser('use', help='Switch to a known target by IP, name or name prefix')
+    use_parser.add_argument('key', nargs='+')
+    use_parser.set_defaults(func=target_use)
+
+    remove_parser = target_commands.add_parser('remove', help='Forget a known target')
+    remove_parser.add_argument('key', nargs='+')
+    remove_parser.set_defaults(func=target_remove)
+
+    list_parser = target_commands.add_parser('list', help='List known targets, most recently used first')
+    list_parser.add_argument('--limit', type=int, default=20)
+    list_parser.set_defaults(func=target_list)
+
+    find_parser = target_commands.add_parser('find', help='Find known targets by name prefix')
+    find_parser.add_argument('prefix')
+    find_parser.add_argument('--limit', type=int, default=20)
+    find_parser.set_defaults(func=target_list)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
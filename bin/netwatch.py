@@ -0,0 +1,549 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Event-driven interface address watcher (rtnetlink with /proc, /sys fallback)
+
+import os
+import fcntl
+import socket
+import struct
+import logging
+
+SYS_NET = '/sys/class/net'
+PROC_IF_INET6 = '/proc/net/if_inet6'
+
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+IFA_FLAGS = 8
+
+IFA_F_SECONDARY = 0x01
+IFA_F_DADFAILED = 0x08
+IFA_F_DEPRECATED = 0x20
+IFA_F_TENTATIVE = 0x40
+
+RT_SCOPE_UNIVERSE = 0
+RT_SCOPE_SITE = 200
+RT_SCOPE_LINK = 253
+RT_SCOPE_HOST = 254
+SCOPE_NAMES = {RT_SCOPE_UNIVERSE: 'global', RT_SCOPE_SITE: 'site', RT_SCOPE_LINK: 'link', RT_SCOPE_HOST: 'host'}
+# /proc/net/if_inet6 reports IPV6_ADDR_* scope bits instead of RT_SCOPE_*
+PROC_SCOPES = {0x00: RT_SCOPE_UNIVERSE, 0x40: RT_SCOPE_SITE, 0x20: RT_SCOPE_LINK, 0x10: RT_SCOPE_HOST}
+
+NLMSG_HEADER = struct.Struct('=IHHII')
+IFADDRMSG = struct.Struct('=BBBBI')
+IFINFOMSG = struct.Struct('=BxHiII')
+RTATTR = struct.Struct('=HH')
+
+IFLA_IFNAME = 3
+
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891b
+
+ARPHRD_ETHER = 1
+ARPHRD_LOOPBACK = 772
+IFF_TAP = 0x0002
+
+VPN_KINDS = ('tun', 'wireguard', 'tap')
+LAN_KINDS = ('ethernet', 'wifi')
+
+def _align(length):
+    return (length + 3) & ~3
+
+def _parse_attrs(data, offset):
+    attrs = {}
+    while offset + RTATTR.size <= len(data):
+        length, type_ = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attrs[type_] = data[offset + RTATTR.size:offset + length]
+        offset += _align(length)
+    return attrs
+
+# ------------------------------- Interface Index --------------------------- #
+
+def _read_sys(path, attr):
+    try:
+        with open(os.path.join(path, attr), 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+class Link:
+    __slots__ = ('name', 'kind', 'driver', 'physical')
+
+    def __init__(self, name, kind, driver=None, physical=False):
+        self.name = name
+        self.kind = kind
+        self.driver = driver
+        self.physical = physical
+
+    def __eq__(self, other):
+        return isinstance(other, Link) and (self.name, self.kind, self.driver, self.physical) == \
+            (other.name, other.kind, other.driver, other.physical)
+
+    def __repr__(self):
+        return f"Link({self.name!r}, {self.kind!r}, driver={self.driver!r}, physical={self.physical})"
+
+def classify(name, sys_net=SYS_NET):
+    path = os.path.join(sys_net, name)
+    type_ = _read_sys(path, 'type')
+    if type_ is None:
+        return None
+    uevent = dict(line.split('=', 1) for line in (_read_sys(path, 'uevent') or '').splitlines() if '=' in line)
+    devtype = uevent.get('DEVTYPE')
+    tun_flags = _read_sys(path, 'tun_flags')
+    try:
+        driver = os.path.basename(os.readlink(os.path.join(path, 'device/driver')))
+    except OSError:
+        driver = None
+    physical = os.path.exists(os.path.join(path, 'device'))
+
+    if tun_flags is not None:
+        kind = 'tap' if int(tun_flags, 16) & IFF_TAP else 'tun'
+        driver = driver or 'tun'
+    elif devtype == 'wireguard':
+        kind = 'wireguard'
+    elif devtype == 'wlan' or os.path.exists(os.path.join(path, 'wireless')) or \
+            os.path.exists(os.path.join(path, 'phy80211')):
+        kind = 'wifi'
+    elif type_ == str(ARPHRD_LOOPBACK):
+        kind = 'loopback'
+    elif type_ == str(ARPHRD_ETHER) and devtype in (None, 'gadget'):
+        kind = 'ethernet'
+    else:
+        kind = devtype or 'other'
+    return Link(name, kind, driver or devtype, physical)
+
+class InterfaceIndex:
+
+    def __init__(self, sys_net=SYS_NET):
+        self.sys_net = sys_net
+        self.links = {}
+        self.classified = 0
+        self.generation = 0
+
+    def _classify(self, name):
+        self.classified += 1
+        return classify(name, self.sys_net)
+
+    def load(self):
+        try:
+            names = os.listdir(self.sys_net)
+        except OSError:
+            names = []
+        self.links = {}
+        for name in names:
+            link = self._classify(name)
+            if link is not None:
+                self.links[name] = link
+        self.generation += 1
+        return True
+
+    def get(self, name):
+        link = self.links.get(name)
+        if link is None:
+            link = self._classify(name)
+            if link is not None:
+                self.links[name] = link
+        return link
+
+    def update(self, name):
+        link = self._classify(name)
+        if link is None:
+            return self.remove(name)
+        if self.links.get(name) == link:
+            return False
+        self.links[name] = link
+        self.generation += 1
+        return True
+
+    def remove(self, name):
+        if self.links.pop(name, None) is None:
+            return False
+        self.generation += 1
+        return True
+
+    def sync(self, names):
+        changed = False
+        for name in set(self.links) - set(names):
+            changed |= self.remove(name)
+        for name in set(names) - set(self.links):
+            changed |= self.update(name)
+        return changed
+
+    def kind(self, name):
+        link = self.get(name)
+        return link.kind if link else None
+
+    def of_kind(self, *kinds):
+        # Physical devices first, then by kind priority and name (tun0, tun1, wg0)
+        links = [link for link in self.links.values() if link.kind in kinds]
+        links.sort(key=lambda link: (not link.physical, kinds.index(link.kind), len(link.name), link.name))
+        return [link.name for link in links]
+
+# ------------------------------- Address Table --------------------------- #
+
+class Address:
+    __slots__ = ('family', 'address', 'prefixlen', 'scope', 'flags')
+
+    def __init__(self, family, address, prefixlen, scope=RT_SCOPE_UNIVERSE, flags=0):
+        self.family = family
+        self.address = address
+        self.prefixlen = prefixlen
+        self.scope = scope
+        self.flags = flags
+
+    @property
+    def key(self):
+        return self.family, self.address, self.prefixlen
+
+    @property
+    def secondary(self):
+        return bool(self.flags & IFA_F_SECONDARY)
+
+    @property
+    def usable(self):
+        return not self.flags & (IFA_F_TENTATIVE | IFA_F_DADFAILED)
+
+    @property
+    def rank(self):
+        # Lower is better: usable, global scope, primary, not deprecated
+        return (not self.usable, self.scope != RT_SCOPE_UNIVERSE, self.secondary,
+                bool(self.flags & IFA_F_DEPRECATED))
+
+    def __eq__(self, other):
+        return isinstance(other, Address) and (self.key, self.scope, self.flags) == (other.key, other.scope, other.flags)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __str__(self):
+        return f"{self.address}/{self.prefixlen}"
+
+    def __repr__(self):
+        return f"Address({self.address!r}/{self.prefixlen}, scope={self.scope}, flags={self.flags:#x})"
+
+    def describe(self):
+        details = [SCOPE_NAMES.get(self.scope, str(self.scope))]
+        if self.secondary:
+            details.append('secondary')
+        if self.flags & IFA_F_DEPRECATED:
+            details.append('deprecated')
+        if self.flags & IFA_F_TENTATIVE:
+            details.append('tentative')
+        return f"{self} ({', '.join(details)})"
+
+class AddressTable:
+
+    def __init__(self):
+        self.addresses = {}
+        self.links = InterfaceIndex()
+        self.generation = 0
+
+    def entries(self, name):
+        return self.addresses.get(name, [])
+
+    def get(self, name, family=socket.AF_INET):
+        return [entry.address for entry in self.entries(name) if entry.family == family]
+
+    def primary(self, name, families=(socket.AF_INET, socket.AF_INET6)):
+        # The first family wins when it has an address; IPv6 link-local is never primary
+        for family in families:
+            candidates = [entry for entry in self.entries(name) if entry.family == family and
+                          not (family == socket.AF_INET6 and entry.scope >= RT_SCOPE_LINK)]
+            if candidates:
+                return min(candidates, key=lambda entry: entry.rank)
+        return None
+
+    def ipv4(self, name):
+        entry = self.primary(name, (socket.AF_INET,))
+        return entry.address if entry else ''
+
+    def interfaces(self):
+        return sorted(self.addresses)
+
+    def add(self, name, entry):
+        entries = self.addresses.setdefault(name, [])
+        for i, old in enumerate(entries):
+            if old.key == entry.key:
+                # RTM_NEWADDR also reports flag updates (DAD done, deprecated)
+                if old == entry:
+                    return False
+                entries[i] = entry
+                self.generation += 1
+                return True
+        entries.append(entry)
+        self.generation += 1
+        return True
+
+    def remove(self, name, entry):
+        entries = self.addresses.get(name)
+        if not entries:
+            return False
+        kept = [old for old in entries if old.key != entry.key]
+        if len(kept) == len(entries):
+            return False
+        if kept:
+            self.addresses[name] = kept
+        else:
+            del self.addresses[name]
+        self.generation += 1
+        return True
+
+    def drop(self, name):
+        if self.addresses.pop(name, None) is None:
+            return False
+        self.generation += 1
+        return True
+
+    def rename(self, old, new):
+        addresses = self.addresses.pop(old, None)
+        if not addresses:
+            return False
+        self.addresses[new] = addresses
+        self.generation += 1
+        return True
+
+    def replace(self, addresses):
+        if addresses == self.addresses:
+            return False
+        self.addresses = addresses
+        self.generation += 1
+        return True
+
+# ------------------------------- Netlink Backend --------------------------- #
+
+class NetlinkBackend:
+    name = 'netlink'
+
+    def __init__(self, table):
+        self.table = table
+        self.seq = 0
+        self.changed = False
+        self.index_names = {}
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        self.sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+        self.sock.setblocking(False)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.sock.close()
+
+    def _request_dump(self, family=socket.AF_UNSPEC):
+        self.seq += 1
+        payload = IFADDRMSG.pack(family, 0, 0, 0, 0)
+        header = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(payload), RTM_GETADDR,
+                                   NLM_F_REQUEST | NLM_F_DUMP, self.seq, 0)
+        self.sock.send(header + payload)
+
+    def load(self):
+        self.table.links.load()
+        self.table.replace({})
+        self._request_dump()
+        self.sock.setblocking(True)
+        try:
+            done = False
+            while not done:
+                done = self._process(self.sock.recv(65536))
+        finally:
+            self.sock.setblocking(False)
+        return True
+
+    def _interface_name(self, index, attrs=None):
+        if attrs and IFA_LABEL in attrs:
+            name = attrs[IFA_LABEL].split(b'\0', 1)[0].decode()
+            # IPv4 labels can carry an alias suffix (eth0:1)
+            name = name.split(':', 1)[0]
+            self.index_names[index] = name
+            return name
+        name = self.index_names.get(index)
+        if name is None:
+            try:
+                name = socket.if_indextoname(index)
+            except OSError:
+                return None
+            self.index_names[index] = name
+        return name
+
+    def _process(self, data):
+        changed = False
+        done = False
+        offset = 0
+        while offset + NLMSG_HEADER.size <= len(data):
+            length, msg_type, flags, seq, pid = NLMSG_HEADER.unpack_from(data, offset)
+            if length < NLMSG_HEADER.size:
+                break
+            body = offset + NLMSG_HEADER.size
+            if msg_type == NLMSG_DONE:
+                done = True
+            elif msg_type == NLMSG_ERROR:
+                done = True
+            elif msg_type in (RTM_NEWADDR, RTM_DELADDR):
+                changed |= self._handle_addr(msg_type, data[body:offset + length])
+            elif msg_type == RTM_NEWLINK:
+                changed |= self._handle_newlink(data[body:offset + length])
+            elif msg_type == RTM_DELLINK:
+                _, _, index, _, _ = IFINFOMSG.unpack_from(data, body)
+                name = self.index_names.pop(index, None)
+                if name is not None:
+                    self.table.links.remove(name)
+                    changed |= self.table.drop(name)
+            offset += _align(length)
+        if changed:
+            self.changed = True
+        return done
+
+    def _handle_newlink(self, payload):
+        _, _, index, _, _ = IFINFOMSG.unpack_from(payload, 0)
+        attrs = _parse_attrs(payload, IFINFOMSG.size)
+        if IFLA_IFNAME not in attrs:
+            self.index_names.pop(index, None)
+            return False
+        name = attrs[IFLA_IFNAME].split(b'\0', 1)[0].decode()
+        old = self.index_names.get(index)
+        self.index_names[index] = name
+        changed = False
+        if old is not None and old != name:
+            # Renamed link (udev predictable names): move its addresses over
+            self.table.links.remove(old)
+            changed = self.table.rename(old, name)
+        return self.table.links.update(name) or changed
+
+    def _handle_addr(self, msg_type, payload):
+        family, prefixlen, flags, scope, index = IFADDRMSG.unpack_from(payload, 0)
+        if family not in (socket.AF_INET, socket.AF_INET6):
+            return False
+        attrs = _parse_attrs(payload, IFADDRMSG.size)
+        # On point-to-point links (tun) IFA_ADDRESS is the peer, IFA_LOCAL ours
+        raw = attrs.get(IFA_LOCAL, attrs.get(IFA_ADDRESS))
+        if raw is None:
+            return False
+        name = self._interface_name(index, attrs)
+        if name is None:
+            return False
+        if IFA_FLAGS in attrs:
+            flags = struct.unpack('=I', attrs[IFA_FLAGS][:4])[0]
+        entry = Address(family, socket.inet_ntop(family, raw), prefixlen, scope, flags)
+        if msg_type == RTM_NEWADDR:
+            return self.table.add(name, entry)
+        return self.table.remove(name, entry)
+
+    def handle_events(self):
+        self.changed = False
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                # ENOBUFS: the kernel dropped events, resynchronise from a dump
+                logging.warning(f"Netlink receive error, reloading addresses: {str(e)}")
+                self.load()
+                return True
+            self._process(data)
+        return self.changed
+
+    def poll(self):
+        return False
+
+# ------------------------------- Polling Backend --------------------------- #
+
+class PollingBackend:
+    name = 'polling'
+
+    def __init__(self, table):
+        self.table = table
+        self.links_changed = False
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def fileno(self):
+        return None
+
+    def close(self):
+        self.sock.close()
+
+    def _ipv4(self, name):
+        ifreq = struct.pack('256s', name.encode()[:15])
+        try:
+            address = fcntl.ioctl(self.sock.fileno(), SIOCGIFADDR, ifreq)[20:24]
+            netmask = fcntl.ioctl(self.sock.fileno(), SIOCGIFNETMASK, ifreq)[20:24]
+        except OSError:
+            return None
+        prefixlen = bin(struct.unpack('!I', netmask)[0]).count('1')
+        return socket.inet_ntoa(address), prefixlen
+
+    def _read(self):
+        addresses = {}
+        try:
+            names = os.listdir(SYS_NET)
+        except OSError:
+            names = []
+        self.links_changed = self.table.links.sync(names)
+        for name in names:
+            ipv4 = self._ipv4(name)
+            if ipv4:
+                scope = RT_SCOPE_HOST if ipv4[0].startswith('127.') else RT_SCOPE_UNIVERSE
+                addresses.setdefault(name, []).append(Address(socket.AF_INET, ipv4[0], ipv4[1], scope))
+        try:
+            with open(PROC_IF_INET6, 'r') as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 6:
+                        continue
+                    address = socket.inet_ntop(socket.AF_INET6, bytes.fromhex(fields[0]))
+                    scope = PROC_SCOPES.get(int(fields[3], 16) & 0xf0, RT_SCOPE_UNIVERSE)
+                    addresses.setdefault(fields[5], []).append(
+                        Address(socket.AF_INET6, address, int(fields[2], 16), scope, int(fields[4], 16)))
+        except OSError:
+            pass
+        return addresses
+
+    def load(self):
+        self.table.links.load()
+        self.table.replace(self._read())
+        return True
+
+    def handle_events(self):
+        return False
+
+    def poll(self):
+        return self.table.replace(self._read()) or self.links_changed
+
+# ------------------------------- Watcher --------------------------- #
+
+BACKENDS = {
+    'netlink': NetlinkBackend,
+    'polling': PollingBackend
+}
+
+def create_backend(table, preferred='netlink'):
+    order = [preferred] + [name for name in BACKENDS if name != preferred]
+    for name in order:
+        try:
+            backend = BACKENDS[name](table)
+            backend.load()
+            return backend
+        except OSError as e:
+            logging.warning(f"Address backend '{name}' unavailable: {str(e)}")
+    raise RuntimeError('No interface address backend available')
@@ -0,0 +1,472 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Status daemon for the TARGET, VPN, ETHERNET panel widgets
+
+import os
+import sys
+import time
+import errno
+import fcntl
+import signal
+import logging
+import argparse
+import selectors
+import socket
+import configparser
+
+import genmon
+import netwatch
+import clipboard
+import targets
+
+BIN_DIR = os.path.dirname(os.path.realpath(__file__))
+STATUS_DIR = os.path.join(BIN_DIR, 'status')
+PID_FILE = targets.PID_FILE
+CONFIG_FILE = os.path.join(BIN_DIR, 'statusd.conf')
+
+# ------------------------------- Scheduler --------------------------- #
+
+class Schedule:
+
+    def __init__(self, min_period, max_period, factor=2.0):
+        self.min_period = min_period
+        self.max_period = max(min_period, max_period)
+        self.factor = factor
+        self.period = min_period
+        self.next_due = 0.0
+
+    def due(self, now):
+        return now >= self.next_due
+
+    def reset(self, now):
+        self.period = self.min_period
+        self.next_due = now + self.period
+
+    def advance(self, now, changed):
+        if changed:
+            self.period = self.min_period
+        else:
+            self.period = min(self.period * self.factor, self.max_period)
+        self.next_due = now + self.period
+
+def load_config(path=CONFIG_FILE):
+    config = configparser.ConfigParser()
+    try:
+        config.read(path, encoding='utf-8')
+    except configparser.Error as e:
+        logging.warning(f"Ignoring invalid {path}: {str(e)}")
+    return config
+
+# ------------------------------- Widgets --------------------------- #
+
+FAMILIES = {
+    'any': (socket.AF_INET, socket.AF_INET6),
+    'ipv4': (socket.AF_INET,),
+    'ipv6': (socket.AF_INET6,)
+}
+
+class Widget:
+    name = ''
+    icon = ''
+    empty_text = ''
+    network = False
+    min_period = 0.25
+    max_period = 10.0
+
+    def __init__(self, clipboard, table):
+        self.clipboard = clipboard
+        self.table = table
+        self.path = os.path.join(STATUS_DIR, f'{self.name}.xml')
+        self.last_value = None
+        self.last_output = None
+        self.show = 'primary'
+        self.families = FAMILIES['any']
+        self.seen = None
+        self.schedule = Schedule(self.min_period, self.max_period)
+
+    def _number(self, section, key, default, minimum=0.0):
+        # A typo in statusd.conf must not kill the daemon and leave the panel stale
+        value = section.get(key)
+        if value is None:
+            return default
+        try:
+            number = float(value)
+        except ValueError:
+            number = None
+        if number is None or not (0 < number < float('inf') and number >= minimum):
+            logging.warning(f"Invalid {key} = {value!r} in [{self.name}] of statusd.conf, using {default}")
+            return default
+        return number
+
+    def configure(self, config, min_period=None, max_period=None):
+        section = config[self.name] if config.has_section(self.name) else {}
+        self.show = section.get('show', 'primary')
+        self.families = FAMILIES.get(section.get('family', 'any'), FAMILIES['any'])
+        low = min_period or self._number(section, 'min_period', self.min_period)
+        high = max_period or self._number(section, 'max_period', self.max_period)
+        if high < low:
+            logging.warning(f"max_period {high} is below min_period {low} in [{self.name}] of statusd.conf, "
+                            f"using {max(self.max_period, low)}")
+            high = max(self.max_period, low)
+        self.schedule = Schedule(low, high, self._number(section, 'backoff', 2.0, minimum=1.0))
+
+    def collect_interfaces(self, names):
+        # Text, copy address and tooltip are built here once per table change,
+        # refresh() skips the whole collection while the generations are unchanged
+        primaries = []
+        details = []
+        for name in names:
+            entry = self.table.primary(name, self.families)
+            if entry is None:
+                continue
+            primaries.append((name, entry.address))
+            details.extend(f"{name}  {address.describe()}" for address in sorted(
+                self.table.entries(name), key=lambda address: (address.family, address.rank)))
+        if not primaries:
+            return None
+        ip = primaries[0][1]
+        if self.show == 'all' and len(primaries) > 1:
+            text = ' | '.join(f"{name} {address}" for name, address in primaries)
+        else:
+            text = ip
+        return text, ip, '\n'.join(details)
+
+    def render(self, value):
+        if not value:
+            return f"<icon>{self.icon}</icon><txt>{self.empty_text}</txt>"
+        text, ip = value[:2]
+        details = f"{value[2]}\n" if len(value) > 2 else 'VPN IP '
+        output = f"<icon>{self.icon}</icon><txt>{text}</txt>"
+        click = self.clipboard.command(ip) if self.clipboard.available else None
+        if click:
+            output += f"<txtclick>{click}</txtclick>"
+            output += f"<tool>{details}(click to copy)</tool>"
+        else:
+            output += f"<tool>{details}(install xclip to copy to clipboard)</tool>"
+        return output
+
+    def refresh(self):
+        if self.network:
+            generation = (self.table.generation, self.table.links.generation)
+            if generation == self.seen and self.last_output is not None:
+                return False
+            self.seen = generation
+        value = self.collect()
+        if value == self.last_value and self.last_output is not None:
+            return False
+        self.last_value = value
+        output = self.render(value)
+        if output == self.last_output:
+            return False
+        self.last_output = output
+        return True
+
+    def update(self):
+        if not self.refresh():
+            return False
+        write_atomic(self.path, self.last_output)
+        return True
+
+class TargetWidget(Widget):
+    name = 'target'
+    icon = 'mark-location'
+    empty_text = 'Sin Objetivo'
+    max_period = 30.0
+
+    def __init__(self, clipboard, table, store):
+        self.store = store
+        super().__init__(clipboard, table)
+
+    def collect(self):
+        target = self.store.get()
+        if target is None:
+            return None
+        ip_address, machine_name = target
+        return f"{ip_address} - {machine_name}", ip_address
+
+class VpnWidget(Widget):
+    name = 'vpn'
+    icon = 'draw-cuboid'
+    empty_text = 'Desconectado'
+    network = True
+
+    def collect(self):
+        return self.collect_interfaces(self.table.links.of_kind(*netwatch.VPN_KINDS))
+
+class EthernetWidget(Widget):
+    name = 'ethernet'
+    icon = 'network-vpn-symbolic'
+    empty_text = 'Sin Internet'
+    network = True
+
+    def __init__(self, clipboard, table, interface='auto'):
+        self.interface = interface
+        super().__init__(clipboard, table)
+
+    def interfaces(self):
+        if self.interface != 'auto':
+            return [self.interface]
+        return self.table.links.of_kind(*netwatch.LAN_KINDS)
+
+    def collect(self):
+        return self.collect_interfaces(self.interfaces())
+
+class CombinedWidget:
+    name = 'combined'
+    icon = 'mark-location'
+    separator = '  |  '
+
+    def __init__(self, clipboard, widgets):
+        self.clipboard = clipboard
+        self.widgets = widgets
+        self.path = os.path.join(STATUS_DIR, f'{self.name}.xml')
+        self.last_output = None
+
+    def _ip(self, *names):
+        for widget in self.widgets:
+            if widget.name in names and widget.last_value:
+                return widget.last_value[1]
+        return None
+
+    def render(self, empty=False):
+        # genmon has a single <txtclick> and <iconclick> per plugin: the text copies
+        # the target (or the first address shown), the icon copies the VPN address
+        segments, lines = [], []
+        for widget in self.widgets:
+            value = None if empty else widget.last_value
+            segments.append(value[0] if value else widget.empty_text)
+            lines.append(f"{widget.name.upper()}: {value[0] if value else widget.empty_text}")
+        output = f"<icon>{self.icon}</icon><txt>{self.separator.join(segments)}</txt>"
+        text_ip = None if empty else self._ip('target', 'vpn', 'ethernet')
+        icon_ip = None if empty else self._ip('vpn', 'ethernet')
+        text_click = self.clipboard.command(text_ip) if self.clipboard.available and text_ip else None
+        icon_click = self.clipboard.command(icon_ip) if self.clipboard.available and icon_ip else None
+        if text_click:
+            output += f"<txtclick>{text_click}</txtclick>"
+            lines.append(f"Click text to copy {text_ip}")
+        if icon_click:
+            output += f"<iconclick>{icon_click}</iconclick>"
+            lines.append(f"Click icon to copy {icon_ip}")
+        if not self.clipboard.available and (text_ip or icon_ip):
+            lines.append("Install xclip to copy to clipboard")
+        return output + f"<tool>{chr(10).join(lines)}</tool>"
+
+    def update(self):
+        output = self.render()
+        if output == self.last_output:
+            return False
+        write_atomic(self.path, output)
+        self.last_output = output
+        return True
+
+# ------------------------------- Daemon --------------------------- #
+
+def write_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class StatusDaemon:
+
+    def __init__(self, interval=None, ethernet='auto', backend='netlink', max_interval=None, config=None,
+                 layout='split'):
+        self.table = netwatch.AddressTable()
+        self.backend = netwatch.create_backend(self.table, backend)
+        self.store = targets.TargetStore()
+        self.clipboard = clipboard.ClipboardServer()
+        self.widgets = [
+            TargetWidget(self.clipboard, self.table, self.store),
+            VpnWidget(self.clipboard, self.table),
+            EthernetWidget(self.clipboard, self.table, ethernet)
+        ]
+        self.combined = CombinedWidget(self.clipboard, self.widgets) if layout == 'combined' else None
+        config = config if config is not None else load_config()
+        for widget in self.widgets:
+            widget.configure(config, interval, max_interval)
+        self.notifier = genmon.PanelNotifier()
+        self.running = False
+        self.refresh_requested = False
+        self.selector = selectors.DefaultSelector()
+
+    def _handle_signal(self, signum, frame):
+        if signum == signal.SIGUSR1:
+            self.refresh_requested = True
+        else:
+            self.running = False
+
+    def _acquire_pidfile(self):
+        self.pid_fd = os.open(PID_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self.pid_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as e:
+            if e.errno in (errno.EAGAIN, errno.EACCES):
+                return False
+            raise
+        os.ftruncate(self.pid_fd, 0)
+        os.write(self.pid_fd, f"{os.getpid()}\n".encode())
+        return True
+
+    def setup(self):
+        os.makedirs(STATUS_DIR, exist_ok=True)
+        if not self._acquire_pidfile():
+            logging.error("Another status daemon is already running")
+            return False
+
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        signal.set_wakeup_fd(self.wakeup_w, warn_on_full_buffer=False)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR1):
+            signal.signal(signum, self._handle_signal)
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ)
+        if self.backend.fileno() is not None:
+            self.selector.register(self.backend.fileno(), selectors.EVENT_READ)
+        if self.store.fileno() is not None:
+            self.selector.register(self.store.fileno(), selectors.EVENT_READ)
+        try:
+            if self.clipboard.listen() is not None:
+                self.selector.register(self.clipboard.fileno(), selectors.EVENT_READ)
+        except OSError as e:
+            logging.warning(f"Clipboard socket unavailable, clicks use xclip directly: {str(e)}")
+        return True
+
+    def update(self, network_changed=True, local_changed=True):
+        changed = False
+        for widget in self.widgets:
+            if not (network_changed if widget.network else local_changed):
+                continue
+            changed |= self.update_widget(widget)
+        self.flush(changed)
+
+    def update_widget(self, widget):
+        try:
+            changed = widget.update() if self.combined is None else widget.refresh()
+        except Exception as e:
+            logging.warning(f"Error updating {widget.name} widget: {str(e)}")
+            return False
+        if changed and self.combined is None:
+            self.notifier.refresh(widget.name)
+        return changed
+
+    def flush(self, changed):
+        # In the combined layout one collection pass ends in a single write and redraw
+        if self.combined is None or not changed:
+            return
+        try:
+            if self.combined.update():
+                self.notifier.refresh(self.combined.name)
+        except OSError as e:
+            logging.warning(f"Error updating combined widget: {str(e)}")
+
+    def snap(self, now, network=True, local=True):
+        for widget in self.widgets:
+            if network if widget.network else local:
+                widget.schedule.reset(now)
+
+    def poll_due(self, now):
+        due = [w for w in self.widgets if w.schedule.due(now)]
+        if not due:
+            return
+        if any(w.network for w in due):
+            self.backend.poll()
+        if any(not w.network for w in due):
+            self.store.poll()
+        changed = False
+        for widget in due:
+            widget_changed = self.update_widget(widget)
+            widget.schedule.advance(now, widget_changed)
+            changed |= widget_changed
+        self.flush(changed)
+
+    def _drain_wakeup(self):
+        try:
+            while os.read(self.wakeup_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def run(self):
+        if not self.setup():
+            return False
+        self.running = True
+        self.update()
+        self.snap(time.monotonic())
+        try:
+            while self.running:
+                now = time.monotonic()
+                if self.refresh_requested:
+                    self.refresh_requested = False
+                    self.notifier.reload()
+                    self.store.refresh()
+                    self.backend.poll()
+                    self.update()
+                    self.snap(now)
+                else:
+                    self.poll_due(now)
+                timeout = min(w.schedule.next_due for w in self.widgets) - time.monotonic()
+                for key, _ in self.selector.select(max(0, timeout)):
+                    now = time.monotonic()
+                    if key.fd == self.wakeup_r:
+                        self._drain_wakeup()
+                    elif key.fd == self.clipboard.fileno():
+                        self.clipboard.handle_events()
+                    elif key.fd == self.store.fileno():
+                        if self.store.handle_events():
+                            self.update(network_changed=False)
+                            self.snap(now, network=False)
+                    elif self.backend.handle_events():
+                        self.update(local_changed=False)
+                        self.snap(now, local=False)
+        finally:
+            self.shutdown()
+        return True
+
+    def shutdown(self):
+        if self.combined is not None:
+            outputs = [(self.combined, self.combined.render(empty=True))]
+        else:
+            outputs = [(widget, widget.render(None)) for widget in self.widgets]
+        for widget, output in outputs:
+            try:
+                write_atomic(widget.path, output)
+                self.notifier.refresh(widget.name)
+            except OSError:
+                pass
+        try:
+            os.remove(PID_FILE)
+        except OSError:
+            pass
+        self.backend.close()
+        self.store.close()
+        self.notifier.close()
+        self.clipboard.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='KaliWidget status daemon')
+    parser.add_argument('--interval', type=float, help='Fastest polling period in seconds for every widget')
+    parser.add_argument('--max-interval', type=float, help='Slowest polling period in seconds for every widget')
+    parser.add_argument('--ethernet', default='auto',
+                        help="Interface shown by the Ethernet widget ('auto' picks the primary wired or wifi link)")
+    parser.add_argument('--backend', choices=sorted(netwatch.BACKENDS), default='netlink',
+                        help='Interface address backend (falls back automatically)')
+    parser.add_argument('--layout', choices=['split', 'combined'], default='split',
+                        help='One genmon output per widget, or a single combined output')
+    parser.add_argument('--once', action='store_true', help='Collect once, write the widget files and exit')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    daemon = StatusDaemon(interval=args.interval, ethernet=args.ethernet, backend=args.backend,
+                          max_interval=args.max_interval, layout=args.layout)
+    if args.once:
+        os.makedirs(STATUS_DIR, exist_ok=True)
+        daemon.update()
+        return 0
+    return 0 if daemon.run() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
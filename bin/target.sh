@@ -1,9 +1,9 @@
 #!/bin/bash
  
 ip_address=$(cat $HOME/.config/bin/target/target.txt | awk '{print $1}')
-machine_name=$(cat $HOME/.config/bin/target/target.txt | awk '{print $2}')
+machine_name=$(cat $HOME/.config/bin/target/target.txt | cut -s -d' ' -f2-)
  
-if [ $ip_address ] && [ $machine_name ]; then
+if [ "$ip_address" ] && [ "$machine_name" ]; then
     printf "<icon>mark-location</icon>"
     printf "<txt>$ip_address - $machine_name</txt>"
   if command -v xclip; then
@@ -0,0 +1,410 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Author: Jordan aka SkyW4r33x
+# Repository: https://github.com/tuusuario/KaliWidget
+# Description: Cached target store and multi-target registry for the TARGET widget
+
+import os
+import time
+import signal
+import json
+import fcntl
+import errno
+import bisect
+import struct
+import logging
+from collections import OrderedDict
+
+BIN_DIR = os.path.dirname(os.path.realpath(__file__))
+TARGET_DIR = os.path.join(BIN_DIR, 'target')
+TARGET_FILE = os.path.join(TARGET_DIR, 'target.txt')
+REGISTRY_FILE = os.path.join(TARGET_DIR, 'targets.log')
+PID_FILE = os.path.join(BIN_DIR, 'status', 'statusd.pid')
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+INOTIFY_EVENT = struct.Struct('iIII')
+
+def parse_target(content):
+    # Everything after the address is the name, which may hold spaces
+    parts = content.split(None, 1)
+    if len(parts) < 2:
+        return None
+    return parts[0], parts[1].strip()
+
+# ------------------------------- Daemon Signal --------------------------- #
+
+# Kept here rather than in statusd so the shell commands never import the daemon stack
+def read_pid():
+    try:
+        with open(PID_FILE, 'r') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def signal_daemon(signum=signal.SIGUSR1):
+    pid = read_pid()
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, signum)
+        return True
+    except OSError:
+        return False
+
+# ------------------------------- Inotify --------------------------- #
+
+class Inotify:
+
+    def __init__(self, directory, mask):
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, os.strerror(err), directory)
+
+    def fileno(self):
+        return self.fd
+
+    def read_events(self):
+        # Masks are merged per name, a batch can hold several events for one file
+        events = {}
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + INOTIFY_EVENT.size <= len(data):
+                _, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = data[offset:offset + length].split(b'\0', 1)[0].decode(errors='replace')
+                events[name] = events.get(name, 0) | mask
+                offset += length
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+# ------------------------------- Target Store --------------------------- #
+
+class TargetStore:
+
+    def __init__(self, path=TARGET_FILE, use_inotify=True):
+        self.path = path
+        self.signature = None
+        self.pending = None
+        self.target = None
+        self.reads = 0
+        self.inotify = None
+        if use_inotify:
+            try:
+                self.inotify = Inotify(os.path.dirname(path), IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM |
+                                       IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+            except (OSError, AttributeError) as e:
+                logging.info(f"inotify unavailable for {path}, polling instead: {str(e)}")
+        self.refresh()
+
+    def fileno(self):
+        return self.inotify.fileno() if self.inotify else None
+
+    def close(self):
+        if self.inotify:
+            self.inotify.close()
+            self.inotify = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                logging.warning(f"Cannot stat {self.path}: {str(e)}")
+            return None
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    def refresh(self, complete=False):
+        signature = self._stat()
+        if signature == self.signature:
+            return False
+        if signature is None:
+            self.signature = None
+            self.pending = None
+            return self._set(None)
+
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read(4096)
+        except OSError:
+            return False
+        self.reads += 1
+
+        # A timer-driven read may catch a writer mid-way: wait for the trailing newline, or accept
+        # the content once it has stayed unchanged for a whole check. A close or rename means
+        # the writer is done, so that content is taken as is (printf and echo -n omit the newline)
+        if not complete and content and not content.endswith('\n') and self.pending != signature:
+            self.pending = signature
+            return False
+        self.pending = None
+        self.signature = signature
+        return self._set(parse_target(content))
+
+    def _set(self, target):
+        if target == self.target:
+            return False
+        self.target = target
+        return True
+
+    def handle_events(self):
+        events = self.inotify.read_events() if self.inotify else {}
+        mask = events.get(os.path.basename(self.path), 0) | events.get('', 0)
+        if not mask:
+            return False
+        return self.refresh(complete=bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO)))
+
+    def poll(self):
+        if self.inotify and self.pending is None:
+            return False
+        return self.refresh()
+
+    def get(self):
+        return self.target
+
+# ------------------------------- Target Registry --------------------------- #
+
+def write_target(path, ip, name):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f"{ip} {name}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+def clear_target(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+class TargetRegistry:
+
+    # Records the log may hold past the snapshot before it is folded in
+    LOG_LIMIT = 256
+
+    def __init__(self, path=REGISTRY_FILE, target_file=TARGET_FILE, snapshot=None):
+        self.path = path
+        self.target_file = target_file
+        self.snapshot = snapshot or os.path.splitext(path)[0] + '.json'
+        self.entries = {}
+        self.recent = OrderedDict()
+        self._by_name = None
+        self._names = None
+        self.records = 0
+        self._load()
+
+    def _load(self):
+        # The shared lock keeps a compaction from swapping the snapshot between the two reads
+        try:
+            log = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            self._read(None)
+            return
+        with log:
+            fcntl.flock(log, fcntl.LOCK_SH)
+            self._read(log)
+
+    def _read(self, log):
+        # Snapshot plus a short log tail; the name index is only built if a lookup needs it
+        self.entries, self.recent = {}, OrderedDict()
+        self._by_name = self._names = None
+        self.records = 0
+        try:
+            with open(self.snapshot, 'r', encoding='utf-8') as f:
+                flat = json.load(f)['entries']
+            fields = iter(flat)
+            self.entries = {ip: {'ip': ip, 'name': name, 'used': used} for ip, name, used in zip(fields, fields, fields)}
+            self.recent = OrderedDict.fromkeys(self.entries)
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Ignoring unreadable target snapshot {self.snapshot}: {str(e)}")
+            self.entries, self.recent = {}, OrderedDict()
+        for line in log or ():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                # A torn last line from an interrupted append is skipped
+                continue
+            self.records += 1
+
+    def _apply(self, record):
+        op, ip = record['op'], record['ip']
+        if op == 'add':
+            name = record['name']
+            old = self.entries.get(ip)
+            if old is not None:
+                self._unindex_name(old['name'], ip)
+            self.entries[ip] = {'ip': ip, 'name': name, 'used': record.get('ts', 0)}
+            self._index_name(name, ip)
+            self.recent[ip] = None
+            self.recent.move_to_end(ip)
+        elif op == 'use' and ip in self.entries:
+            self.entries[ip]['used'] = record.get('ts', 0)
+            self.recent.move_to_end(ip)
+        elif op == 'remove' and ip in self.entries:
+            entry = self.entries.pop(ip)
+            self._unindex_name(entry['name'], ip)
+            self.recent.pop(ip, None)
+
+    def _build_index(self):
+        self._by_name = {}
+        for ip in self.recent:
+            self._by_name.setdefault(self.entries[ip]['name'].lower(), set()).add(ip)
+        self._names = sorted(self._by_name)
+
+    @property
+    def by_name(self):
+        if self._by_name is None:
+            self._build_index()
+        return self._by_name
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._build_index()
+        return self._names
+
+    def _index_name(self, name, ip):
+        if self._by_name is None:
+            return
+        key = name.lower()
+        if key not in self.by_name:
+            bisect.insort(self.names, key)
+            self.by_name[key] = set()
+        self.by_name[key].add(ip)
+
+    def _unindex_name(self, name, ip):
+        # Several targets may share a name, the key goes only with the last of them
+        if self._by_name is None:
+            return
+        key = name.lower()
+        ips = self.by_name.get(key)
+        if not ips:
+            return
+        ips.discard(ip)
+        if ips:
+            return
+        del self.by_name[key]
+        index = bisect.bisect_left(self.names, key)
+        if index < len(self.names) and self.names[index] == key:
+            del self.names[index]
+
+    def _record(self, op, ip, **fields):
+        record = {'op': op, 'ip': ip, 'ts': time.time(), **fields}
+        self._apply(record)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(json.dumps(record) + '\n')
+        self.records += 1
+        if self.records > self.LOG_LIMIT:
+            self.compact()
+
+    def compact(self):
+        # Other processes may have appended since this one loaded, so the state is read
+        # again under the lock and nothing lands between that read and the truncate
+        with open(self.path, 'a+', encoding='utf-8') as log:
+            fcntl.flock(log, fcntl.LOCK_EX)
+            log.seek(0)
+            self._read(log)
+            flat = []
+            for ip in self.recent:
+                flat.extend((ip, self.entries[ip]['name'], self.entries[ip]['used']))
+            tmp_path = f"{self.snapshot}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': flat}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.snapshot)
+            # Replaying records the snapshot already holds is harmless, so a crash here loses nothing
+            log.truncate(0)
+            self.records = 0
+
+    def matches(self, key, limit=20):
+        if key in self.entries:
+            return [self.entries[key]]
+        ips = self.by_name.get(key.lower())
+        if ips:
+            return [self.entries[ip] for ip in sorted(ips)][:limit]
+        return self.find(key, limit)
+
+    def resolve(self, key):
+        matches = self.matches(key, limit=2)
+        return matches[0] if len(matches) == 1 else None
+
+    def find(self, prefix, limit=20):
+        prefix = prefix.lower()
+        matches = []
+        index = bisect.bisect_left(self.names, prefix)
+        while index < len(self.names) and self.names[index].startswith(prefix) and len(matches) < limit:
+            matches.extend(self.entries[ip] for ip in sorted(self.by_name[self.names[index]]))
+            index += 1
+        return matches[:limit]
+
+    def recent_entries(self, limit=20):
+        result = []
+        for ip in reversed(self.recent):
+            if len(result) >= limit:
+                break
+            result.append(self.entries[ip])
+        return result
+
+    def add(self, ip, name):
+        self._record('add', ip, name=name)
+        return self.entries[ip]
+
+    def use(self, key):
+        entry = self.resolve(key)
+        if entry is None:
+            return None
+        write_target(self.target_file, entry['ip'], entry['name'])
+        self._record('use', entry['ip'])
+        return entry
+
+    def remove(self, key):
+        entry = self.resolve(key)
+        if entry is None:
+            return None
+        self._record('remove', entry['ip'])
+        return entry
+
+    def active(self):
+        try:
+            with open(self.target_file, 'r', encoding='utf-8') as f:
+                return parse_target(f.read(4096))
+        except OSError:
+            return None
@@ -12,10 +12,27 @@ import sys
 import shutil
 import time
 from pathlib import Path
+from xml.sax.saxutils import escape
 import logging
 import getpass
 import re
 import pwd
+import signal
+import select
+import asyncio
+import threading
+import io
+import json
+import glob
+import pickle
+import tempfile
+import hashlib
+import argparse
+import configparser
+import contextlib
+import importlib.util
+import xml.etree.ElementTree as ET
+import concurrent.futures
 
 # ------------------------------- Kali Style Class --------------------------- #
 
@@ -39,30 +56,1376 @@ class KaliStyle:
     INFO = f"{BLUE}{BOLD}[i]{RESET}"
     WARNING = f"{YELLOW}{BOLD}[!]{RESET}"
 
-# ------------------------------- XFCE Installer Class --------------------------- #
+# ------------------------------- Command Engine Class --------------------------- #
 
-class XfceInstaller:
+class SerialEngine:
+    name = 'serial'
+    max_concurrency = 1
+
+    def run(self, command, shell=False, input=None, capture=True, timeout=None):
+        return subprocess.run(command, shell=shell, check=True, input=input,
+                              stdout=subprocess.PIPE if capture else None,
+                              stderr=subprocess.PIPE if capture else None,
+                              text=True, timeout=timeout)
+
+    def run_many(self, commands, capture=True, timeout=None):
+        outcomes = []
+        for command in commands:
+            start, begin = time.time(), time.perf_counter()
+            try:
+                result = self.run(command, capture=capture, timeout=timeout)
+            except (subprocess.SubprocessError, OSError) as e:
+                result = e
+            outcomes.append((result, start, time.perf_counter() - begin))
+        return outcomes
+
+class AsyncEngine:
+    name = 'async'
+    TERM_GRACE = 2
+
+    def __init__(self, max_concurrency=4):
+        self.max_concurrency = max_concurrency
+
+    @classmethod
+    async def _terminate(cls, proc):
+        # Children run in their own session, so the whole group goes, not only the direct child
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(proc.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                await asyncio.wait_for(proc.wait(), cls.TERM_GRACE)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+    async def _spawn(self, command, shell=False, input=None, capture=True, timeout=None):
+        pipe = asyncio.subprocess.PIPE if capture else None
+        kwargs = {'stdin': asyncio.subprocess.PIPE if input is not None else None,
+                  'stdout': pipe, 'stderr': pipe, 'start_new_session': True}
+        if shell:
+            proc = await asyncio.create_subprocess_shell(command, **kwargs)
+        else:
+            proc = await asyncio.create_subprocess_exec(*command, **kwargs)
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(input.encode() if input is not None else None), timeout)
+        except asyncio.TimeoutError:
+            await self._terminate(proc)
+            raise subprocess.TimeoutExpired(command, timeout)
+        except asyncio.CancelledError:
+            await self._terminate(proc)
+            raise
+        stdout = stdout.decode('utf-8', errors='replace') if stdout is not None else None
+        stderr = stderr.decode('utf-8', errors='replace') if stderr is not None else None
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, command, stdout, stderr)
+        return subprocess.CompletedProcess(command, proc.returncode, stdout, stderr)
+
+    def run(self, command, shell=False, input=None, capture=True, timeout=None):
+        return asyncio.run(self._spawn(command, shell, input, capture, timeout))
+
+    async def _gather(self, commands, capture, timeout):
+        semaphore = asyncio.BoundedSemaphore(self.max_concurrency)
+
+        async def one(command):
+            async with semaphore:
+                start, begin = time.time(), time.perf_counter()
+                try:
+                    result = await self._spawn(command, capture=capture, timeout=timeout)
+                except (subprocess.SubprocessError, OSError) as e:
+                    result = e
+                return result, start, time.perf_counter() - begin
+
+        return await asyncio.gather(*(one(command) for command in commands))
+
+    def run_many(self, commands, capture=True, timeout=None):
+        return asyncio.run(self._gather(commands, capture, timeout))
+
+ENGINES = {
+    'serial': SerialEngine,
+    'async': AsyncEngine
+}
+
+# ------------------------------- Xfconf Client Class --------------------------- #
+
+PANEL_IDS_RE = re.compile(r'^/panels/panel-(\d+)/plugin-ids$')
+
+class CliXfconfBackend:
+    name = 'cli'
+
+    def __init__(self, run_command, run_commands=None):
+        self.run_command = run_command
+        self.run_commands = run_commands
+        self.calls = 0
+
+    def _query(self, channel, args):
+        self.calls += 1
+        return self.run_command(['xfconf-query', '-c', channel] + args)
+
+    def _query_many(self, channel, arg_lists):
+        self.calls += len(arg_lists)
+        commands = [['xfconf-query', '-c', channel] + args for args in arg_lists]
+        if self.run_commands is None or len(commands) < 2:
+            return [self.run_command(command) for command in commands]
+        return self.run_commands(commands)
+
+    def _get_array(self, channel, path):
+        success, output = self._query(channel, ['-p', path])
+        if not success:
+            return None
+        return [int(l.strip()) for l in output.splitlines() if l.strip().isdigit()]
+
+    def get_all(self, channel):
+        success, output = self._query(channel, ['-l', '-v'])
+        if not success:
+            return None
+
+        properties = {}
+        for line in output.splitlines():
+            parts = line.split(maxsplit=1)
+            if parts:
+                properties[parts[0]] = parts[1].strip() if len(parts) == 2 else ''
+
+        # -l -v cannot print arrays faithfully, so the few arrays we edit are read once here
+        properties.pop('/panels', None)
+        panels = self._get_array(channel, '/panels')
+        if panels is not None:
+            properties['/panels'] = panels
+            paths = [f'/panels/panel-{p}/plugin-ids' for p in panels]
+            for path, (success, output) in zip(paths, self._query_many(channel, [['-p', path] for path in paths])):
+                if success:
+                    properties[path] = [int(l.strip()) for l in output.splitlines() if l.strip().isdigit()]
+        return properties
+
+    @staticmethod
+    def _set_args(prop, type_, value):
+        if type_ == 'bool':
+            value = 'true' if value else 'false'
+        return ['-p', prop, '-t', type_, '-s', str(value), '--create']
+
+    def set(self, channel, prop, type_, value):
+        success, _ = self._query(channel, self._set_args(prop, type_, value))
+        return success
+
+    def set_many(self, channel, changes):
+        return [success for success, _ in self._query_many(channel, [self._set_args(*c) for c in changes])]
+
+    def set_array(self, channel, prop, type_, values):
+        args = ['-p', prop, '--create', '-a']
+        for value in values:
+            args += ['-t', type_, '-s', str(value)]
+        success, _ = self._query(channel, args)
+        if not success:
+            self._query(channel, ['-p', prop, '-r'])
+            success, _ = self._query(channel, args)
+        return success
+
+    def reset(self, channel, prop, recursive=False):
+        success, _ = self._query(channel, ['-p', prop, '-r'] + (['-R'] if recursive else []))
+        return success
+
+    def reset_many(self, channel, resets):
+        arg_lists = [['-p', prop, '-r'] + (['-R'] if recursive else []) for prop, recursive in resets]
+        return [success for success, _ in self._query_many(channel, arg_lists)]
+
+class DbusXfconfBackend:
+    name = 'dbus'
+    VARIANT_TYPES = {'int': 'i', 'uint': 'u', 'string': 's', 'bool': 'b', 'double': 'd'}
+
+    def __init__(self, connection=None, Gio=None, GLib=None):
+        # connection and the bindings are injectable so the backend runs against a mock bus
+        if Gio is None or GLib is None:
+            from gi.repository import Gio, GLib
+        self.Gio = Gio
+        self.GLib = GLib
+        self.connection = connection or Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        self.calls = 0
+
+    def _call(self, method, params, reply_type=None):
+        self.calls += 1
+        return self.connection.call_sync('org.xfce.Xfconf', '/org/xfce/Xfconf', 'org.xfce.Xfconf',
+                                         method, params, reply_type, self.Gio.DBusCallFlags.NONE, 5000, None)
+
+    def _variant(self, type_, value):
+        return self.GLib.Variant(self.VARIANT_TYPES[type_], value)
+
+    def get_all(self, channel):
+        try:
+            reply = self._call('GetAllProperties', self.GLib.Variant('(ss)', (channel, '/')),
+                               self.GLib.VariantType.new('(a{sv})'))
+        except self.GLib.Error as e:
+            logging.warning(f"Xfconf GetAllProperties failed: {e}")
+            return None
+        return reply.unpack()[0]
+
+    def set(self, channel, prop, type_, value):
+        try:
+            self._call('SetProperty', self.GLib.Variant('(ssv)', (channel, prop, self._variant(type_, value))))
+            return True
+        except self.GLib.Error as e:
+            logging.error(f"Xfconf SetProperty {prop} failed: {e}")
+            return False
+
+    def set_array(self, channel, prop, type_, values):
+        array = self.GLib.Variant('av', [self._variant(type_, v) for v in values])
+        try:
+            self._call('SetProperty', self.GLib.Variant('(ssv)', (channel, prop, array)))
+            return True
+        except self.GLib.Error as e:
+            logging.error(f"Xfconf SetProperty {prop} failed: {e}")
+            return False
+
+    def reset(self, channel, prop, recursive=False):
+        try:
+            self._call('ResetProperty', self.GLib.Variant('(ssb)', (channel, prop, recursive)))
+            return True
+        except self.GLib.Error as e:
+            logging.error(f"Xfconf ResetProperty {prop} failed: {e}")
+            return False
+
+    def set_many(self, channel, changes):
+        return [self.set(channel, *change) for change in changes]
+
+    def reset_many(self, channel, resets):
+        return [self.reset(channel, prop, recursive) for prop, recursive in resets]
+
+class XmlXfconfBackend:
+    # Offline fast path: the channel file itself, for images, chroots and sessions without xfconfd
+    name = 'xml'
+    CHANNEL_DIR = '.config/xfce4/xfconf/xfce-perchannel-xml'
+    DEFAULTS_DIR = 'etc/xdg/xfce4/xfconf/xfce-perchannel-xml'
+
+    def __init__(self, home, root='/'):
+        self.home = home
+        self.root = root
+        self.channels = {}
+        self.dirty = set()
+        self.calls = 0
+
+    def path(self, channel):
+        return os.path.join(self.home, self.CHANNEL_DIR, f'{channel}.xml')
+
+    def _parse(self, path):
+        properties = {}
+        stack = []
+        for event, element in ET.iterparse(path, events=('start', 'end')):
+            if element.tag == 'property':
+                if event == 'start':
+                    stack.append(element.get('name'))
+                    prop = '/' + '/'.join(stack)
+                    type_ = element.get('type', 'empty')
+                    properties[prop] = (type_, [] if type_ == 'array' else element.get('value'))
+                else:
+                    stack.pop()
+                    element.clear()
+            elif element.tag == 'value' and event == 'start' and stack:
+                properties['/' + '/'.join(stack)][1].append((element.get('type'), element.get('value')))
+        return properties
+
+    def _channel(self, channel):
+        if channel not in self.channels:
+            self.calls += 1
+            # A user without a channel file gets the system default panel on first login
+            for path in (self.path(channel), os.path.join(self.root, self.DEFAULTS_DIR, f'{channel}.xml')):
+                try:
+                    self.channels[channel] = self._parse(path)
+                    break
+                except FileNotFoundError:
+                    continue
+                except ET.ParseError as e:
+                    logging.warning(f"Ignoring unreadable channel file {path}: {str(e)}")
+                    continue
+            else:
+                self.channels[channel] = {}
+        return self.channels[channel]
+
+    @staticmethod
+    def _value(type_, value):
+        if type_ in ('int', 'uint'):
+            return int(value)
+        if type_ == 'bool':
+            return value == 'true'
+        return value
+
+    def get_all(self, channel):
+        properties = {}
+        for prop, (type_, value) in self._channel(channel).items():
+            if type_ == 'array':
+                properties[prop] = [self._value(t, v) for t, v in value]
+            elif type_ != 'empty':
+                properties[prop] = self._value(type_, value)
+        return properties
+
+    @staticmethod
+    def _text(type_, value):
+        if type_ == 'bool':
+            return 'true' if value else 'false'
+        return str(value)
+
+    def set(self, channel, prop, type_, value):
+        self._channel(channel)[prop] = (type_, self._text(type_, value))
+        self.dirty.add(channel)
+        return True
+
+    def set_array(self, channel, prop, type_, values):
+        self._channel(channel)[prop] = ('array', [(type_, self._text(type_, v)) for v in values])
+        self.dirty.add(channel)
+        return True
+
+    def reset(self, channel, prop, recursive=False):
+        properties = self._channel(channel)
+        matches = [p for p in properties if p == prop or (recursive and p.startswith(prop + '/'))]
+        for p in matches:
+            del properties[p]
+        self.dirty.add(channel)
+        return True
+
+    def set_many(self, channel, changes):
+        return [self.set(channel, *change) for change in changes]
+
+    def reset_many(self, channel, resets):
+        return [self.reset(channel, prop, recursive) for prop, recursive in resets]
+
+    @staticmethod
+    def _attr(value):
+        # xfconfd always double-quotes, so files written here diff cleanly against its own
+        return '"' + escape(value, {'"': '&quot;'}) + '"'
+
+    def _render(self, channel):
+        # Document order is kept, so an edit only touches the lines it changes
+        tree = {}
+        for prop, entry in self.channels[channel].items():
+            names = prop.strip('/').split('/')
+            node = tree
+            for name in names[:-1]:
+                node = node.setdefault(name, [None, {}])[1]
+            node.setdefault(names[-1], [None, {}])[0] = entry
+
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '', f'<channel name={self._attr(channel)} version="1.0">']
+
+        def emit(children, depth):
+            indent = '  ' * depth
+            for name, (entry, grandchildren) in children.items():
+                type_, value = entry or ('empty', None)
+                head = f'{indent}<property name={self._attr(name)} type="{type_}"'
+                if type_ not in ('array', 'empty'):
+                    head += f' value={self._attr(value)}'
+                if type_ != 'array' and not grandchildren:
+                    lines.append(head + '/>')
+                    continue
+                lines.append(head + '>')
+                for item_type, item_value in (value if type_ == 'array' else []):
+                    lines.append(f'{indent}  <value type="{item_type}" value={self._attr(item_value)}/>')
+                emit(grandchildren, depth + 1)
+                lines.append(f'{indent}</property>')
+
+        emit(tree, 1)
+        lines.append('</channel>')
+        return '\n'.join(lines) + '\n'
+
+    def flush(self):
+        for channel in sorted(self.dirty):
+            path = self.path(channel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.kw-{os.getpid()}.tmp"
+            with open(tmp_path, 'x', encoding='utf-8') as f:
+                f.write(self._render(channel))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            self.calls += 1
+        self.dirty = set()
+        return True
+
+class PluginIndex:
+    PLUGIN_PREFIX = '/plugins/plugin-'
 
     def __init__(self):
-        if os.getuid() == 0:
-            print(f"{KaliStyle.ERROR} Do not run this script with sudo or as root. Use a normal user.")
-            sys.exit(1)
+        self.types = {}
+        self.by_type = {}
+        self.panels = {}
+        self.position = {}
+        self.max_id = 0
+
+    @classmethod
+    def build(cls, properties):
+        # One pass over the channel; a prefix test rejects most paths before any parsing
+        index = cls()
+        prefix, skip = cls.PLUGIN_PREFIX, len(cls.PLUGIN_PREFIX)
+        arrays = {}
+        last = None
+        for path, value in properties.items():
+            if path.startswith(prefix):
+                id_text, sep, _ = path[skip:].partition('/')
+                # Settings of one plugin are listed together, only the first needs parsing
+                if (sep and id_text == last) or not id_text.isdigit():
+                    continue
+                last = id_text
+                id_ = int(id_text)
+                if id_ > index.max_id:
+                    index.max_id = id_
+                if not sep:
+                    index.add(id_, str(value).strip())
+            elif path.startswith('/panels/'):
+                match = PANEL_IDS_RE.match(path)
+                if match:
+                    arrays[int(match.group(1))] = [int(i) for i in value]
+        panels = properties.get('/panels')
+        for panel_id in [int(p) for p in panels] if panels else [1]:
+            index.panels[panel_id] = arrays.get(panel_id, [])
+            for plugin_id in index.panels[panel_id]:
+                index.position.setdefault(plugin_id, panel_id)
+        return index
+
+    def copy(self):
+        index = PluginIndex()
+        index.types = dict(self.types)
+        index.by_type = {type_: set(ids) for type_, ids in self.by_type.items()}
+        index.panels = {panel_id: list(ids) for panel_id, ids in self.panels.items()}
+        index.position = dict(self.position)
+        index.max_id = self.max_id
+        return index
+
+    def of_type(self, type_):
+        return sorted(self.by_type.get(type_, ()))
+
+    def locate(self, plugin_id):
+        panel_id = self.position.get(plugin_id)
+        if panel_id is None:
+            return None, None
+        return panel_id, self.panels[panel_id].index(plugin_id)
+
+    def add(self, plugin_id, type_):
+        self.types[plugin_id] = type_
+        self.by_type.setdefault(type_, set()).add(plugin_id)
+        self.max_id = max(self.max_id, plugin_id)
+
+    def remove(self, plugin_id):
+        panel_id, index = self.locate(plugin_id)
+        if panel_id is not None:
+            del self.panels[panel_id][index]
+            del self.position[plugin_id]
+            for other, ids in self.panels.items():
+                if plugin_id in ids:
+                    self.position[plugin_id] = other
+                    break
+        type_ = self.types.pop(plugin_id, None)
+        if type_ is not None:
+            self.by_type[type_].discard(plugin_id)
+        return panel_id, index
+
+    def insert(self, panel_id, index, plugin_ids):
+        ids = self.panels.setdefault(panel_id, [])
+        if index is None or index > len(ids):
+            index = len(ids)
+        ids[index:index] = plugin_ids
+        for plugin_id in plugin_ids:
+            self.position.setdefault(plugin_id, panel_id)
+
+class XfconfClient:
+
+    def __init__(self, run_command, channel='xfce4-panel', backend=None, run_commands=None, home=None, root='/'):
+        self.channel = channel
+        self.backend = backend or self._select_backend(run_command, run_commands, home, root)
+        self.properties = None
+        self._index = None
+
+    @staticmethod
+    def session_bus_available():
+        return bool(os.environ.get('DBUS_SESSION_BUS_ADDRESS')) or os.path.exists(f'/run/user/{os.getuid()}/bus')
+
+    @classmethod
+    def _select_backend(cls, run_command, run_commands=None, home=None, root='/'):
+        try:
+            return DbusXfconfBackend()
+        except Exception as e:
+            logging.info(f"Xfconf D-Bus backend unavailable: {str(e)}")
+        if home is not None and not cls.session_bus_available():
+            logging.info("No session bus, editing the xfconf channel file directly")
+            return XmlXfconfBackend(home, root)
+        return CliXfconfBackend(run_command, run_commands)
+
+    @property
+    def offline(self):
+        return self.backend.name == 'xml'
+
+    def flush(self):
+        flush = getattr(self.backend, 'flush', None)
+        return flush() if flush else True
+
+    @property
+    def calls(self):
+        return self.backend.calls
+
+    def load(self, force=False):
+        if self.properties is None or force:
+            self._index = None
+            self.properties = self.backend.get_all(self.channel)
+            if self.properties is None:
+                self.properties = {}
+                return None
+        return self.properties
+
+    def _cached(self):
+        if self.properties is None:
+            self.load()
+        return self.properties
+
+    def get(self, prop, default=None):
+        return self._cached().get(prop, default)
+
+    def index(self):
+        # Built once per load and dropped on any write, so lookups never rescan the channel
+        if self._index is None:
+            self._index = PluginIndex.build(self._cached())
+        return self._index
+
+    def plugins(self):
+        return dict(self.index().types)
+
+    def next_plugin_id(self):
+        return self.index().max_id + 1
+
+    def panels(self):
+        return list(self.index().panels)
+
+    def panel_plugin_ids(self, panel_id):
+        return list(self.index().panels.get(panel_id, []))
+
+    def set(self, prop, type_, value):
+        if not self.backend.set(self.channel, prop, type_, value):
+            return False
+        self._cached()[prop] = value
+        self._index = None
+        return True
+
+    def set_array(self, prop, type_, values):
+        values = list(values)
+        if not values:
+            return self.reset(prop)
+        if not self.backend.set_array(self.channel, prop, type_, values):
+            return False
+        self._cached()[prop] = values
+        self._index = None
+        return True
+
+    def reset(self, prop, recursive=False):
+        if not self.backend.reset(self.channel, prop, recursive):
+            return False
+        self._forget(prop, recursive)
+        return True
+
+    def _forget(self, prop, recursive):
+        self._index = None
+        properties = self._cached()
+        for path in list(properties):
+            if path == prop or (recursive and path.startswith(prop + '/')):
+                del properties[path]
+
+    def set_many(self, changes):
+        results = self.backend.set_many(self.channel, changes)
+        for (prop, _, value), ok in zip(changes, results):
+            if ok:
+                self._cached()[prop] = value
+                self._index = None
+        return results
+
+    def reset_many(self, resets):
+        results = self.backend.reset_many(self.channel, resets)
+        for (prop, recursive), ok in zip(resets, results):
+            if ok:
+                self._forget(prop, recursive)
+        return results
+
+# ------------------------------- Panel Model Class --------------------------- #
+
+class PanelModel:
+
+    def __init__(self, xfconf):
+        self.xfconf = xfconf
+        self.loaded = xfconf.load() is not None
+        self.index = xfconf.index().copy()
+        self.plugins = self.index.types
+        self.panels = self.index.panels
+        self.original_panels = {p: list(ids) for p, ids in self.panels.items()}
+        self.next_id = self.index.max_id + 1
+        self.removed = []
+        self.created = {}
+
+    def plugins_of_type(self, type_):
+        return self.index.of_type(type_)
+
+    def locate(self, plugin_id):
+        return self.index.locate(plugin_id)
+
+    def remove_plugin(self, plugin_id):
+        panel_id, index = self.index.remove(plugin_id)
+        if self.created.pop(plugin_id, None) is None:
+            self.removed.append(plugin_id)
+        return panel_id, index
+
+    def add_plugin(self, type_, settings=()):
+        plugin_id = self.next_id
+        self.next_id += 1
+        self.index.add(plugin_id, type_)
+        self.created[plugin_id] = [(f'/plugins/plugin-{plugin_id}', 'string', type_)] + [
+            (f'/plugins/plugin-{plugin_id}/{name}', type_name, value) for name, type_name, value in settings]
+        return plugin_id
+
+    def insert(self, panel_id, index, plugin_ids):
+        self.index.insert(panel_id, index, plugin_ids)
+
+    def diff(self):
+        changes = []
+        for plugin_id, properties in self.created.items():
+            changes += [('set', prop, type_, value) for prop, type_, value in properties]
+        for panel_id, ids in sorted(self.panels.items()):
+            if ids != self.original_panels.get(panel_id):
+                changes.append(('set_array', f'/panels/panel-{panel_id}/plugin-ids', 'int', ids))
+        changes += [('reset', f'/plugins/plugin-{plugin_id}', True, None) for plugin_id in self.removed]
+        return changes
+
+    def commit(self):
+        # New plugins exist before any panel references them and removed ones
+        # disappear only after no panel lists them, so the panel never flickers.
+        # Within each phase the changes are independent and go out as one batch.
+        changes = self.diff()
+        sets = [(prop, arg, value) for op, prop, arg, value in changes if op == 'set']
+        resets = [(prop, arg) for op, prop, arg, _ in changes if op == 'reset']
+        results = list(zip([('set', prop) for prop, _, _ in sets], self.xfconf.set_many(sets)))
+        for op, prop, arg, value in changes:
+            if op == 'set_array':
+                results.append(((op, prop), self.xfconf.set_array(prop, arg, value)))
+        results += zip([('reset', prop) for prop, _ in resets], self.xfconf.reset_many(resets))
+
+        success = True
+        for (op, prop), ok in results:
+            if not ok:
+                logging.error(f"Failed to commit panel change {op} {prop}")
+                success = False
+        if not self.xfconf.flush():
+            logging.error("Failed to write the panel channel")
+            success = False
+        if success:
+            self.original_panels = {p: list(ids) for p, ids in self.panels.items()}
+            self.created = {}
+            self.removed = []
+        return success
+
+# ------------------------------- Install Manifest Class --------------------------- #
+
+class InstallManifest:
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {'version': self.VERSION}
+        self.loaded = False
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            logging.info(f"Ignoring manifest {self.path} with unknown version")
+            return False
+        self.data = data
+        self.loaded = True
+        return True
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.kw-{os.getpid()}.tmp"
+        with open(tmp_path, 'x', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def hash_file(path):
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b''):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    @classmethod
+    def hash_tree(cls, root):
+        hashes = {}
+        for directory, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in ('__pycache__', 'status')]
+            for name in files:
+                path = os.path.join(directory, name)
+                hashes[os.path.relpath(path, root)] = cls.hash_file(path)
+        return hashes
+
+    @staticmethod
+    def stat_key(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+# ------------------------------- Deploy Class --------------------------- #
+
+class BackupStore:
+
+    def __init__(self, root, retention=5, legacy_glob=None):
+        self.root = root
+        self.objects = os.path.join(root, 'objects')
+        self.snapshots = os.path.join(root, 'snapshots')
+        self.retention = retention
+        self.legacy_glob = legacy_glob
+        self.entries = {}
+
+    def add(self, rel, path, digest):
+        # Objects are named by content, so an unchanged file is stored only once
+        # no matter how many snapshots reference it
+        os.makedirs(self.objects, exist_ok=True)
+        target = os.path.join(self.objects, digest)
+        if not os.path.exists(target):
+            tmp_path = f"{target}.kw-{os.getpid()}.tmp"
+            with open(path, 'rb') as src, open(tmp_path, 'xb') as dst:
+                shutil.copyfileobj(src, dst)
+            shutil.copystat(path, tmp_path)
+            os.replace(tmp_path, target)
+        self.entries[rel] = digest
+        return target
+
+    def commit(self):
+        if not self.entries:
+            return None
+        os.makedirs(self.snapshots, exist_ok=True)
+        path = os.path.join(self.snapshots, f"{time.time_ns()}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        self.entries = {}
+        return path
+
+    def prune(self):
+        removed = 0
+        try:
+            snapshots = sorted(os.listdir(self.snapshots))
+        except OSError:
+            snapshots = []
+        for name in snapshots[:-self.retention] if self.retention else snapshots:
+            os.remove(os.path.join(self.snapshots, name))
+            removed += 1
+
+        referenced = set()
+        for name in os.listdir(self.snapshots) if os.path.isdir(self.snapshots) else []:
+            try:
+                with open(os.path.join(self.snapshots, name), 'r', encoding='utf-8') as f:
+                    referenced.update(json.load(f).values())
+            except (OSError, ValueError):
+                continue
+        for name in os.listdir(self.objects) if os.path.isdir(self.objects) else []:
+            if name not in referenced:
+                os.remove(os.path.join(self.objects, name))
+
+        if self.legacy_glob:
+            legacy = sorted(glob.glob(self.legacy_glob), key=os.path.getmtime)
+            for path in legacy[:-self.retention] if self.retention else legacy:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        return removed
+
+class Deployer:
+
+    def __init__(self, source, dest, manifest, backups, modes=None, owner=None, preserved=()):
+        self.source = source
+        self.dest = dest
+        self.manifest = manifest
+        self.backups = backups
+        self.modes = modes or {}
+        self.owner = owner
+        self.preserved = set(preserved)
+        self.copied = []
+        self.adjusted = []
+        self.hashed = 0
+
+    @staticmethod
+    def _recorded(entry):
+        # Older manifests stored the bare hash
+        return entry if isinstance(entry, dict) else {'sha256': entry}
+
+    def _current(self, path, recorded):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None, None
+        if recorded.get('stat') == [st.st_size, st.st_mtime_ns]:
+            return recorded.get('sha256'), st
+        self.hashed += 1
+        return InstallManifest.hash_file(path), st
+
+    def _mode(self, rel):
+        return self.modes.get(rel, 0o644)
+
+    def _chown(self, fd_or_path):
+        if self.owner is None:
+            return
+        try:
+            if isinstance(fd_or_path, int):
+                os.fchown(fd_or_path, *self.owner)
+            else:
+                os.chown(fd_or_path, *self.owner)
+        except PermissionError:
+            pass
+
+    def _makedirs(self, directory):
+        missing = []
+        while not os.path.isdir(directory):
+            missing.append(directory)
+            directory = os.path.dirname(directory)
+        for path in reversed(missing):
+            os.mkdir(path, 0o755)
+            self._chown(path)
+        return missing
+
+    def _install(self, rel):
+        source = os.path.join(self.source, rel)
+        dest = os.path.join(self.dest, rel)
+        created_dirs = self._makedirs(os.path.dirname(dest))
+        tmp_path = f"{dest}.kw-{os.getpid()}.tmp"
+        try:
+            with open(source, 'rb') as src, open(tmp_path, 'xb') as dst:
+                shutil.copyfileobj(src, dst)
+                os.fchmod(dst.fileno(), self._mode(rel))
+                self._chown(dst.fileno())
+                dst.flush()
+                os.fsync(dst.fileno())
+            shutil.copystat(source, tmp_path, follow_symlinks=False)
+            os.chmod(tmp_path, self._mode(rel))
+            os.replace(tmp_path, dest)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return created_dirs
+
+    def deploy(self, actions_taken, source_hashes=None):
+        deployed = {rel: self._recorded(entry) for rel, entry in self.manifest.get('files', {}).items()}
+        if source_hashes is None:
+            source_hashes = InstallManifest.hash_tree(self.source)
+        for rel, digest in sorted(source_hashes.items()):
+            dest = os.path.join(self.dest, rel)
+            recorded = deployed.get(rel, {})
+            current, st = self._current(dest, recorded)
+
+            if current == digest:
+                if st.st_mode & 0o7777 != self._mode(rel) and rel not in self.preserved:
+                    os.chmod(dest, self._mode(rel))
+                    self.adjusted.append(rel)
+                deployed[rel] = {'sha256': digest, 'stat': [st.st_size, st.st_mtime_ns]}
+                continue
+            if current is not None and current != recorded.get('sha256') and rel in self.preserved:
+                print(f"{KaliStyle.INFO} Keeping local changes in {rel}")
+                continue
+
+            if current is None:
+                actions_taken.append({'type': 'file_copy', 'dest': dest})
+            else:
+                self.backups.add(rel, dest, current)
+                with open(dest, 'rb') as f:
+                    actions_taken.append({'type': 'file_restore', 'dest': dest, 'content': f.read()})
+            for directory in self._install(rel):
+                actions_taken.append({'type': 'dir_copy', 'dest': directory})
+            st = os.stat(dest)
+            deployed[rel] = {'sha256': digest, 'stat': [st.st_size, st.st_mtime_ns]}
+            self.copied.append(rel)
+
+        self.backups.commit()
+        self.manifest.set('files', deployed)
+        return self.copied
+
+# ------------------------------- Trace Class --------------------------- #
+
+class Tracer:
+    MAX_BYTES = 1024 * 1024
+
+    def __init__(self, path=None, **context):
+        self.path = path
+        self.context = dict(context)
+        self.context.setdefault('run', f"{int(time.time())}-{os.getpid()}")
+        self.records = []
+        self.local = threading.local()
+        self.task = None
+        self.counter = 0
+        self.lock = threading.Lock()
+        self.file = None
+        if path:
+            try:
+                if os.path.exists(path) and os.path.getsize(path) > self.MAX_BYTES:
+                    os.replace(path, f"{path}.1")
+                self.file = open(path, 'a', encoding='utf-8')
+            except OSError as e:
+                logging.warning(f"Trace disabled, cannot write {path}: {str(e)}")
+
+    def _stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    @contextlib.contextmanager
+    def span(self, kind, name, **fields):
+        stack = self._stack()
+        with self.lock:
+            self.counter += 1
+            span_id = f"{os.getpid()}-{self.counter}"
+        # Probes run in worker threads with an empty stack, so they hang off the current task
+        parent = stack[-1]['id'] if stack else (self.task['id'] if self.task and kind != 'task' else None)
+        record = dict(self.context, id=span_id, parent=parent, kind=kind, name=name,
+                      start=round(time.time(), 6), **fields)
+        stack.append(record)
+        if kind == 'task' and len(stack) == 1:
+            self.task = record
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            record['end'] = round(record['start'] + record['duration_ms'] / 1000, 6)
+            stack.pop()
+            if self.task is record:
+                self.task = None
+            self.emit(record)
+
+    def add(self, kind, name, start, elapsed, **fields):
+        # For work that was timed elsewhere, e.g. commands overlapped by the async engine
+        stack = self._stack()
+        with self.lock:
+            self.counter += 1
+            span_id = f"{os.getpid()}-{self.counter}"
+        parent = stack[-1]['id'] if stack else (self.task['id'] if self.task else None)
+        record = dict(self.context, id=span_id, parent=parent, kind=kind, name=name, start=round(start, 6),
+                      duration_ms=round(elapsed * 1000, 3), end=round(start + elapsed, 6), **fields)
+        self.emit(record)
+        return record
+
+    def run(self, command, **kwargs):
+        # subprocess.run with a command span, for the calls that do not go through run_command
+        with self.span('command', ' '.join(command), timeout=kwargs.get('timeout'), retries=0) as span:
+            result = subprocess.run(command, **kwargs)
+            span['exit'] = result.returncode
+            span['stdout_bytes'] = len(result.stdout or '')
+            span['stderr_bytes'] = len(result.stderr or '')
+            return result
+
+    def emit(self, record):
+        with self.lock:
+            self.records.append(record)
+            if self.file is not None:
+                self.file.write(json.dumps(record, sort_keys=True) + '\n')
+                self.file.flush()
+
+    def extend(self, records):
+        for record in records:
+            self.emit(record)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def report(self, top=10, width=30):
+        commands = sorted((r for r in self.records if r['kind'] == 'command'), key=lambda r: -r['duration_ms'])
+        print(f"\n[{KaliStyle.BLUE}{KaliStyle.BOLD}+{KaliStyle.RESET}] Slowest commands\n")
+        for r in commands[:top]:
+            print(f"  {KaliStyle.GREY}{r['duration_ms'] / 1000:8.3f} s  exit {str(r.get('exit')):<7} "
+                  f"{r.get('stdout_bytes', 0) + r.get('stderr_bytes', 0):>8} B  {r['name'][:60]}{KaliStyle.RESET}")
+        if not commands:
+            print(f"  {KaliStyle.GREY}No commands recorded{KaliStyle.RESET}")
+
+        children = {}
+        for r in self.records:
+            children.setdefault(r['parent'], []).append(r)
+        roots = children.get(None, [])
+        total = sum(r['duration_ms'] for r in roots) or 1
+
+        def show(record, depth):
+            bar = '█' * max(1, round(width * record['duration_ms'] / total))
+            label = f"{'  ' * depth}{record['name']}"[:48]
+            retries = f"  ({record['retries']} retries)" if record.get('retries') else ''
+            print(f"  {KaliStyle.GREY}{label:<48} {record['duration_ms'] / 1000:8.3f} s {KaliStyle.RESET}"
+                  f"{KaliStyle.BLUE}{bar}{KaliStyle.RESET}{KaliStyle.GREY}{retries}{KaliStyle.RESET}")
+            for child in sorted(children.get(record['id'], []), key=lambda r: r['start']):
+                show(child, depth + 1)
+
+        print(f"\n[{KaliStyle.BLUE}{KaliStyle.BOLD}+{KaliStyle.RESET}] Task breakdown\n")
+        for record in sorted(roots, key=lambda r: r['start']):
+            show(record, 0)
+        if self.path:
+            print(f"\n{KaliStyle.INFO} Trace written to {self.path}")
+
+# ------------------------------- Preflight Class --------------------------- #
+
+class Preflight:
+
+    def __init__(self, max_workers=4, tracer=None):
+        self.max_workers = max_workers
+        self.tracer = tracer or Tracer()
+        self.timings = {}
+
+    def _timed(self, name, probe):
+        start = time.perf_counter()
+        with self.tracer.span('probe', name) as span:
+            try:
+                span['result'] = bool(probe())
+                return span['result']
+            except Exception as e:
+                logging.error(f"Preflight probe '{name}' failed: {str(e)}")
+                span['error'] = str(e)
+                return False
+            finally:
+                self.timings[name] = time.perf_counter() - start
+
+    def run(self, probes):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {name: executor.submit(self._timed, name, probe) for name, probe in probes}
+            return {name: future.result() for name, future in futures.items()}
+
+    def run_serial(self, name, probe):
+        return self._timed(name, probe)
+
+    def report(self):
+        for name, elapsed in sorted(self.timings.items(), key=lambda item: -item[1]):
+            logging.info(f"Preflight {name}: {elapsed * 1000:.1f} ms")
+            print(f"  {KaliStyle.GREY}{name:<28} {elapsed * 1000:8.1f} ms{KaliStyle.RESET}")
+
+# ------------------------------- Readiness Class --------------------------- #
+
+class Readiness:
+
+    def __init__(self, tracer=None):
+        self.tracer = tracer or Tracer()
+        self.waits = []
+
+    def wait(self, description, condition, timeout=10, interval=0.02, max_interval=0.25):
+        with self.tracer.span('wait', description, timeout=timeout) as span:
+            start = time.monotonic()
+            delay = interval
+            span['retries'] = -1
+            while True:
+                span['retries'] += 1
+                try:
+                    ready = condition()
+                except Exception as e:
+                    logging.warning(f"Readiness check '{description}' raised: {str(e)}")
+                    ready = False
+                elapsed = time.monotonic() - start
+                if ready or elapsed >= timeout:
+                    break
+                time.sleep(min(delay, timeout - elapsed))
+                delay = min(delay * 2, max_interval)
+            span['ready'] = ready
+        self.waits.append((description, elapsed, ready))
+        logging.info(f"Waited {elapsed * 1000:.0f} ms for {description} ({'ready' if ready else 'timeout'})")
+        return ready
+
+    @staticmethod
+    def find_processes(name, uid=None):
+        pids = []
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/comm', 'r') as f:
+                    if f.read().strip() != name:
+                        continue
+                if uid is not None and os.stat(f'/proc/{entry}').st_uid != uid:
+                    continue
+                pids.append(int(entry))
+            except OSError:
+                continue
+        return pids
+
+    @staticmethod
+    def pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        try:
+            with open(f'/proc/{pid}/stat', 'r') as f:
+                return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+        except OSError:
+            return False
+
+    @staticmethod
+    def dbus_name_has_owner(name):
+        try:
+            from gi.repository import Gio, GLib
+            bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+            reply = bus.call_sync('org.freedesktop.DBus', '/org/freedesktop/DBus', 'org.freedesktop.DBus',
+                                  'NameHasOwner', GLib.Variant('(s)', (name,)), GLib.VariantType.new('(b)'),
+                                  Gio.DBusCallFlags.NONE, 1000, None)
+            return reply.unpack()[0]
+        except ImportError:
+            pass
+        result = subprocess.run(['dbus-send', '--session', '--print-reply', '--dest=org.freedesktop.DBus',
+                                 '/org/freedesktop/DBus', 'org.freedesktop.DBus.NameHasOwner', f'string:{name}'],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=5)
+        return 'boolean true' in result.stdout
+
+    @staticmethod
+    def panel_plugins_loaded(plugin_ids, uid=None):
+        # External plugins run in a wrapper whose command line carries the plugin id;
+        # internal ones are loaded into xfce4-panel itself
+        pending = set(str(i) for i in plugin_ids)
+        panel_maps_genmon = False
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                if uid is not None and os.stat(f'/proc/{entry}').st_uid != uid:
+                    continue
+                with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                    args = f.read().decode(errors='replace').split('\0')
+            except OSError:
+                continue
+            if any('genmon' in a for a in args):
+                pending.difference_update(args)
+            elif args and os.path.basename(args[0]) == 'xfce4-panel':
+                try:
+                    with open(f'/proc/{entry}/maps', 'r') as f:
+                        panel_maps_genmon = 'libgenmon' in f.read()
+                except OSError:
+                    pass
+        return not pending or panel_maps_genmon
+
+    def report(self):
+        for description, elapsed, ready in self.waits:
+            state = '' if ready else f' {KaliStyle.YELLOW}(timeout){KaliStyle.RESET}'
+            print(f"  {KaliStyle.GREY}{description:<28} {elapsed * 1000:8.1f} ms{KaliStyle.RESET}{state}")
+
+# ------------------------------- Privileged Helper Class --------------------------- #
+
+class PrivilegedHelper:
+    # The only things the root side will ever run, whatever arrives on the pipe
+    OPERATIONS = {
+        'apt-update': ['apt', 'update'],
+        'apt-install': ['apt', 'install', '-y'],
+        'apt-remove': ['apt', 'remove', '-y']
+    }
+    PACKAGE_RE = re.compile(r'^[a-z0-9][a-z0-9+.-]*$')
+    READY = 'kaliwidget-helper-ready'
+
+    @classmethod
+    def request_for(cls, command):
+        for op, prefix in cls.OPERATIONS.items():
+            if list(command[:len(prefix)]) == prefix and (op != 'apt-update' or len(command) == len(prefix)):
+                return op, list(command[len(prefix):])
+        return None
+
+    @classmethod
+    def argv(cls, op, args):
+        if op not in cls.OPERATIONS:
+            raise ValueError(f"operation not allowed: {op}")
+        if op == 'apt-update' and args:
+            raise ValueError("apt-update takes no arguments")
+        if op != 'apt-update' and (not args or not all(cls.PACKAGE_RE.match(str(a)) for a in args)):
+            raise ValueError("invalid package list")
+        return cls.OPERATIONS[op] + list(args)
+
+    @classmethod
+    def serve(cls, stdin=sys.stdin, stdout=sys.stdout):
+        stdout.write(cls.READY + '\n')
+        stdout.flush()
+        for line in stdin:
+            # Anything that is not a request (e.g. a password sudo did not need) is dropped unseen
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    continue
+            except ValueError:
+                continue
+            reply = {'id': request.get('id')}
+            try:
+                result = subprocess.run(cls.argv(request.get('op'), request.get('args') or []),
+                                        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        text=True, timeout=request.get('timeout'))
+                reply.update(exit=result.returncode, stdout=result.stdout, stderr=result.stderr)
+            except subprocess.TimeoutExpired:
+                reply.update(exit='timeout')
+            except (ValueError, OSError) as e:
+                reply.update(exit='denied', stderr=str(e))
+            stdout.write(json.dumps(reply) + '\n')
+            stdout.flush()
+        return 0
+
+class SudoSession:
+    FAILURES = ('Sorry, try again', 'incorrect password', 'not in the sudoers', 'is not allowed to')
+
+    def __init__(self, script):
+        self.script = script
+        self.proc = None
+        self.counter = 0
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self, password=None, timeout=30):
+        self.proc = subprocess.Popen(['sudo', '-S', '-p', '', sys.executable, self.script, '--privileged-helper'],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if password is not None:
+            self.proc.stdin.write(password.encode() + b'\n')
+            self.proc.stdin.flush()
+        deadline = time.monotonic() + timeout
+        errors = b''
+        while time.monotonic() < deadline:
+            ready, _, _ = select.select([self.proc.stdout, self.proc.stderr], [], [], deadline - time.monotonic())
+            if self.proc.stdout in ready:
+                if self.proc.stdout.readline().decode().strip() == PrivilegedHelper.READY:
+                    return True
+                break
+            if self.proc.stderr in ready:
+                chunk = os.read(self.proc.stderr.fileno(), 4096)
+                errors += chunk
+                if not chunk or any(f.encode() in errors for f in self.FAILURES):
+                    break
+        logging.error(f"Privileged helper did not start: {errors.decode(errors='replace').strip()}")
+        self.close()
+        return False
+
+    def run(self, command, timeout=None):
+        request = PrivilegedHelper.request_for(command)
+        if request is None:
+            raise PermissionError(f"not in the helper allow-list: {' '.join(command)}")
+        if not self.alive:
+            raise PermissionError("privileged helper is not running")
+        self.counter += 1
+        message = {'id': self.counter, 'op': request[0], 'args': request[1], 'timeout': timeout}
+        self.proc.stdin.write(json.dumps(message).encode() + b'\n')
+        self.proc.stdin.flush()
+        ready, _, _ = select.select([self.proc.stdout], [], [], (timeout or 60) + 5)
+        line = self.proc.stdout.readline() if ready else b''
+        try:
+            reply = json.loads(line)
+        except ValueError:
+            self.close()
+            raise subprocess.TimeoutExpired(command, timeout)
+        if reply.get('exit') == 'timeout':
+            raise subprocess.TimeoutExpired(command, timeout)
+        if reply.get('exit') == 'denied':
+            raise PermissionError(reply.get('stderr'))
+        if reply.get('exit') != 0:
+            raise subprocess.CalledProcessError(reply.get('exit'), command, reply.get('stdout'), reply.get('stderr'))
+        return subprocess.CompletedProcess(command, 0, reply.get('stdout'), reply.get('stderr'))
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+# ------------------------------- XFCE Installer Class --------------------------- #
+
+class XfceInstaller:
+    VERSION = '2.3.0'
+    PACKAGES = ['jp2a', 'xclip']
+    GENMON_POLL_PERIOD = '0.25'
+    GENMON_PUSH_PERIOD = '30'
+    GENMON_PUSH_VERSION = (4, 1)
+    LAYOUTS = {
+        'split': ['target', 'vpn', 'ethernet'],
+        'combined': ['combined']
+    }
+    RC_VERSION = 2
+    RC_BLOCK_RE = re.compile(r'\n?# >>> kaliwidget settarget v(\d+) >>>\n.*?# <<< kaliwidget settarget <<<\n', re.S)
+    # Unmarked function written by installers before the block markers, header through its closing brace
+    LEGACY_RC_RE = re.compile(r'\n?(?:# -+ settarget Function -+ #\n|# XFCE Installer: settarget function\n)'
+                              r'function settarget\(\) \{\n.*?\n\}\n', re.S)
+    PRESERVED_FILES = {'target/target.txt', 'statusd.conf'}
+    EXECUTABLES = ['target.sh', 'ethernet.sh', 'vpnip.sh', 'statusd.py', 'kaliwidget.py', 'clipsend.py']
+    BACKUP_RETENTION = 5
+
+    def __init__(self, layout='split', target=None, engine='async', sudo='helper', xfconf='auto',
+                 runner=None, xfconf_backend=None, tracer=None, log_path=None):
+        # runner, xfconf_backend, tracer and log_path replace the defaults built here, for benchmarks and tests
+        if target is None:
+            if os.getuid() == 0:
+                print(f"{KaliStyle.ERROR} Do not run this script with sudo or as root. Use a normal user.")
+                sys.exit(1)
+            original_user = os.environ.get('SUDO_USER', os.environ.get('USER') or Path.home().name)
+            target = BatchTarget.local(original_user, shell=os.environ.get('SHELL', ''))
         
-        original_user = os.environ.get('SUDO_USER', os.environ.get('USER') or Path.home().name)
-        self.home_dir = os.path.expanduser(f'~{original_user}')
-        self.current_user = original_user
+        self.target = target
+        self.home_dir = target.home
+        self.runtime_home = target.runtime_home
+        self.current_user = target.user
+        self.owner = target.owner
+        self.shell = target.shell
+        self.source_hashes = None
         self.script_dir = os.path.dirname(os.path.realpath(__file__))
+        self.source_dir = os.path.join(self.script_dir, 'bin')
+        self.layout = layout
+        self.tracer = tracer or Tracer(os.path.join(self.script_dir, 'install.trace.jsonl'),
+                                       version=self.VERSION, target=target.name)
+        self.engine = runner or ENGINES[engine]()
         self.actions_taken = []
         self.sudo_password = None
+        self.sudo_mode = sudo
+        self.sudo = None
+        self.sudo_passwordless = False
+        # 'auto' leaves the choice to XfconfClient
+        if xfconf_backend is None and xfconf == 'xml':
+            xfconf_backend = XmlXfconfBackend(self.home_dir, target.root)
+        elif xfconf_backend is None and xfconf == 'cli':
+            xfconf_backend = CliXfconfBackend(self.run_command, self.run_commands)
+        self.xfconf = XfconfClient(self.run_command, run_commands=self.run_commands, home=self.home_dir, root=target.root,
+                                   backend=xfconf_backend)
+        self.panel_model = None
+        self.package_installed = {}
+        self.genmon_ids = []
+        self.readiness = Readiness(self.tracer)
+        self.task_timings = []
+        self.manifest = InstallManifest(os.path.join(self.home_dir, '.config/kaliwidget/manifest.json'))
+        self.manifest.load()
+        self.backups = BackupStore(os.path.join(self.home_dir, '.config/kaliwidget/backups'), self.BACKUP_RETENTION,
+                                   legacy_glob=os.path.join(self.home_dir, '.config/bin.backup.*'))
+        self.files_changed = None
+        self.panel_current = False
+        self.panel_plugins = {}
+        self.panel_period = None
         
-        log_path = os.path.join(self.script_dir, 'install.log')
-        if os.path.exists(log_path) and not os.access(log_path, os.W_OK):
-            print(f"{KaliStyle.WARNING} Fixing permissions on {log_path}...")
-            try:
-                subprocess.run(['sudo', 'rm', '-f', log_path], check=True, timeout=30)
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                print(f"{KaliStyle.WARNING} Could not fix log permissions, creating new log")
-                log_path = os.path.join(self.script_dir, f'install_{int(time.time())}.log')
+        if log_path is None:
+            log_path = os.path.join(self.script_dir, 'install.log')
+            if os.path.exists(log_path) and not os.access(log_path, os.W_OK):
+                print(f"{KaliStyle.WARNING} Fixing permissions on {log_path}...")
+                try:
+                    subprocess.run(['sudo', 'rm', '-f', log_path], check=True, timeout=30)
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+                    print(f"{KaliStyle.WARNING} Could not fix log permissions, creating new log")
+                    log_path = os.path.join(self.script_dir, f'install_{int(time.time())}.log')
         
         logging.basicConfig(filename=log_path, level=logging.INFO, 
                             format='%(asctime)s - %(levelname)s - %(message)s')
@@ -84,7 +1447,7 @@ class XfceInstaller:
     ╚███╔███╔╝██║██████╔╝╚██████╔╝███████╗   ██║   
      ╚══╝╚══╝ ╚═╝╚═════╝  ╚═════╝ ╚══════╝   ╚═╝
            """)
-        print(f"{KaliStyle.WHITE}\t    [ XFCE Installer - v.2.3.0 ]{KaliStyle.RESET}")
+        print(f"{KaliStyle.WHITE}\t    [ XFCE Installer - v.{self.VERSION} ]{KaliStyle.RESET}")
         print(f"{KaliStyle.GREY}\t      [ Created by SkyW4r33x ]{KaliStyle.RESET}\n")
 
     def get_sudo_password(self):
@@ -92,35 +1455,61 @@ class XfceInstaller:
             self.sudo_password = getpass.getpass(prompt=f"{KaliStyle.INFO} Enter password: ")
         return self.sudo_password
 
+    def start_privileged(self):
+        if os.getuid() == 0:
+            return True
+        if self.sudo_mode != 'helper':
+            self.get_sudo_password()
+            return True
+        if self.sudo is not None and self.sudo.alive:
+            return True
+        # One authentication for the whole run, the password is dropped as soon as sudo has it
+        password = None if self.sudo_passwordless else self.get_sudo_password()
+        self.sudo = SudoSession(os.path.realpath(__file__))
+        with self.tracer.span('command', 'sudo privileged helper', retries=0) as span:
+            started = self.sudo.start(password)
+            span['exit'] = 0 if started else 1
+        self.sudo_password = None
+        del password
+        if not started:
+            print(f"{KaliStyle.ERROR} Could not authenticate with sudo")
+        return started
+
+    def stop_privileged(self):
+        if self.sudo is not None:
+            self.sudo.close()
+        return True
+
     def run_command(self, command, shell=False, sudo=False, quiet=True, timeout=60):
+        name = command if isinstance(command, str) else ' '.join(command)
+        with self.tracer.span('command', name, sudo=sudo, timeout=timeout, retries=0) as span:
+            return self._run_command(span, command, shell, sudo, quiet, timeout)
+
+    @staticmethod
+    def _trace_result(span, returncode, stdout, stderr):
+        span['exit'] = returncode
+        span['stdout_bytes'] = len(stdout or '')
+        span['stderr_bytes'] = len(stderr or '')
+
+    def _run_command(self, span, command, shell, sudo, quiet, timeout):
         try:
-            if sudo and not shell:
+            if sudo and not shell and os.getuid() != 0 and self.sudo_mode == 'helper':
+                if not self.start_privileged():
+                    raise PermissionError("sudo authentication failed")
+                result = self.sudo.run(command, timeout=timeout)
+            elif sudo and not shell and os.getuid() != 0:
                 if self.sudo_password is None:
                     self.get_sudo_password()
                 
                 cmd = ['sudo', '-S'] + command
-                result = subprocess.run(
-                    cmd,
-                    shell=shell,
-                    check=True,
-                    input=self.sudo_password + '\n',
-                    stdout=subprocess.PIPE if quiet else None,
-                    stderr=subprocess.PIPE if quiet else None,
-                    text=True,
-                    timeout=timeout
-                )
+                result = self.engine.run(cmd, shell=shell, input=self.sudo_password + '\n',
+                                         capture=quiet, timeout=timeout)
             else:
-                result = subprocess.run(
-                    command,
-                    shell=shell,
-                    check=True,
-                    stdout=subprocess.PIPE if quiet else None,
-                    stderr=subprocess.PIPE if quiet else None,
-                    text=True,
-                    timeout=timeout
-                )
+                result = self.engine.run(command, shell=shell, capture=quiet, timeout=timeout)
+            self._trace_result(span, result.returncode, result.stdout, result.stderr)
             return True, result.stdout if quiet else ""
         except subprocess.CalledProcessError as e:
+            self._trace_result(span, e.returncode, e.stdout, e.stderr)
             if not quiet:
                 print(f"{KaliStyle.ERROR} Error executing command: {' '.join(command)}")
                 if hasattr(e, 'stdout') and e.stdout:
@@ -130,20 +1519,42 @@ class XfceInstaller:
             logging.error(f"Error executing command: {' '.join(command)} - {e}")
             return False, ""
         except subprocess.TimeoutExpired:
+            span['exit'] = 'timeout'
             print(f"{KaliStyle.ERROR} Command timeout: {' '.join(command)}")
             logging.error(f"Command timeout: {' '.join(command)}")
             return False, ""
         except PermissionError:
+            span['exit'] = 'permission'
             print(f"{KaliStyle.ERROR} Insufficient permissions to execute: {' '.join(command)}")
             logging.error(f"Permission error: {' '.join(command)}")
             return False, ""
 
+    def run_commands(self, commands, timeout=60):
+        # Independent commands: the async engine overlaps them, the serial one runs them in order
+        results = []
+        for command, (result, start, elapsed) in zip(commands, self.engine.run_many(commands, timeout=timeout)):
+            name = ' '.join(command)
+            fields = {'timeout': timeout, 'retries': 0, 'batch': len(commands)}
+            if isinstance(result, subprocess.CompletedProcess):
+                self._trace_result(fields, result.returncode, result.stdout, result.stderr)
+                results.append((True, result.stdout))
+                self.tracer.add('command', name, start, elapsed, **fields)
+                continue
+            if isinstance(result, subprocess.CalledProcessError):
+                self._trace_result(fields, result.returncode, result.stdout, result.stderr)
+            else:
+                fields['exit'] = 'timeout' if isinstance(result, subprocess.TimeoutExpired) else type(result).__name__
+            logging.error(f"Error executing command: {name} - {result}")
+            self.tracer.add('command', name, start, elapsed, **fields)
+            results.append((False, ""))
+        return results
+
     def check_command(self, command):
         try:
-            result = subprocess.run([command, "--version"], 
-                                  stdout=subprocess.DEVNULL, 
-                                  stderr=subprocess.DEVNULL,
-                                  timeout=10)
+            result = self.tracer.run([command, "--version"], 
+                                   stdout=subprocess.DEVNULL, 
+                                   stderr=subprocess.DEVNULL,
+                                   timeout=10)
             return result.returncode == 0
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return False
@@ -156,11 +1567,12 @@ class XfceInstaller:
 
     def check_sudo_privileges(self):
         try:
-            result = subprocess.run(['sudo', '-n', 'true'], 
-                                  stdout=subprocess.DEVNULL, 
-                                  stderr=subprocess.DEVNULL,
-                                  timeout=10)
+            result = self.tracer.run(['sudo', '-n', 'true'], 
+                                   stdout=subprocess.DEVNULL, 
+                                   stderr=subprocess.DEVNULL,
+                                   timeout=10)
             if result.returncode == 0:
+                self.sudo_passwordless = True
                 return True
             else:
                 print(f"{KaliStyle.WARNING} This script needs to execute commands with sudo.")
@@ -187,11 +1599,47 @@ class XfceInstaller:
             return False
         return True
 
-    def check_xfce_environment(self):
+    def detect_xfce_environment(self):
         desktop_env = os.environ.get('XDG_CURRENT_DESKTOP', '').lower()
         session_type = os.environ.get('XDG_SESSION_DESKTOP', '').lower()
+        return "xfce" in desktop_env or "xfce" in session_type
+
+    def read_dpkg_status(self, packages, status_file='/var/lib/dpkg/status'):
+        installed = {pkg: False for pkg in packages}
+        package = None
+        with open(status_file, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line.startswith('Package: '):
+                    package = line[9:].strip()
+                elif line.startswith('Status: ') and package in installed:
+                    if line.split()[-1] == 'installed':
+                        installed[package] = True
+                elif not line.strip():
+                    package = None
+        return installed
+
+    def resolve_packages(self, packages=None):
+        packages = list(packages or self.PACKAGES)
+        installed = {pkg: False for pkg in packages}
+        try:
+            result = self.tracer.run(['dpkg-query', '-W', '-f', '${Package} ${db:Status-Abbrev}\n'] + packages,
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                     text=True, timeout=30)
+            for line in result.stdout.splitlines():
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].split(':')[0] in installed and parts[1].startswith('ii'):
+                    installed[parts[0].split(':')[0]] = True
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            installed = self.read_dpkg_status(packages)
+        self.package_installed.update(installed)
+        return installed
+
+    def check_xfce_environment(self, detected=None):
+        if detected is None:
+            detected = self.detect_xfce_environment()
         
-        if "xfce" not in desktop_env and "xfce" not in session_type:
+        if not detected:
+            desktop_env = os.environ.get('XDG_CURRENT_DESKTOP', '').lower()
             print(f"{KaliStyle.WARNING} This script is designed for XFCE environments.")
             print(f"{KaliStyle.INFO} Current desktop: {desktop_env or 'unknown'}")
             response = input(f"{KaliStyle.WARNING} Continue anyway? [y/N]: ").lower()
@@ -201,7 +1649,7 @@ class XfceInstaller:
 
     def install_additional_packages(self):
         print(f"\n{KaliStyle.INFO} Installing tools")
-        self.packages = ['jp2a', 'xclip']
+        self.packages = self.PACKAGES
         self.max_length = max(len(pkg) for pkg in self.packages)
         self.state_length = 20
         self.states = {pkg: f"{KaliStyle.GREY}Pending{KaliStyle.RESET}" for pkg in self.packages}
@@ -217,7 +1665,22 @@ class XfceInstaller:
             sys.stdout.flush()
 
         try:
-            self.get_sudo_password()
+            unknown = [pkg for pkg in self.packages if pkg not in self.package_installed]
+            if unknown:
+                self.resolve_packages(unknown)
+            missing = [pkg for pkg in self.packages if not self.package_installed.get(pkg)]
+
+            for pkg in self.packages:
+                if pkg not in missing:
+                    self.states[pkg] = f"{KaliStyle.GREY}Already installed{KaliStyle.RESET}"
+
+            if not missing:
+                print_status(first_run=True)
+                print(f"\n{KaliStyle.SUCCESS} All packages already installed, repository update skipped")
+                return True
+
+            if not self.start_privileged():
+                return False
 
             print(f"{KaliStyle.INFO} Updating repositories...")
             success, _ = self.run_command(['apt', 'update'], sudo=True, quiet=True)
@@ -226,32 +1689,22 @@ class XfceInstaller:
                 return False
             print(f"{KaliStyle.SUCCESS} Repositories updated")
 
+            for pkg in missing:
+                self.states[pkg] = f"{KaliStyle.YELLOW}Installing...{KaliStyle.RESET}"
             print_status(first_run=True)
+
+            success, _ = self.run_command(['apt', 'install', '-y'] + missing, sudo=True, quiet=True, timeout=600)
+            installed = self.resolve_packages(missing)
             failed_packages = []
             
-            for pkg in self.packages:
-                check_result = subprocess.run(['dpkg-query', '-s', pkg], 
-                                            stdout=subprocess.DEVNULL, 
-                                            stderr=subprocess.DEVNULL)
-                if check_result.returncode == 0:
-                    self.states[pkg] = f"{KaliStyle.GREY}Already installed{KaliStyle.RESET}"
-                    print_status()
-                    continue
-                
-                self.states[pkg] = f"{KaliStyle.YELLOW}Installing...{KaliStyle.RESET}"
-                print_status()
-                
-                success, _ = self.run_command(['apt', 'install', '-y', pkg], sudo=True, quiet=True)
-                if success:
+            for pkg in missing:
+                if installed.get(pkg):
                     self.states[pkg] = f"{KaliStyle.GREEN}Completed{KaliStyle.RESET}"
                     self.actions_taken.append({'type': 'package', 'pkg': pkg})
                 else:
                     self.states[pkg] = f"{KaliStyle.RED}Failed{KaliStyle.RESET}"
                     failed_packages.append(pkg)
-                    print(f"{KaliStyle.WARNING} Warning: Failed to install {pkg}, continuing...")
-                
-                print_status()
-                time.sleep(0.2)
+            print_status()
             
             if failed_packages:
                 print(f"\n{KaliStyle.WARNING} The following packages failed: {', '.join(failed_packages)}")
@@ -267,56 +1720,30 @@ class XfceInstaller:
 
     def copy_files(self):
         print(f"\n{KaliStyle.INFO} Copying files...")
-        source_bin = os.path.join(self.script_dir, "bin")
+        source_bin = self.source_dir
         dest_bin = os.path.join(self.home_dir, '.config/bin')
         
-        if os.path.exists(dest_bin):
-            print(f"{KaliStyle.WARNING} Bin directory already exists, backing up...")
-            backup_dir = f"{dest_bin}.backup.{int(time.time())}"
-            try:
-                shutil.move(dest_bin, backup_dir)
-                self.actions_taken.append({'type': 'backup', 'original': dest_bin, 'backup': backup_dir})
-                print(f"{KaliStyle.INFO} Backup created at {backup_dir}")
-            except Exception as e:
-                print(f"{KaliStyle.ERROR} Error creating backup: {str(e)}")
-                return False
-        
+        deployer = Deployer(source_bin, dest_bin, self.manifest, self.backups,
+                            modes={rel: 0o755 for rel in self.EXECUTABLES}, owner=self.owner,
+                            preserved=self.PRESERVED_FILES)
         try:
-            os.makedirs(os.path.dirname(dest_bin), exist_ok=True)
-            shutil.copytree(source_bin, dest_bin)
-            self.actions_taken.append({'type': 'dir_copy', 'dest': dest_bin})
-            print(f"{KaliStyle.SUCCESS} Files copied")
-            return True
+            self.files_changed = deployer.deploy(self.actions_taken, self.source_hashes)
         except Exception as e:
             print(f"{KaliStyle.ERROR} Error copying files: {str(e)}")
             logging.error(f"Error copying files: {str(e)}")
             return False
-
-    def set_permissions(self):
-        print(f"\n{KaliStyle.INFO} Setting permissions...")
-        scripts = [
-            os.path.join(self.home_dir, '.config/bin/target.sh'),
-            os.path.join(self.home_dir, '.config/bin/ethernet.sh'),
-            os.path.join(self.home_dir, '.config/bin/vpnip.sh')
-        ]
         
-        for script in scripts:
-            if not os.path.exists(script):
-                print(f"{KaliStyle.WARNING} Script not found: {os.path.basename(script)}")
-                continue
-                
-            try:
-                os.chmod(script, 0o755)
-                print(f"{KaliStyle.SUCCESS} Permissions set for {os.path.basename(script)}")
-            except Exception as e:
-                print(f"{KaliStyle.ERROR} Error setting permissions for {script}: {str(e)}")
-                logging.error(f"Error setting permissions: {str(e)}")
-                return False
+        if self.files_changed:
+            print(f"{KaliStyle.SUCCESS} Updated {len(self.files_changed)} file(s): {', '.join(self.files_changed)}")
+        else:
+            print(f"{KaliStyle.SUCCESS} Files already up to date")
+        if deployer.adjusted:
+            print(f"{KaliStyle.SUCCESS} Permissions fixed for {', '.join(deployer.adjusted)}")
         return True
 
     def add_settarget_function(self):
         print(f"\n{KaliStyle.INFO} Adding settarget function...")
-        shell = os.environ.get('SHELL', '').split('/')[-1]
+        shell = self.shell.split('/')[-1]
         
         if shell == 'zsh':
             rc_file = '.zshrc'
@@ -336,98 +1763,63 @@ class XfceInstaller:
                 print(f"{KaliStyle.ERROR} Could not create {rc_file}: {str(e)}")
                 return False
 
+        recorded = self.manifest.get('rc') or {}
+        if recorded.get('path') == rc_path and recorded.get('snippet') == self.RC_VERSION and \
+                recorded.get('stat') == InstallManifest.stat_key(rc_path):
+            print(f"{KaliStyle.SUCCESS} Function in {rc_file} is up to date")
+            return True
+
         function_text = f"""
+# >>> kaliwidget settarget v{self.RC_VERSION} >>>
 # ------------------------------- settarget Function --------------------------- #
 function settarget() {{
-    local WHITE='\\033[1;37m'
-    local GREEN='\\033[0;32m'
-    local YELLOW='\\033[1;33m'
-    local RED='\\033[0;31m'
-    local BLUE='\\033[0;34m'
-    local CYAN='\\033[1;36m'
-    local PURPLE='\\033[1;35m'
-    local GRAY='\\033[38;5;244m'
-    local BOLD='\\033[1m'
-    local ITALIC='\\033[3m'
-    local COMAND='\\033[38;2;73;174;230m'
-    local NC='\\033[0m'
-    
-    local target_file="{self.home_dir}/.config/bin/target/target.txt"
-    
-    mkdir -p "$(dirname "$target_file")" 2>/dev/null
-    
     if [ $# -eq 0 ]; then
-        if [ -f "$target_file" ]; then
-            rm -f "$target_file"
-            echo -e "\\n${{CYAN}}[${{BOLD}}+${{NC}}${{CYAN}}]${{NC}} Target limpiado correctamente\\n"
-        else
-            echo -e "\\n${{YELLOW}}[${{BOLD}}!${{NC}}${{YELLOW}}]${{NC}} No hay target para limpiar\\n"
-        fi
-        return 0
-    fi
-    
-    local ip_address="$1"
-    local machine_name="$2"
-    
-    if [ -z "$ip_address" ] || [ -z "$machine_name" ]; then
-        echo -e "\\n${{RED}}▋${{NC}} Error${{RED}}${{BOLD}}:${{NC}}${{ITALIC}} modo de uso.${{NC}}"
-        echo -e "${{GRAY}}—————————————————————${{NC}}"
-        echo -e "  ${{CYAN}}• ${{NC}}${{COMAND}}settarget ${{NC}}192.168.1.100 WebServer "
-        echo -e "  ${{CYAN}}• ${{NC}}${{COMAND}}settarget ${{GRAY}}${{ITALIC}}(limpiar target)${{NC}}\\n"
-        return 1
-    fi
-    
-    if ! echo "$ip_address" | grep -qE '^[0-9]{{1,3}}\\.[0-9]{{1,3}}\\.[0-9]{{1,3}}\\.[0-9]{{1,3}}$'; then
-        echo -e "\\n${{RED}}▋${{NC}} Error${{RED}}${{BOLD}}:${{NC}}"
-        echo -e "${{GRAY}}————————${{NC}}"
-        echo -e "${{RED}}[${{BOLD}}✘${{NC}}${{RED}}]${{NC}} Formato de IP inválido ${{YELLOW}}→${{NC}} ${{RED}}$ip_address${{NC}}"
-        echo -e "${{BLUE}}${{BOLD}}[+] ${{NC}}Ejemplo válido:${{NC}} ${{GRAY}}192.168.1.100${{NC}}\\n"
-        return 1
-    fi
-    
-    if ! echo "$ip_address" | awk -F'.' '{{ 
-        for(i=1; i<=4; i++) {{ 
-            if($i < 0 || $i > 255) exit 1
-            if(length($i) > 1 && substr($i,1,1) == "0") exit 1
-        }}
-    }}'; then
-        echo -e "\\n${{RED}}[${{BOLD}}✘${{NC}}${{RED}}]${{NC}} IP inválida ${{RED}}→${{NC}} ${{BOLD}}$ip_address${{NC}}"
-        return 1
-    fi
-    
-    echo "$ip_address $machine_name" > "$target_file"
-    
-    if [ $? -eq 0 ]; then
-        echo -e "\\n${{YELLOW}}▌${{NC}} Target establecido correctamente${{YELLOW}}${{BOLD}}:${{NC}}"
-        echo -e "${{GRAY}}—————————————————————————————————${{NC}}"
-        echo -e "${{CYAN}}→${{NC}} IP Address:${{GRAY}}...........${{NC}} ${{GREEN}}$ip_address${{NC}}"
-        echo -e "${{CYAN}}→${{NC}} Machine Name:${{GRAY}}.........${{NC}} ${{GREEN}}$machine_name${{NC}}\\n"
+        python3 -S "{self.runtime_home}/.config/bin/kaliwidget.py" target clear
     else
-        echo -e "\\n${{RED}}[${{BOLD}}✘${{NC}}${{RED}}]${{NC}} No se pudo guardar el target\\n"
-        return 1
+        python3 -S "{self.runtime_home}/.config/bin/kaliwidget.py" target set "$@"
     fi
-    
-    return 0
 }}
+
+function targets() {{
+    [ $# -eq 0 ] && set -- list
+    python3 -S "{self.runtime_home}/.config/bin/kaliwidget.py" target "$@"
+}}
+# <<< kaliwidget settarget <<<
 """
         try:
-            if os.path.exists(rc_path):
-                with open(rc_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    if 'function settarget()' in content or 'XFCE Installer: settarget function' in content:
-                        print(f"{KaliStyle.WARNING} Function already exists in {rc_file}. Skipping.")
-                        return True
+            with open(rc_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            block = self.RC_BLOCK_RE.search(content)
+            
+            if block and int(block.group(1)) == self.RC_VERSION:
+                print(f"{KaliStyle.SUCCESS} Function in {rc_file} is up to date")
+                self.record_rc(rc_path, self.RC_VERSION)
+                return True
+            legacy = None if block else self.LEGACY_RC_RE.search(content)
             
-            if os.path.exists(rc_path) and not os.access(rc_path, os.W_OK):
+            if not os.access(rc_path, os.W_OK):
                 print(f"{KaliStyle.ERROR} No write permissions for {rc_file}. Check permissions.")
                 logging.error(f"No write permissions for {rc_path}")
                 return False
             
-            with open(rc_path, 'a', encoding='utf-8') as f:
-                f.write(function_text)
-            
-            self.actions_taken.append({'type': 'file_append', 'dest': rc_path, 'content': function_text})
-            print(f"{KaliStyle.SUCCESS} Function added to {rc_file}")
+            if block or legacy:
+                replaced = block or legacy
+                if legacy:
+                    self.backups.add(rc_file, rc_path, InstallManifest.hash_file(rc_path))
+                    self.backups.commit()
+                with open(rc_path, 'w', encoding='utf-8') as f:
+                    f.write(content[:replaced.start()] + function_text + content[replaced.end():])
+                self.actions_taken.append({'type': 'file_restore', 'dest': rc_path, 'content': content.encode()})
+                print(f"{KaliStyle.SUCCESS} Function in {rc_file} updated to v{self.RC_VERSION}")
+            else:
+                if 'function settarget()' in content:
+                    # A hand-edited function is left in place; the block below defines it again and wins
+                    print(f"{KaliStyle.WARNING} Custom settarget found in {rc_file}, the new one is added after it")
+                with open(rc_path, 'a', encoding='utf-8') as f:
+                    f.write(function_text)
+                self.actions_taken.append({'type': 'file_append', 'dest': rc_path, 'content': function_text})
+                print(f"{KaliStyle.SUCCESS} Function added to {rc_file}")
+            self.record_rc(rc_path, self.RC_VERSION)
             return True
             
         except IOError as e:
@@ -435,143 +1827,94 @@ function settarget() {{
             logging.error(f"Error adding function: {str(e)}")
             return False
 
+    def record_rc(self, rc_path, snippet):
+        self.manifest.set('rc', {'path': rc_path, 'snippet': snippet, 'stat': InstallManifest.stat_key(rc_path)})
+
+    def get_panel_model(self):
+        if self.panel_model is None:
+            self.panel_model = PanelModel(self.xfconf)
+        return self.panel_model
+
+    def check_panel_state(self):
+        recorded = self.manifest.get('panel') or {}
+        self.panel_current = False
+        if not recorded or recorded.get('layout') != self.layout:
+            return True
+        try:
+            model = self.get_panel_model()
+        except Exception as e:
+            logging.warning(f"Could not read panel state: {str(e)}")
+            return True
+        plugins = {widget: int(id_) for widget, id_ in recorded.get('plugins', {}).items()}
+        if not model.loaded or not plugins or set(model.plugins_of_type('genmon')) != set(plugins.values()):
+            return True
+        
+        status_dir = os.path.join(self.runtime_home, '.config/bin/status')
+        for widget, plugin_id in plugins.items():
+            if model.locate(plugin_id)[0] is None:
+                return True
+            expected = [f'Command=cat {os.path.join(status_dir, f"{widget}.xml")}',
+                        f'UpdatePeriod={int(float(recorded.get("period", self.GENMON_POLL_PERIOD)) * 1000)}']
+            rc_file = os.path.join(self.home_dir, '.config/xfce4/panel', f'genmon-{plugin_id}.rc')
+            try:
+                with open(rc_file, 'r', encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                return True
+            if any(line not in lines for line in expected):
+                return True
+        
+        self.panel_current = True
+        self.panel_plugins = plugins
+        self.panel_period = recorded.get('period')
+        print(f"{KaliStyle.SUCCESS} Panel plugins already in place: {', '.join(map(str, plugins.values()))}")
+        return True
+
     def remove_existing_genmon(self):
+        if self.panel_current:
+            return True
         print(f"\n{KaliStyle.INFO} Removing existing genmon plugins...")
         try:
-            success, output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', '/plugins', '-l', '-v'])
-            if not success:
+            model = self.get_panel_model()
+            if not model.loaded:
                 print(f"{KaliStyle.WARNING} No plugins found or xfconf-query failed.")
                 return True
         except Exception as e:
             print(f"{KaliStyle.WARNING} Error querying plugins: {str(e)}")
             return True
 
-        genmon_ids = []
-        for line in output.splitlines():
-            parts = line.split(maxsplit=1)
-            if len(parts) == 2:
-                path, value = parts
-                if path.startswith('/plugins/plugin-') and value.strip() == 'genmon':
-                    match = re.match(r'/plugins/plugin-(\d+)', path)
-                    if match:
-                        id_ = int(match.group(1))
-                        genmon_ids.append(id_)
-
-        for id_ in genmon_ids:
-            success, _ = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/plugins/plugin-{id_}', '-r', '-R'])
-            if success:
-                print(f"{KaliStyle.SUCCESS} Removed genmon plugin {id_}")
-
-        try:
-            success, panels_output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', '/panels'])
-            if success:
-                panels = [int(l.strip()) for l in panels_output.splitlines() if l.strip().isdigit()]
-            else:
-                panels = [1]
-        except Exception:
-            panels = [1]
-
-        for p in panels:
-            try:
-                success, ids_output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{p}/plugin-ids'])
-                if success and ids_output.strip():
-                    current_ids = [int(l.strip()) for l in ids_output.splitlines() if l.strip().isdigit()]
-                    new_ids = [i for i in current_ids if i not in genmon_ids]
-                    if len(new_ids) < len(current_ids):
-                        self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{p}/plugin-ids', '-r'])
-                        if new_ids:
-                            args = ['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{p}/plugin-ids', '--create', '-a']
-                            for i in new_ids:
-                                args += ['-t', 'int', '-s', str(i)]
-                            self.run_command(args)
-            except Exception as e:
-                logging.warning(f"Error updating panel {p}: {str(e)}")
-                continue
+        for id_ in model.plugins_of_type('genmon'):
+            model.remove_plugin(id_)
+            print(f"{KaliStyle.SUCCESS} Removed genmon plugin {id_}")
 
         print(f"{KaliStyle.SUCCESS} Existing genmon plugins removed")
         return True
 
     def find_and_remove_cpugraph(self):
+        if self.panel_current:
+            return 1, None
         print(f"\n{KaliStyle.INFO} Removing CPU Graph...")
         try:
-            success, output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', '/plugins', '-l', '-v'])
-            if not success:
+            model = self.get_panel_model()
+            if not model.loaded:
                 return 1, None
         except Exception:
             return 1, None
 
-        cpugraph_id = None
-        for line in output.splitlines():
-            parts = line.split(maxsplit=1)
-            if len(parts) == 2:
-                path, value = parts
-                if value.strip() == 'cpugraph':
-                    match = re.match(r'/plugins/plugin-(\d+)', path)
-                    if match:
-                        cpugraph_id = int(match.group(1))
-                        break
-
-        if not cpugraph_id:
+        cpugraph_ids = model.plugins_of_type('cpugraph')
+        if not cpugraph_ids:
             print(f"{KaliStyle.WARNING} No CPU Graph found.")
             return 1, None
 
-        self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/plugins/plugin-{cpugraph_id}', '-r', '-R'])
-
-        try:
-            success, panels_output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', '/panels'])
-            if success:
-                panels = [int(l.strip()) for l in panels_output.splitlines() if l.strip().isdigit()]
-            else:
-                panels = [1]
-        except Exception:
-            panels = [1]
-
-        panel_id = 1
-        insert_index = None
-        
-        for p in panels:
-            try:
-                success, ids_output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{p}/plugin-ids'])
-                if success and ids_output.strip():
-                    current_ids = [int(l.strip()) for l in ids_output.splitlines() if l.strip().isdigit()]
-                    if cpugraph_id in current_ids:
-                        insert_index = current_ids.index(cpugraph_id)
-                        panel_id = p
-                        new_ids = [i for i in current_ids if i != cpugraph_id]
-                        
-                        self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{p}/plugin-ids', '-r'])
-                        if new_ids:
-                            args = ['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{p}/plugin-ids', '--create', '-a']
-                            for i in new_ids:
-                                args += ['-t', 'int', '-s', str(i)]
-                            self.run_command(args)
-                        break
-            except Exception as e:
-                logging.warning(f"Error processing panel {p}: {str(e)}")
-                continue
+        panel_id, insert_index = model.remove_plugin(cpugraph_ids[0])
+        if panel_id is None:
+            panel_id = 1
 
         print(f"{KaliStyle.SUCCESS} CPU Graph removed")
         return panel_id, insert_index
 
     def add_genmon_to_panel(self, command, period='0.25', title=''):
-        try:
-            success, output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', '/plugins', '-l'])
-            if success:
-                ids = set()
-                for line in output.splitlines():
-                    match = re.match(r'/plugins/plugin-(\d+)(/.*)?$', line)
-                    if match:
-                        ids.add(int(match.group(1)))
-                next_id = max(ids) + 1 if ids else 1
-            else:
-                next_id = 1
-        except Exception:
-            next_id = 1
-
-        success, _ = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/plugins/plugin-{next_id}', '-t', 'string', '-s', 'genmon', '--create'])
-        if not success:
-            print(f"{KaliStyle.WARNING} Failed to create genmon plugin {next_id}")
-            return None
+        next_id = self.get_panel_model().add_plugin('genmon')
 
         rc_dir = os.path.join(self.home_dir, '.config/xfce4/panel')
         os.makedirs(rc_dir, exist_ok=True)
@@ -586,35 +1929,15 @@ function settarget() {{
                 f.write('Font=Cantarell Ultra-Bold 10\n')
 
             self.actions_taken.append({'type': 'file_copy', 'dest': rc_file})
+            self.genmon_ids.append(next_id)
             return next_id
         except Exception as e:
             print(f"{KaliStyle.ERROR} Error creating genmon config: {str(e)}")
+            self.get_panel_model().remove_plugin(next_id)
             return None
 
     def add_separator_to_panel(self):
-        try:
-            success, output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', '/plugins', '-l'])
-            if success:
-                ids = set()
-                for line in output.splitlines():
-                    match = re.match(r'/plugins/plugin-(\d+)(/.*)?$', line)
-                    if match:
-                        ids.add(int(match.group(1)))
-                next_id = max(ids) + 1 if ids else 1
-            else:
-                next_id = 1
-        except Exception:
-            next_id = 1
-
-        success1, _ = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/plugins/plugin-{next_id}', '-t', 'string', '-s', 'separator', '--create'])
-        success2, _ = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/plugins/plugin-{next_id}/style', '-t', 'int', '-s', '0', '--create'])
-        success3, _ = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/plugins/plugin-{next_id}/expand', '-t', 'bool', '-s', 'false', '--create'])
-
-        if not (success1 and success2 and success3):
-            print(f"{KaliStyle.WARNING} Failed to create separator plugin {next_id}")
-            return None
-
-        return next_id
+        return self.get_panel_model().add_plugin('separator', [('style', 'int', 0), ('expand', 'bool', False)])
 
     def insert_panel_plugin_ids(self, new_ids, panel_id=1, insert_index=None):
         new_ids = [id_ for id_ in new_ids if id_ is not None]
@@ -622,86 +1945,208 @@ function settarget() {{
             print(f"{KaliStyle.WARNING} No valid plugin IDs to insert")
             return False
 
+        model = self.get_panel_model()
+        model.insert(panel_id, insert_index, new_ids)
+        return model.commit()
+
+    def setup_status_daemon(self):
+        print(f"\n{KaliStyle.INFO} Setting up status daemon...")
+        daemon_path = os.path.join(self.home_dir, '.config/bin/statusd.py')
+        status_dir = os.path.join(self.home_dir, '.config/bin/status')
+        pid_file = os.path.join(status_dir, 'statusd.pid')
+
+        if not os.path.exists(daemon_path):
+            print(f"{KaliStyle.ERROR} Status daemon not found: {daemon_path}")
+            return False
+
+        if self.manifest.loaded and not self.files_changed and self.manifest.get('layout') == self.layout:
+            try:
+                with open(pid_file, 'r') as f:
+                    running = Readiness.pid_alive(int(f.read().strip()))
+            except (OSError, ValueError):
+                running = False
+            if running:
+                print(f"{KaliStyle.SUCCESS} Status daemon already running with current files")
+                return True
+
+        clipboard = self.resolve_clipboard()
+        self.update_panel_config('clipboard', clipboard)
+        print(f"{KaliStyle.INFO} Clipboard backend: {clipboard['backend']}")
+
+        if not self.write_autostart():
+            return False
+
         try:
-            success, output = self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{panel_id}/plugin-ids'])
-            if success and output.strip():
-                current_ids = [int(l.strip()) for l in output.splitlines() if l.strip().isdigit()]
-            else:
-                current_ids = []
-        except Exception:
-            current_ids = []
+            with open(pid_file, 'r') as f:
+                old_pid = int(f.read().strip())
+            os.kill(old_pid, signal.SIGTERM)
+            self.readiness.wait("previous daemon exit", lambda: not Readiness.pid_alive(old_pid), timeout=5)
+        except (OSError, ValueError):
+            pass
 
-        if insert_index is None or insert_index > len(current_ids):
-            insert_index = len(current_ids)
+        try:
+            self.tracer.run(['/usr/bin/python3', daemon_path, '--once', '--layout', self.layout],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=10)
+            subprocess.Popen(['/usr/bin/python3', daemon_path, '--layout', self.layout],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                             stdin=subprocess.DEVNULL, start_new_session=True)
+            self.actions_taken.append({'type': 'process', 'pid_file': pid_file})
+            print(f"{KaliStyle.SUCCESS} Status daemon started")
+            return True
+        except Exception as e:
+            print(f"{KaliStyle.ERROR} Error starting status daemon: {str(e)}")
+            logging.error(f"Error starting status daemon: {str(e)}")
+            return False
 
-        updated_ids = current_ids[:insert_index] + new_ids + current_ids[insert_index:]
+    def write_autostart(self):
+        autostart_dir = os.path.join(self.home_dir, '.config/autostart')
+        autostart_file = os.path.join(autostart_dir, 'kaliwidget-status.desktop')
+        daemon_path = os.path.join(self.runtime_home, '.config/bin/statusd.py')
+        try:
+            os.makedirs(autostart_dir, exist_ok=True)
+            existed = os.path.exists(autostart_file)
+            with open(autostart_file, 'w', encoding='utf-8') as f:
+                f.write('[Desktop Entry]\n')
+                f.write('Type=Application\n')
+                f.write('Name=KaliWidget Status\n')
+                f.write('Comment=Collects TARGET, VPN and ETHERNET data for the panel widgets\n')
+                f.write(f'Exec=/usr/bin/python3 {daemon_path} --layout {self.layout}\n')
+                f.write('NoDisplay=true\n')
+                f.write('X-GNOME-Autostart-enabled=true\n')
+            if not existed:
+                self.actions_taken.append({'type': 'file_create', 'dest': autostart_file})
+            return True
+        except Exception as e:
+            print(f"{KaliStyle.ERROR} Error creating autostart entry: {str(e)}")
+            logging.error(f"Error creating autostart entry: {str(e)}")
+            return False
 
-        self.run_command(['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{panel_id}/plugin-ids', '-r'])
-        
-        if updated_ids:
-            args = ['xfconf-query', '-c', 'xfce4-panel', '-p', f'/panels/panel-{panel_id}/plugin-ids', '--create', '-a']
-            for id_ in updated_ids:
-                args += ['-t', 'int', '-s', str(id_)]
-            success, _ = self.run_command(args)
-            return success
-        
+    def genmon_supports_push(self):
+        admindir = ['--admindir', os.path.join(self.target.root, 'var/lib/dpkg')] if self.target.chroot else []
+        try:
+            result = self.tracer.run(['dpkg-query'] + admindir + ['-W', '-f', '${Version}', 'xfce4-genmon-plugin'],
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=30)
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            return False
+        match = re.match(r'(?:\d+:)?(\d+)\.(\d+)', result.stdout.strip())
+        if not match:
+            return False
+        return (int(match.group(1)), int(match.group(2))) >= self.GENMON_PUSH_VERSION
+
+    def update_panel_config(self, section, values):
+        panel_file = os.path.join(self.home_dir, '.config/bin/panel.conf')
+        config = configparser.ConfigParser()
+        try:
+            existed = os.path.exists(panel_file)
+            config.read(panel_file, encoding='utf-8')
+            if config.has_section(section):
+                config.remove_section(section)
+            if values:
+                config[section] = {key: str(value) for key, value in values.items()}
+            with open(panel_file, 'w', encoding='utf-8') as f:
+                config.write(f)
+            if not existed:
+                self.actions_taken.append({'type': 'file_create', 'dest': panel_file})
+            return True
+        except (OSError, configparser.Error) as e:
+            logging.warning(f"Could not write {panel_file}: {str(e)}")
+            return False
+
+    def resolve_clipboard(self):
+        # Same order as clipboard.detect_backend(): xclip clicks are a single exec, the gtk socket needs a client
+        xclip = shutil.which('xclip')
+        if xclip:
+            backend = 'xclip'
+        elif importlib.util.find_spec('gi') is not None:
+            backend = 'gtk'
+        else:
+            backend = 'none'
+        return {'backend': backend, 'xclip': xclip or ''}
+
+    def write_panel_mapping(self, plugin_ids):
+        pid_file = os.path.join(self.home_dir, '.config/bin/status/statusd.pid')
+        if not self.update_panel_config('plugins', plugin_ids):
+            return False
+
+        try:
+            with open(pid_file, 'r') as f:
+                os.kill(int(f.read().strip()), signal.SIGUSR1)
+        except (OSError, ValueError):
+            pass
         return True
 
     def add_plugins_to_panel(self, panel_id, insert_index):
+        if self.panel_current:
+            print(f"{KaliStyle.SUCCESS} Panel unchanged, nothing to add")
+            return True
         print(f"\n{KaliStyle.INFO} Adding plugins to XFCE panel...")
         
-        target_path = os.path.join(self.home_dir, '.config/bin/target.sh')
-        vpn_path = os.path.join(self.home_dir, '.config/bin/vpnip.sh')
-        ethernet_path = os.path.join(self.home_dir, '.config/bin/ethernet.sh')
+        status_dir = os.path.join(self.home_dir, '.config/bin/status')
+        widgets = self.LAYOUTS[self.layout]
+        outputs = [(widget, os.path.join(status_dir, f'{widget}.xml')) for widget in widgets]
         
-        missing_scripts = []
-        for script, name in [(target_path, 'target.sh'), (vpn_path, 'vpnip.sh'), (ethernet_path, 'ethernet.sh')]:
-            if not os.path.exists(script):
-                missing_scripts.append(name)
+        # Offline there is no daemon yet; it writes the outputs when the session starts
+        missing_outputs = [] if self.xfconf.offline else \
+            [f'{widget}.xml' for widget, path in outputs if not os.path.exists(path)]
         
-        if missing_scripts:
-            print(f"{KaliStyle.WARNING} Missing scripts: {', '.join(missing_scripts)}")
-            print(f"{KaliStyle.INFO} Continuing with available scripts...")
+        if missing_outputs:
+            print(f"{KaliStyle.WARNING} Missing widget outputs: {', '.join(missing_outputs)}")
+            print(f"{KaliStyle.INFO} Continuing with available widgets...")
         
-        new_ids = []
-        
-        if os.path.exists(target_path):
-            target_id = self.add_genmon_to_panel(target_path, '0.25', '')
-            if target_id:
-                new_ids.append(target_id)
-                new_ids.append(self.add_separator_to_panel())
+        push = self.genmon_supports_push()
+        period = self.GENMON_PUSH_PERIOD if push else self.GENMON_POLL_PERIOD
+        if push:
+            print(f"{KaliStyle.INFO} Push refresh enabled, genmon fallback period {period} s")
         
-        if os.path.exists(vpn_path):
-            vpn_id = self.add_genmon_to_panel(vpn_path, '0.25', '')
-            if vpn_id:
-                new_ids.append(vpn_id)
-                new_ids.append(self.add_separator_to_panel())
+        new_ids = []
+        plugin_ids = {}
         
-        if os.path.exists(ethernet_path):
-            ethernet_id = self.add_genmon_to_panel(ethernet_path, '0.25', '')
-            if ethernet_id:
-                new_ids.append(ethernet_id)
+        for widget, path in outputs:
+            if f'{widget}.xml' in missing_outputs:
+                continue
+            runtime_path = os.path.join(self.runtime_home, '.config/bin/status', f'{widget}.xml')
+            plugin_id = self.add_genmon_to_panel(f'cat {runtime_path}', period, '')
+            if plugin_id:
+                new_ids.append(plugin_id)
+                plugin_ids[widget] = plugin_id
+                if widget != widgets[-1]:
+                    new_ids.append(self.add_separator_to_panel())
         
         if new_ids:
             success = self.insert_panel_plugin_ids(new_ids, panel_id, insert_index)
             if success:
+                self.panel_plugins = plugin_ids
+                self.panel_period = period
+                self.write_panel_mapping(plugin_ids if push else {})
                 print(f"{KaliStyle.SUCCESS} Plugins added successfully")
                 return True
             else:
                 print(f"{KaliStyle.ERROR} Failed to add plugins to panel")
                 return False
         else:
-            print(f"{KaliStyle.WARNING} No plugins were added due to missing scripts")
+            print(f"{KaliStyle.WARNING} No plugins were added due to missing widget outputs")
             return False
 
     def restart_panel(self):
+        if self.panel_current:
+            print(f"{KaliStyle.SUCCESS} Panel unchanged, restart not needed")
+            return True
+        if self.xfconf.offline:
+            print(f"{KaliStyle.SUCCESS} Panel channel written offline, it loads at the next login")
+            return True
         print(f"\n{KaliStyle.INFO} Restarting XFCE panel...")
         try:
-            subprocess.run(['pkill', 'xfce4-panel'], stderr=subprocess.DEVNULL)
-            time.sleep(1)
+            uid = os.getuid()
+            self.tracer.run(['pkill', '-u', str(uid), '-x', 'xfce4-panel'], stderr=subprocess.DEVNULL)
+            self.readiness.wait("panel exit", lambda: not Readiness.find_processes('xfce4-panel', uid), timeout=5)
             
-            subprocess.Popen(['xfce4-panel'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            time.sleep(2)
+            subprocess.Popen(['xfce4-panel'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                             start_new_session=True)
+            if not self.readiness.wait("panel D-Bus name", lambda: Readiness.dbus_name_has_owner('org.xfce.Panel'), timeout=10):
+                print(f"{KaliStyle.WARNING} Panel did not register on D-Bus in time")
+            elif self.genmon_ids and not self.readiness.wait(
+                    "plugins registered", lambda: Readiness.panel_plugins_loaded(self.genmon_ids, uid), timeout=10):
+                print(f"{KaliStyle.WARNING} Panel plugins are still loading")
             
             print(f"{KaliStyle.SUCCESS} Panel restarted")
             return True
@@ -713,6 +2158,9 @@ function settarget() {{
 
     def check_previous_installation(self):
         config_bin_path = os.path.join(self.home_dir, '.config/bin')
+        if self.manifest.loaded and os.path.exists(config_bin_path):
+            print(f"{KaliStyle.INFO} Existing installation found, only changes will be applied.")
+            return True
         if os.path.exists(config_bin_path):
             print(f"{KaliStyle.WARNING} Previous installation detected.")
             print(f"{KaliStyle.INFO} Directory: {config_bin_path}")
@@ -729,24 +2177,12 @@ function settarget() {{
         return True
 
     def cleanup(self):
-        #print(f"\n{KaliStyle.INFO} Cleaning up...")
-        
         try:
-            config_bin = os.path.join(self.home_dir, '.config/bin')
-            if os.path.exists(config_bin):
-                user_info = pwd.getpwnam(self.current_user)
-                uid, gid = user_info.pw_uid, user_info.pw_gid
-                
-                for root, dirs, files in os.walk(config_bin):
-                    os.chown(root, uid, gid)
-                    for file in files:
-                        os.chown(os.path.join(root, file), uid, gid)
-                    for dir in dirs:
-                        os.chown(os.path.join(root, dir), uid, gid)
-        except Exception as e:
-            logging.warning(f"Could not set proper ownership: {str(e)}")
-        
-        #print(f"{KaliStyle.SUCCESS} Cleanup completed")
+            removed = self.backups.prune()
+            if removed:
+                logging.info(f"Pruned {removed} old backup(s)")
+        except OSError as e:
+            logging.warning(f"Could not prune backups: {str(e)}")
         return True
 
     def rollback(self):
@@ -759,6 +2195,11 @@ function settarget() {{
                         os.remove(action['dest'])
                         print(f"{KaliStyle.SUCCESS} Deleted {action['dest']}")
                 
+                elif action['type'] == 'file_restore':
+                    with open(action['dest'], 'wb') as f:
+                        f.write(action['content'])
+                    print(f"{KaliStyle.SUCCESS} Restored {action['dest']}")
+                
                 elif action['type'] == 'dir_copy':
                     if os.path.exists(action['dest']):
                         shutil.rmtree(action['dest'])
@@ -771,9 +2212,17 @@ function settarget() {{
                         shutil.move(action['backup'], action['original'])
                         print(f"{KaliStyle.SUCCESS} Restored {action['original']} from backup")
                 
+                elif action['type'] == 'process':
+                    try:
+                        with open(action['pid_file'], 'r') as f:
+                            os.kill(int(f.read().strip()), signal.SIGTERM)
+                        print(f"{KaliStyle.SUCCESS} Stopped status daemon")
+                    except (OSError, ValueError):
+                        pass
+                
                 elif action['type'] == 'package':
                     print(f"{KaliStyle.WARNING} Removing package {action['pkg']}...")
-                    if self.sudo_password:
+                    if self.sudo_password or (self.sudo is not None and self.sudo.alive):
                         self.run_command(['apt', 'remove', '-y', action['pkg']], sudo=True, quiet=True)
                 
                 elif action['type'] == 'file_append':
@@ -796,8 +2245,35 @@ function settarget() {{
         
         print(f"{KaliStyle.SUCCESS} Rollback completed")
 
+    def save_manifest(self):
+        self.manifest.set('layout', self.layout)
+        if self.panel_plugins:
+            self.manifest.set('panel', {'layout': self.layout, 'plugins': self.panel_plugins,
+                                        'period': self.panel_period})
+        self.manifest.set('installed_at', time.strftime('%Y-%m-%dT%H:%M:%S%z'))
+        try:
+            self.manifest.save()
+            return True
+        except OSError as e:
+            print(f"{KaliStyle.WARNING} Could not write install manifest: {str(e)}")
+            logging.warning(f"Could not write install manifest: {str(e)}")
+            return True
+
+    def show_timing_report(self):
+        print(f"\n[{KaliStyle.BLUE}{KaliStyle.BOLD}+{KaliStyle.RESET}] Timing\n")
+        total = sum(elapsed for _, elapsed in self.task_timings)
+        for description, elapsed in self.task_timings:
+            print(f"  {KaliStyle.GREY}{description:<34} {elapsed:8.2f} s{KaliStyle.RESET}")
+            logging.info(f"Task '{description}' took {elapsed:.3f} s")
+        print(f"  {KaliStyle.WHITE}{'Total':<34} {total:8.2f} s{KaliStyle.RESET}")
+        if self.readiness.waits:
+            print("\n  Readiness waits:")
+            self.readiness.report()
+
+    def show_profile(self, top=10):
+        self.tracer.report(top)
+
     def show_final_message(self):
-        time.sleep(2)
         os.system('clear')
         print(f"\n\t\t[{KaliStyle.BLUE}{KaliStyle.BOLD}+{KaliStyle.RESET}] Installation Summary [{KaliStyle.BLUE}{KaliStyle.BOLD}+{KaliStyle.RESET}]\n")
 
@@ -818,6 +2294,7 @@ function settarget() {{
         print(f"  • Use {KaliStyle.APT_COLOR}settarget{KaliStyle.RESET} <IP> <Name> to set target")
         print(f"  • Example: {KaliStyle.APT_COLOR}settarget{KaliStyle.RESET} 192.168.1.100 WebServer")
         print(f"  • Use {KaliStyle.APT_COLOR}settarget{KaliStyle.RESET} (no args) to clear target")
+        print(f"  • Use {KaliStyle.APT_COLOR}targets{KaliStyle.RESET} list | use <IP/Name> | find <prefix> to switch between targets")
         
         print(f"\n{KaliStyle.WARNING}{KaliStyle.BOLD} Panel Restart:{KaliStyle.RESET}")
         print(f"  • If panel appears corrupted, run: {KaliStyle.APT_COLOR}xfce4-panel{KaliStyle.RESET} {KaliStyle.GREEN}--restart{KaliStyle.RESET}")
@@ -826,32 +2303,58 @@ function settarget() {{
 
         print(f"\n\t\t\t{KaliStyle.RED}{KaliStyle.BOLD}H4PPY H4CK1NG!{KaliStyle.RESET}")
 
-    def run(self):
+    def run_preflight(self):
+        with self.tracer.span('task', "Pre-flight checks"):
+            return self._run_preflight()
+
+    def _run_preflight(self):
+        preflight = self.preflight = Preflight(tracer=self.tracer)
+        start = time.perf_counter()
         checks = [
-            (self.check_os, "Operating System"),
-            (self.check_sudo_privileges, "Sudo Privileges"),
-            (self.check_required_files, "Required Files"),
-            (self.check_xfce_environment, "XFCE Environment")
+            ("Operating System", self.check_os),
+            ("Sudo Privileges", self.check_sudo_privileges),
+            ("Required Files", self.check_required_files)
         ]
+        probes = checks + [("XFCE Detection", self.detect_xfce_environment)]
+        probes += [("Packages", lambda: self.resolve_packages() is not None)]
+        
+        results = preflight.run(probes)
         
-        for check_func, description in checks:
-            if not check_func():
+        for description, _ in checks:
+            if not results[description]:
                 print(f"{KaliStyle.ERROR} {description} check failed")
+                preflight.report()
                 return False
+        
+        if not preflight.run_serial("XFCE Environment", lambda: self.check_xfce_environment(results["XFCE Detection"])):
+            print(f"{KaliStyle.ERROR} XFCE Environment check failed")
+            return False
+        
+        self.preflight_elapsed = time.perf_counter() - start
+        return True
+
+    def run(self):
+        if not self.run_preflight():
+            return False
 
         os.system('clear')
         self.show_banner()
         
+        print(f"{KaliStyle.INFO} Pre-flight checks completed in {self.preflight_elapsed * 1000:.0f} ms")
+        self.preflight.report()
+        
         self.check_previous_installation()
 
         tasks = [
             (self.install_additional_packages, "Installing additional packages"),
             (self.copy_files, "Copying configuration files"),
-            (self.set_permissions, "Setting file permissions"),
             (self.add_settarget_function, "Adding settarget function"),
+            (self.setup_status_daemon, "Starting status daemon"),
+            (self.check_panel_state, "Checking panel plugins"),
             (self.remove_existing_genmon, "Removing existing genmon plugins"),
             (lambda: self.add_plugins_to_panel(*self.find_and_remove_cpugraph()), "Adding panel plugins"),
-            (self.restart_panel, "Restarting XFCE panel")
+            (self.restart_panel, "Restarting XFCE panel"),
+            (self.save_manifest, "Recording install manifest")
         ]
 
         total_tasks = len(tasks)
@@ -861,15 +2364,18 @@ function settarget() {{
                 print(f"\n{KaliStyle.GREY}{'─' * 50}{KaliStyle.RESET}")
                 print(f"{KaliStyle.INFO} ({i}/{total_tasks}) {description}...")
                 
-                if not task():
+                start = time.perf_counter()
+                with self.tracer.span('task', description) as span:
+                    result = span['result'] = bool(task())
+                self.task_timings.append((description, time.perf_counter() - start))
+                if not result:
                     print(f"{KaliStyle.ERROR} Failed: {description}")
                     print(f"{KaliStyle.WARNING} Starting rollback...")
                     self.rollback()
                     return False
-                
-                time.sleep(0.5)
 
             self.show_final_message()
+            self.show_timing_report()
             
             self.cleanup()
             logging.info("Installation completed successfully")
@@ -888,10 +2394,381 @@ function settarget() {{
             self.rollback()
             return False
 
+        finally:
+            self.stop_privileged()
+
+# ------------------------------- Batch Class --------------------------- #
+
+class BatchTarget:
+
+    def __init__(self, name, user, home, owner=None, shell='', root='/'):
+        self.name = name
+        self.user = user
+        self.root = root
+        self.runtime_home = home
+        self.home = os.path.join(root, home.lstrip('/')) if root != '/' else home
+        self.owner = owner
+        self.shell = shell
+
+    @property
+    def chroot(self):
+        return self.root != '/'
+
+    @classmethod
+    def local(cls, user, shell=None):
+        home = os.path.expanduser(f'~{user}')
+        try:
+            entry = pwd.getpwnam(user)
+        except KeyError:
+            return cls(user, user, home, shell=shell or '')
+        return cls(user, user, home, (entry.pw_uid, entry.pw_gid),
+                   entry.pw_shell if shell is None else shell)
+
+    @classmethod
+    def in_root(cls, root, user):
+        # Image roots have their own users, so the host passwd database does not apply
+        with open(os.path.join(root, 'etc/passwd'), 'r', encoding='utf-8') as f:
+            for line in f:
+                fields = line.rstrip('\n').split(':')
+                if len(fields) >= 7 and fields[0] == user:
+                    return cls(f"{user}@{root}", user, fields[5], (int(fields[2]), int(fields[3])),
+                               fields[6], root=root)
+        raise KeyError(f"user '{user}' not found in {root}/etc/passwd")
+
+class InstallPlan:
+
+    def __init__(self, layout, source_hashes, clipboard, packages='install', run_id=None, engine='async',
+                 source=None, failed_roots=()):
+        self.layout = layout
+        self.run_id = run_id
+        self.engine = engine
+        self.source = source
+        self.source_hashes = source_hashes
+        self.clipboard = clipboard
+        self.packages = packages
+        self.failed_roots = set(failed_roots)
+
+def drop_privileges(owner):
+    # After this a symlink planted in the home can only point root's writes at files
+    # the target user could already change
+    uid, gid = owner
+    os.setgroups([])
+    os.setgid(gid)
+    os.setuid(uid)
+
+def install_batch_target(plan, target):
+    # Runs in a pool worker, which has to stay root for the next target, so the
+    # install itself happens in a child that gives up root before touching the home
+    start = time.perf_counter()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            result = run_batch_target(plan, target)
+            with os.fdopen(write_fd, 'wb') as f:
+                pickle.dump(result, f)
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as f:
+        data = f.read()
+    _, status = os.waitpid(pid, 0)
+    try:
+        return pickle.loads(data)
+    except (pickle.UnpicklingError, EOFError):
+        return {'name': target.name, 'ok': False, 'error': f"installer exited with status {status}",
+                'elapsed': time.perf_counter() - start, 'files': 0, 'panel': [], 'output': '', 'trace': []}
+
+def run_batch_target(plan, target):
+    # No prompts, output captured for the report
+    start = time.perf_counter()
+    output = io.StringIO()
+    error = None
+    installer = None
+    with contextlib.redirect_stdout(output):
+        try:
+            if target.owner is None:
+                raise PermissionError(f"no uid known for {target.user}, refusing to write as root")
+            # The trace and log files are opened while still root
+            script_dir = os.path.dirname(os.path.realpath(__file__))
+            tracer = Tracer(os.path.join(script_dir, 'install.trace.jsonl'), version=XfceInstaller.VERSION,
+                            target=target.name)
+            drop_privileges(target.owner)
+            installer = XfceInstaller(plan.layout, target=target, engine=plan.engine, xfconf='xml', tracer=tracer,
+                                      log_path=os.path.join(script_dir, 'install.log'))
+            installer.source_dir = os.path.join(plan.source, 'bin')
+            installer.source_hashes = plan.source_hashes
+            steps = [
+                ("Copying files", installer.copy_files),
+                ("Adding settarget function", installer.add_settarget_function),
+                ("Writing autostart entry", installer.write_autostart),
+                ("Writing clipboard backend", lambda: installer.update_panel_config('clipboard', plan.clipboard)),
+                ("Adding panel plugins", lambda: BatchInstaller.configure_panel(installer)),
+                ("Recording install manifest", installer.save_manifest)
+            ]
+            installer.tracer.context['run'] = plan.run_id
+            with installer.tracer.span('target', target.name):
+                for description, step in steps:
+                    with installer.tracer.span('task', description) as span:
+                        span['result'] = bool(step())
+                    if not span['result']:
+                        error = description
+                        break
+        except Exception as e:
+            error = str(e)
+            logging.error(f"Batch target {target.name} failed: {str(e)}")
+        if installer is not None:
+            if error:
+                installer.rollback()
+            else:
+                installer.cleanup()
+            installer.tracer.close()
+    return {
+        'name': target.name,
+        'ok': error is None,
+        'error': error,
+        'elapsed': time.perf_counter() - start,
+        'files': len(installer.files_changed or []) if installer else 0,
+        'panel': sorted(installer.panel_plugins.values()) if installer else [],
+        'output': output.getvalue(),
+        'trace': installer.tracer.records if installer else []
+    }
+
+class BatchInstaller:
+    PACKAGE_POLICIES = ('install', 'check', 'skip')
+
+    def __init__(self, config_path, layout=None, jobs=None, engine='async'):
+        self.config_path = config_path
+        self.layout = layout
+        self.jobs = jobs
+        self.engine = engine
+        self.packages = 'install'
+        self.targets = []
+        self.results = []
+        self.source = None
+        self.script_dir = os.path.dirname(os.path.realpath(__file__))
+        self.tracer = Tracer(os.path.join(self.script_dir, 'install.trace.jsonl'),
+                             version=XfceInstaller.VERSION, target='batch')
+        logging.basicConfig(filename=os.path.join(self.script_dir, 'install.log'), level=logging.INFO,
+                            format='%(asctime)s - %(levelname)s - %(message)s')
+
+    def load(self):
+        config = configparser.ConfigParser()
+        try:
+            if not config.read(self.config_path, encoding='utf-8'):
+                print(f"{KaliStyle.ERROR} Batch file not found: {self.config_path}")
+                return False
+        except configparser.Error as e:
+            print(f"{KaliStyle.ERROR} Invalid batch file {self.config_path}: {str(e)}")
+            return False
+
+        section = config['batch'] if config.has_section('batch') else {}
+        self.layout = self.layout or section.get('layout', 'split')
+        self.packages = section.get('packages', 'install')
+        try:
+            self.jobs = self.jobs or int(section.get('jobs', os.cpu_count() or 1))
+        except ValueError:
+            print(f"{KaliStyle.ERROR} jobs must be a number")
+            return False
+        if self.layout not in XfceInstaller.LAYOUTS or self.packages not in self.PACKAGE_POLICIES:
+            print(f"{KaliStyle.ERROR} Unknown layout '{self.layout}' or packages policy '{self.packages}'")
+            return False
+
+        errors = []
+        users = section.get('users', '').split()
+        users += [name[5:] for name in config.sections() if name.startswith('user:')]
+        for user in users:
+            if not self._has_user(user):
+                errors.append(f"unknown user '{user}'")
+                continue
+            self.targets.append(BatchTarget.local(user))
+        for name in config.sections():
+            if not name.startswith('root:'):
+                continue
+            root = name[5:]
+            for user in config[name].get('users', config[name].get('user', '')).split():
+                try:
+                    self.targets.append(BatchTarget.in_root(root, user))
+                except (OSError, KeyError, ValueError) as e:
+                    errors.append(str(e).strip('"'))
+
+        for error in errors:
+            print(f"{KaliStyle.ERROR} {error}")
+        if not self.targets:
+            print(f"{KaliStyle.ERROR} No targets in {self.config_path}")
+        return not errors and bool(self.targets)
+
+    @staticmethod
+    def _has_user(user):
+        try:
+            pwd.getpwnam(user)
+            return True
+        except KeyError:
+            return False
+
+    @staticmethod
+    def configure_panel(installer):
+        target = installer.target
+        # A running xfconfd would overwrite the channel file with its own copy on exit
+        if not target.chroot and target.owner and Readiness.find_processes('xfconfd', target.owner[0]):
+            print(f"{KaliStyle.WARNING} {target.user} is logged in, panel left for the installer in that session")
+            return True
+        if not installer.check_panel_state() or not installer.remove_existing_genmon():
+            return False
+        return installer.add_plugins_to_panel(*installer.find_and_remove_cpugraph())
+
+    @staticmethod
+    def install_root_packages(installer, root, policy):
+        if policy == 'skip':
+            return True
+        status_file = os.path.join(root, 'var/lib/dpkg/status')
+        try:
+            installed = installer.read_dpkg_status(installer.PACKAGES, status_file)
+        except OSError:
+            print(f"{KaliStyle.WARNING} No dpkg database in {root}, packages skipped")
+            return True
+        missing = [pkg for pkg, ok in installed.items() if not ok]
+        if not missing:
+            return True
+        if policy == 'check':
+            print(f"{KaliStyle.WARNING} Missing in {root}: {', '.join(missing)}")
+            return True
+        success, _ = installer.run_command(['chroot', root, 'apt-get', 'update'], timeout=600)
+        if success:
+            success, _ = installer.run_command(['chroot', root, 'apt-get', 'install', '-y'] + missing, timeout=600)
+        return success
+
+    def stage_sources(self):
+        # Workers run as the target users, who cannot read a checkout under /root
+        source = tempfile.mkdtemp(prefix='kaliwidget-batch-')
+        shutil.copytree(os.path.join(self.script_dir, 'bin'), os.path.join(source, 'bin'),
+                        ignore=shutil.ignore_patterns('__pycache__', 'status'))
+        for directory, _, files in os.walk(source):
+            os.chmod(directory, 0o755)
+            for name in files:
+                path = os.path.join(directory, name)
+                os.chmod(path, os.stat(path).st_mode & 0o777 | 0o444)
+        return source
+
+    def plan(self):
+        # Identical for every target, so it is resolved once here and shipped to the workers
+        host = XfceInstaller(self.layout, target=BatchTarget.local(pwd.getpwuid(os.getuid()).pw_name),
+                             engine=self.engine)
+        self.source = self.stage_sources()
+        source_hashes = InstallManifest.hash_tree(os.path.join(self.source, 'bin'))
+        clipboard = host.resolve_clipboard()
+        if any(not target.chroot for target in self.targets) and self.packages != 'skip':
+            missing = [pkg for pkg, ok in host.resolve_packages().items() if not ok]
+            if missing and self.packages == 'install':
+                if not host.install_additional_packages():
+                    return None
+            elif missing:
+                print(f"{KaliStyle.WARNING} Missing on this host: {', '.join(missing)}")
+        # Once per image, before the workers drop root
+        failed_roots = []
+        for root in sorted({target.root for target in self.targets if target.chroot}):
+            with self.tracer.span('task', f"Installing packages in {root}"):
+                if not self.install_root_packages(host, root, self.packages):
+                    print(f"{KaliStyle.ERROR} Could not install packages in {root}")
+                    failed_roots.append(root)
+        return InstallPlan(self.layout, source_hashes, clipboard, self.packages, self.tracer.context['run'],
+                           self.engine, self.source, failed_roots)
+
+    def run(self):
+        if os.getuid() != 0:
+            print(f"{KaliStyle.ERROR} Batch mode writes into other users' homes and must run as root.")
+            return False
+        if not self.load():
+            return False
+        try:
+            return self._run()
+        finally:
+            if self.source:
+                shutil.rmtree(self.source, ignore_errors=True)
+
+    def _run(self):
+        start = time.perf_counter()
+        with self.tracer.span('task', "Computing install plan"):
+            plan = self.plan()
+        if plan is None:
+            return False
+        plan_elapsed = time.perf_counter() - start
+        print(f"{KaliStyle.INFO} Plan ready in {plan_elapsed * 1000:.0f} ms: layout {plan.layout}, "
+              f"{len(plan.source_hashes)} files, clipboard {plan.clipboard['backend']}")
+        print(f"{KaliStyle.INFO} Installing for {len(self.targets)} target(s) with {self.jobs} job(s)...")
+
+        targets = [target for target in self.targets if target.root not in plan.failed_roots]
+        for target in self.targets:
+            if target.root in plan.failed_roots:
+                self.results.append({'name': target.name, 'ok': False, 'error': "Installing packages",
+                                     'elapsed': 0.0, 'files': 0, 'panel': [], 'output': ''})
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, self.jobs)) as executor:
+            futures = [executor.submit(install_batch_target, plan, target) for target in targets]
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                self.results.append(result)
+                # Workers write their own trace lines, only the in-memory copy is merged
+                self.tracer.records.extend(result.pop('trace'))
+                state = f"{KaliStyle.GREEN}ok{KaliStyle.RESET}" if result['ok'] else f"{KaliStyle.RED}failed{KaliStyle.RESET}"
+                print(f"  {KaliStyle.YELLOW}•{KaliStyle.RESET} {result['name']:<32} {state}")
+                logging.info(f"Batch target {result['name']}: {'ok' if result['ok'] else result['error']} "
+                             f"in {result['elapsed']:.3f} s")
+                if not result['ok']:
+                    logging.error(f"Batch output for {result['name']}:\n{result['output']}")
+
+        self.show_report(time.perf_counter() - start)
+        self.tracer.close()
+        return all(result['ok'] for result in self.results)
+
+    def show_profile(self, top=10):
+        self.tracer.report(top)
+
+    def show_report(self, elapsed):
+        print(f"\n[{KaliStyle.BLUE}{KaliStyle.BOLD}+{KaliStyle.RESET}] Batch Summary\n")
+        order = {target.name: i for i, target in enumerate(self.targets)}
+        for result in sorted(self.results, key=lambda r: order.get(r['name'], 0)):
+            status = 'ok' if result['ok'] else f"failed: {result['error']}"
+            color = KaliStyle.GREY if result['ok'] else KaliStyle.RED
+            panel = ','.join(map(str, result['panel'])) or '-'
+            print(f"  {color}{result['name']:<32} {result['elapsed']:8.2f} s {result['files']:4d} file(s)   "
+                  f"panel {panel:<10} {status}{KaliStyle.RESET}")
+        failed = sum(1 for result in self.results if not result['ok'])
+        busy = sum(result['elapsed'] for result in self.results)
+        print(f"  {KaliStyle.WHITE}{'Total':<32} {elapsed:8.2f} s   ({busy:.2f} s of work, "
+              f"{len(self.results) - failed} ok, {failed} failed){KaliStyle.RESET}")
+        print(f"\n{KaliStyle.INFO} Panel changes load at each user's next login.")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='KaliWidget installer for the XFCE panel')
+    parser.add_argument('--layout', choices=sorted(XfceInstaller.LAYOUTS),
+                        help='One genmon plugin per widget (split) or a single plugin for all of them (combined)')
+    parser.add_argument('--batch', metavar='CONFIG',
+                        help='Install non-interactively for the users and image roots listed in CONFIG (root)')
+    parser.add_argument('--jobs', type=int, help='Targets installed in parallel in batch mode')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='async',
+                        help='Run independent commands concurrently (async) or one after another (serial)')
+    parser.add_argument('--sudo', choices=['helper', 'stdin'], default='helper',
+                        help='Authenticate once for a root helper (helper) or pipe the password to every sudo (stdin)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Edit the xfce4-panel channel file directly instead of talking to xfconfd')
+    parser.add_argument('--privileged-helper', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--profile', nargs='?', type=int, const=10, metavar='N',
+                        help='Print the N slowest commands and a per-task breakdown (default 10)')
+    args = parser.parse_args()
+
+    if args.privileged_helper:
+        sys.exit(PrivilegedHelper.serve())
+
     try:
-        installer = XfceInstaller()
+        if args.batch:
+            installer = BatchInstaller(args.batch, layout=args.layout, jobs=args.jobs, engine=args.engine)
+        else:
+            installer = XfceInstaller(layout=args.layout or 'split', engine=args.engine, sudo=args.sudo,
+                                      xfconf='xml' if args.offline else 'auto')
         success = installer.run()
+        if args.profile:
+            installer.show_profile(args.profile)
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print(f"\n{KaliStyle.WARNING} Installation cancelled by user")
@@ -0,0 +1,113 @@
+import io
+import os
+import sys
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+import kaliWidget
+
+class RecordingBackend:
+    # In-memory xfconfd that keeps every write for inspection
+    name = 'memory'
+
+    def __init__(self, store):
+        self.store = dict(store)
+        self.writes = []
+        self.calls = 0
+
+    def get_all(self, channel):
+        self.calls += 1
+        return dict(self.store)
+
+    def set(self, channel, prop, type_, value):
+        self.calls += 1
+        self.writes.append(('set', prop))
+        self.store[prop] = value
+        return True
+
+    def set_array(self, channel, prop, type_, values):
+        self.calls += 1
+        self.writes.append(('set_array', prop))
+        self.store[prop] = list(values)
+        return True
+
+    def reset(self, channel, prop, recursive=False):
+        self.calls += 1
+        self.writes.append(('reset', prop))
+        for key in [k for k in self.store if k == prop or (recursive and k.startswith(prop + '/'))]:
+            del self.store[key]
+        return True
+
+    def set_many(self, channel, changes):
+        return [self.set(channel, *change) for change in changes]
+
+    def reset_many(self, channel, resets):
+        return [self.reset(channel, prop, recursive) for prop, recursive in resets]
+
+def channel():
+    types = ['applicationsmenu', 'separator', 'tasklist', 'cpugraph', 'genmon', 'clock']
+    store = {'/panels': [1]}
+    for id_, type_ in enumerate(types, 1):
+        store[f'/plugins/plugin-{id_}'] = type_
+        store[f'/plugins/plugin-{id_}/setting'] = id_
+    store['/panels/panel-1/plugin-ids'] = list(range(1, len(types) + 1))
+    return store
+
+def make_installer(home, backend):
+    target = kaliWidget.BatchTarget('test', 'test', str(home), shell='/bin/bash')
+    installer = kaliWidget.XfceInstaller('split', target=target, xfconf_backend=backend,
+                                         tracer=kaliWidget.Tracer(), log_path=os.devnull)
+    status_dir = home / '.config/bin/status'
+    status_dir.mkdir(parents=True, exist_ok=True)
+    for widget in installer.LAYOUTS['split']:
+        (status_dir / f'{widget}.xml').touch()
+    return installer
+
+def run_panel_steps(installer):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return all([
+            installer.check_panel_state(),
+            installer.remove_existing_genmon(),
+            installer.add_plugins_to_panel(*installer.find_and_remove_cpugraph()),
+            installer.save_manifest()
+        ])
+
+def test_commit_writes_only_changed_properties():
+    backend = RecordingBackend(channel())
+    model = kaliWidget.PanelModel(kaliWidget.XfconfClient(None, backend=backend))
+    model.remove_plugin(5)
+    assert model.commit()
+    assert backend.writes == [('set_array', '/panels/panel-1/plugin-ids'), ('reset', '/plugins/plugin-5')]
+    assert backend.store['/panels/panel-1/plugin-ids'] == [1, 2, 3, 4, 6]
+
+def test_commit_without_changes_writes_nothing():
+    backend = RecordingBackend(channel())
+    model = kaliWidget.PanelModel(kaliWidget.XfconfClient(None, backend=backend))
+    assert model.commit()
+    assert backend.writes == []
+
+def test_panel_steps_replace_cpugraph_in_place(tmp_path):
+    backend = RecordingBackend(channel())
+    installer = make_installer(tmp_path, backend)
+    assert run_panel_steps(installer)
+    ids = backend.store['/panels/panel-1/plugin-ids']
+    genmons = sorted(installer.panel_plugins.values())
+    assert ids[:3] == [1, 2, 3] and ids[-1] == 6
+    assert [backend.store[f'/plugins/plugin-{id_}'] for id_ in ids[3:-1]] == \
+        ['genmon', 'separator', 'genmon', 'separator', 'genmon']
+    assert sorted(id_ for id_ in ids if backend.store[f'/plugins/plugin-{id_}'] == 'genmon') == genmons
+    assert '/plugins/plugin-4' not in backend.store and '/plugins/plugin-5' not in backend.store
+    # Untouched plugins keep their settings and are never rewritten
+    untouched = ('/plugins/plugin-1', '/plugins/plugin-6')
+    assert not any(prop in untouched or prop.startswith(tuple(f'{p}/' for p in untouched))
+                   for _, prop in backend.writes)
+
+def test_unchanged_rerun_makes_no_writes(tmp_path):
+    backend = RecordingBackend(channel())
+    assert run_panel_steps(make_installer(tmp_path, backend))
+    backend.writes = []
+    rerun = make_installer(tmp_path, backend)
+    assert run_panel_steps(rerun)
+    assert rerun.panel_current
+    assert backend.writes == []
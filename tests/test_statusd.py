@@ -0,0 +1,26 @@
+import os
+import sys
+import configparser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'bin'))
+
+import statusd
+
+def configured(cls, text):
+    config = configparser.ConfigParser()
+    config.read_string(text)
+    widget = cls.__new__(cls)
+    widget.configure(config)
+    return widget.schedule
+
+def test_invalid_periods_fall_back_to_defaults():
+    schedule = configured(statusd.VpnWidget, "[vpn]\nmin_period = 0,5\nmax_period = -3\nbackoff = 0.5\n")
+    assert (schedule.min_period, schedule.max_period, schedule.factor) == (0.25, 10.0, 2.0)
+
+def test_max_below_min_is_rejected():
+    schedule = configured(statusd.TargetWidget, "[target]\nmin_period = 5\nmax_period = 1\n")
+    assert (schedule.min_period, schedule.max_period) == (5.0, 30.0)
+
+def test_valid_periods_are_used():
+    schedule = configured(statusd.EthernetWidget, "[ethernet]\nmin_period = 1\nmax_period = 20\nbackoff = 1.5\n")
+    assert (schedule.min_period, schedule.max_period, schedule.factor) == (1.0, 20.0, 1.5)
@@ -0,0 +1,113 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'bin'))
+
+import targets
+import kaliwidget
+
+def make_registry(tmp_path):
+    return targets.TargetRegistry(str(tmp_path / 'targets.log'), str(tmp_path / 'target.txt'))
+
+def run_cli(tmp_path, monkeypatch, capsys, *argv):
+    monkeypatch.setattr(targets.TargetRegistry.__init__, '__defaults__',
+                        (str(tmp_path / 'targets.log'), str(tmp_path / 'target.txt'), None))
+    monkeypatch.setattr(targets, 'signal_daemon', lambda: False)
+    capsys.readouterr()
+    code = kaliwidget.main(['target', *argv])
+    return code, capsys.readouterr().out
+
+def test_shared_name_survives_removal_of_one_target(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.add('1.1.1.1', 'dup')
+    registry.add('2.2.2.2', 'dup')
+    registry.remove('2.2.2.2')
+    for reloaded in (registry, make_registry(tmp_path)):
+        assert reloaded.resolve('dup')['ip'] == '1.1.1.1'
+        assert [entry['ip'] for entry in reloaded.find('dup')] == ['1.1.1.1']
+
+def test_rename_keeps_other_targets_with_the_old_name(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.add('1.1.1.1', 'dup')
+    registry.add('2.2.2.2', 'dup')
+    registry.add('2.2.2.2', 'other')
+    assert registry.resolve('dup')['ip'] == '1.1.1.1'
+    assert registry.resolve('other')['ip'] == '2.2.2.2'
+
+def test_shared_name_is_ambiguous(tmp_path):
+    registry = make_registry(tmp_path)
+    registry.add('1.1.1.1', 'dup')
+    registry.add('2.2.2.2', 'dup')
+    assert registry.resolve('dup') is None
+    assert registry.use('dup') is None
+    assert [entry['ip'] for entry in registry.matches('dup')] == ['1.1.1.1', '2.2.2.2']
+    assert registry.use('2.2.2.2')['name'] == 'dup'
+
+def test_snapshot_and_log_tail_reload_to_the_same_state(tmp_path, monkeypatch):
+    monkeypatch.setattr(targets.TargetRegistry, 'LOG_LIMIT', 10)
+    registry = make_registry(tmp_path)
+    for i in range(25):
+        registry.add(f'10.0.0.{i}', f'host{i % 7}')
+    registry.use('10.0.0.3')
+    registry.remove('10.0.0.4')
+    assert os.path.exists(registry.snapshot)
+    assert registry.records <= 10
+
+    reloaded = make_registry(tmp_path)
+    assert reloaded.entries == registry.entries
+    assert list(reloaded.recent) == list(registry.recent)
+    assert reloaded.by_name == registry.by_name
+    assert reloaded.names == registry.names
+
+def test_compaction_keeps_records_appended_by_another_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(targets.TargetRegistry, 'LOG_LIMIT', 3)
+    first = make_registry(tmp_path)
+    other = make_registry(tmp_path)
+    other.add('10.0.0.9', 'other')
+    for i in range(4):
+        first.add(f'10.0.0.{i}', f'host{i}')
+    assert first.records == 0
+    reloaded = make_registry(tmp_path)
+    assert reloaded.resolve('other')['ip'] == '10.0.0.9'
+    assert sorted(reloaded.entries) == ['10.0.0.0', '10.0.0.1', '10.0.0.2', '10.0.0.3', '10.0.0.9']
+
+def test_closed_write_without_newline_is_taken_at_once(tmp_path):
+    path = tmp_path / 'target.txt'
+    store = targets.TargetStore(str(path))
+    try:
+        if store.fileno() is None:
+            pytest.skip('inotify unavailable')
+        with open(path, 'w') as f:
+            f.write('10.10.10.10 box')
+        assert store.handle_events()
+        assert store.get() == ('10.10.10.10', 'box')
+    finally:
+        store.close()
+
+def test_polled_partial_write_waits_for_a_stable_check(tmp_path):
+    path = tmp_path / 'target.txt'
+    store = targets.TargetStore(str(path), use_inotify=False)
+    path.write_text('10.10.10.10 bo')
+    assert not store.poll()
+    assert store.get() is None
+    assert store.poll()
+    assert store.get() == ('10.10.10.10', 'bo')
+
+def test_unquoted_multi_word_name_is_kept_whole(tmp_path, monkeypatch, capsys):
+    code, _ = run_cli(tmp_path, monkeypatch, capsys, 'set', '10.10.10.5', 'Web', 'Server')
+    assert code == 0
+    assert targets.parse_target((tmp_path / 'target.txt').read_text()) == ('10.10.10.5', 'Web Server')
+    _, listing = run_cli(tmp_path, monkeypatch, capsys, 'list')
+    assert listing.split() == ['*', '10.10.10.5', 'Web', 'Server']
+    code, output = run_cli(tmp_path, monkeypatch, capsys, 'use', 'Web', 'Server')
+    assert code == 0 and output == '10.10.10.5 Web Server\n'
+
+def test_find_with_empty_prefix_lists_everything_up_to_the_limit(tmp_path, monkeypatch, capsys):
+    for ip, name in (('10.0.0.1', 'alpha'), ('10.0.0.2', 'beta'), ('10.0.0.3', 'gamma')):
+        run_cli(tmp_path, monkeypatch, capsys, 'set', ip, name)
+    code, output = run_cli(tmp_path, monkeypatch, capsys, 'find', '')
+    assert code == 0 and [line.split()[-1] for line in output.splitlines()] == ['alpha', 'beta', 'gamma']
+    _, output = run_cli(tmp_path, monkeypatch, capsys, 'find', '--limit', '1', '')
+    assert [line.split()[-1] for line in output.splitlines()] == ['alpha']